@@ -1,6 +1,19 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save, pre_delete
 
 
 class CommonConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'common'
+
+    def ready(self):
+        from . import backends
+        from .models import Account, Profile
+
+        post_save.connect(backends.user_changed, sender=settings.AUTH_USER_MODEL)
+        post_delete.connect(backends.user_changed, sender=settings.AUTH_USER_MODEL)
+        post_save.connect(backends.profile_changed, sender=Profile)
+        post_delete.connect(backends.profile_changed, sender=Profile)
+        post_save.connect(backends.account_changed, sender=Account)
+        pre_delete.connect(backends.account_changed, sender=Account)
@@ -0,0 +1,97 @@
+from dataclasses import dataclass, fields
+from datetime import date, timedelta
+
+from django.db.models import Count
+from django.utils import timezone
+
+from upkeep.models import Item, Task
+from upkeep.stats import aget_location_stats, get_location_stats
+
+
+@dataclass(frozen=True)
+class DashboardStats:
+    """
+    Everything the dashboard shows for one location. Shared by the home view
+    and anything else (e.g. an API) that needs the same numbers.
+    """
+
+    # Widget 1: Action Center
+    overdue_tasks_count: int
+    tasks_due_this_week: int
+    broken_items_count: int
+    # Widget 2: Asset & Value
+    total_active_items: int
+    total_asset_value: int
+    warranty_watch: list
+    # Widget 3: Workload Forecast
+    maintenance_load: int
+    next_up_tasks: list
+    # Widget 4: Insights
+    most_demanding_area: dict | None
+
+    def as_dict(self):
+        return {field.name: getattr(self, field.name) for field in fields(self)}
+
+
+def dashboard_stats(location, today: date | None = None) -> DashboardStats:
+    """
+    Builds the dashboard for ``location``. The scalar widgets come from the
+    incrementally maintained LocationStats row (a primary-key lookup); the
+    list widgets are one query each.
+    """
+    today = today or timezone.now().date()
+    warranty_watch, next_up_tasks, areas = _list_widgets(location, today)
+    return _dashboard(
+        get_location_stats(location, today),
+        warranty_watch=list(warranty_watch),
+        next_up_tasks=list(next_up_tasks),
+        most_demanding_area=areas.first(),
+    )
+
+
+async def adashboard_stats(location, today: date | None = None) -> DashboardStats:
+    """
+    ``dashboard_stats`` for async views, with the same queries.
+    """
+    today = today or timezone.now().date()
+    warranty_watch, next_up_tasks, areas = _list_widgets(location, today)
+    return _dashboard(
+        await aget_location_stats(location, today),
+        warranty_watch=[item async for item in warranty_watch],
+        next_up_tasks=[task async for task in next_up_tasks],
+        most_demanding_area=await areas.afirst(),
+    )
+
+
+def _list_widgets(location, today):
+    items = Item.objects.filter(location=location)
+    tasks = Task.objects.filter(item__location=location)
+
+    warranty_watch = items.filter(
+        status=Item.ItemStatus.ACTIVE,
+        warranty_expiration__gte=today,
+        warranty_expiration__lte=today + timedelta(days=60),
+    ).order_by("warranty_expiration")[:5]
+
+    # Next tasks (including overdue ones at the top)
+    next_up_tasks = tasks.select_related("item").order_by("effective_due_date")[:5]
+
+    # Most demanding area (by task volume)
+    most_demanding_area = (
+        tasks.values("item__area")
+        .annotate(task_count=Count("id"))
+        .order_by("-task_count")
+    )
+    return warranty_watch, next_up_tasks, most_demanding_area
+
+
+def _dashboard(counters, **lists) -> DashboardStats:
+    return DashboardStats(
+        overdue_tasks_count=counters.overdue_tasks_count,
+        tasks_due_this_week=counters.tasks_due_this_week,
+        broken_items_count=counters.broken_items_count,
+        total_active_items=counters.total_active_items,
+        total_asset_value=counters.total_asset_value,
+        maintenance_load=counters.maintenance_load,
+        **lists,
+    )
@@ -0,0 +1,40 @@
+"""
+Lifecycle of the per-process database connection pools (see DATABASE_POOL
+in settings.common), called from the gunicorn worker hooks.
+"""
+
+import logging
+
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+def open_pools(timeout=10):
+    """
+    Opens the pools of all pooled databases and waits up to ``timeout``
+    seconds for their minimum number of connections, so a new (or recycled)
+    worker's first requests don't pay for connection handshakes. A database
+    that isn't reachable yet is logged, not raised: its pool keeps
+    connecting in the background and requests wait for it as usual.
+    """
+    for connection in connections.all(initialized_only=False):
+        pool = getattr(connection, "pool", None)
+        if pool is None:
+            continue
+        from psycopg_pool import PoolTimeout
+
+        try:
+            pool.open(wait=True, timeout=timeout)
+        except PoolTimeout:
+            logger.warning("Connection pool of %r not ready after %ss", connection.alias, timeout, exc_info=True)
+
+
+def close_pools():
+    """
+    Closes the pools of all pooled databases, so an exiting worker ends its
+    sessions instead of leaving the server to time them out.
+    """
+    for connection in connections.all(initialized_only=False):
+        if getattr(connection, "pool", None) is not None:
+            connection.close_pool()
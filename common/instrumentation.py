@@ -0,0 +1,193 @@
+"""
+Opt-in per-request metrics (REQUEST_METRICS): the number of SQL queries and
+the time spent in the database, in template rendering, in the view and in
+total. They are sent to the client as a Server-Timing header and logged as
+structured fields (see common.jsonlog); SQL run several times in one
+request (REQUEST_METRICS_DUPLICATES or more) is logged as a warning naming
+the view, the usual sign of a query per row.
+
+The collector of the current request lives in a context variable, so the
+hooks also see queries and renders that async views run in threads. The
+hooks are only installed when the setting is on; otherwise the middleware
+removes itself at startup and nothing runs per request.
+"""
+
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template.backends.django import Template
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar("request_metrics", default=None)
+
+
+@dataclass
+class RequestMetrics:
+    started: float = field(default_factory=time.perf_counter)
+    view: str = ""
+    view_started: float | None = None
+    view_time: float = 0
+    queries: Counter = field(default_factory=Counter)
+    db_time: float = 0
+    template_time: float = 0
+    # Nested renders (render_to_string in a tag) count once.
+    template_depth: int = 0
+
+    @property
+    def query_count(self):
+        return sum(self.queries.values())
+
+    def duplicates(self, threshold):
+        return [
+            {"sql": sql, "count": count}
+            for sql, count in self.queries.most_common()
+            if count >= threshold
+        ]
+
+
+def time_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_time += time.perf_counter() - start
+        metrics.queries[sql] += 1
+
+
+def _add_query_timer(connection, **kwargs):
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+def _watch_connections():
+    # Connections opened before install() don't get the connection_created
+    # signal; connections are per thread, so this runs in the threads that
+    # serve requests.
+    for connection in connections.all(initialized_only=True):
+        _add_query_timer(connection)
+
+
+def _time_render(render):
+    @wraps(render)
+    def timed_render(self, context=None, request=None):
+        metrics = _current.get()
+        if metrics is None:
+            return render(self, context, request)
+        start = time.perf_counter()
+        metrics.template_depth += 1
+        try:
+            return render(self, context, request)
+        finally:
+            metrics.template_depth -= 1
+            if not metrics.template_depth:
+                metrics.template_time += time.perf_counter() - start
+
+    timed_render.timed = True
+    return timed_render
+
+
+def install():
+    """
+    Hooks the collector into every database connection and into template
+    rendering. Idempotent.
+    """
+    connection_created.connect(_add_query_timer, dispatch_uid="request_metrics")
+    if not getattr(Template.render, "timed", False):
+        Template.render = _time_render(Template.render)
+
+
+class RequestMetricsMiddleware:
+    """
+    Collects the metrics of each request. Goes first in MIDDLEWARE, so the
+    total covers the other middleware (e.g. loading and saving the session)
+    too; the view time runs from the view middleware to the response.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "REQUEST_METRICS", False):
+            raise MiddlewareNotUsed
+        install()
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        _watch_connections()
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.report(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.report(request, response, metrics)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # In async mode this runs in the thread that also runs the ORM
+        # queries of async views.
+        _watch_connections()
+        metrics = _current.get()
+        metrics.view = f"{view_func.__module__}.{view_func.__qualname__}"
+        metrics.view_started = time.perf_counter()
+
+    def report(self, request, response, metrics):
+        now = time.perf_counter()
+        if metrics.view_started is not None:
+            metrics.view_time = now - metrics.view_started
+        fields = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "view": metrics.view,
+            "queries": metrics.query_count,
+            "db_ms": round(metrics.db_time * 1000, 2),
+            "template_ms": round(metrics.template_time * 1000, 2),
+            "view_ms": round(metrics.view_time * 1000, 2),
+            "total_ms": round((now - metrics.started) * 1000, 2),
+        }
+        response["Server-Timing"] = ", ".join(
+            [
+                f'db;dur={fields["db_ms"]};desc="{fields["queries"]} queries"',
+                f"tpl;dur={fields['template_ms']}",
+                f"view;dur={fields['view_ms']}",
+                f"total;dur={fields['total_ms']}",
+            ]
+        )
+
+        duplicates = metrics.duplicates(getattr(settings, "REQUEST_METRICS_DUPLICATES", 3))
+        fields["duplicate_queries"] = len(duplicates)
+        logger.info("%s %s %s", request.method, request.path, response.status_code, extra=fields)
+        if duplicates:
+            logger.warning(
+                "Duplicate queries in %s: %s",
+                metrics.view or request.path,
+                "; ".join(f"{d['count']}x {d['sql']}" for d in duplicates),
+                extra={"view": metrics.view, "path": request.path, "duplicates": duplicates},
+            )
+        return response
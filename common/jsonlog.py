@@ -0,0 +1,28 @@
+import json
+import logging
+
+# Attributes every LogRecord has; anything else on a record was passed with
+# ``extra`` and is logged as a field of its own.
+RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    One JSON object per line with the level, time, module and message, plus
+    any fields passed with ``extra`` (e.g. the request metrics of
+    common.instrumentation). Values JSON can't hold are logged as strings.
+    """
+
+    def format(self, record):
+        data = {
+            "level": record.levelname,
+            "time": self.formatTime(record, self.datefmt),
+            "module": record.module,
+            "message": record.getMessage(),
+        }
+        data.update(
+            (key, value) for key, value in vars(record).items() if key not in RECORD_ATTRIBUTES
+        )
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str)
@@ -0,0 +1,126 @@
+import statistics
+import threading
+import time
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.test import RequestFactory
+from django.urls import reverse
+
+from common.db import open_pools
+from upkeep.benchmarks import percentile, session_cookie, throwaway_household
+
+# (label, CONN_MAX_AGE, pooled)
+SCENARIOS = [
+    ("before: connect per request", 0, False),
+    ("persistent (CONN_MAX_AGE=60)", 60, False),
+    ("psycopg pool", 0, True),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures per-request latency through the WSGI handler, including "
+        "the connection setup and teardown Django does around each request, "
+        "when connecting per request, with persistent connections and with "
+        "the psycopg connection pool. Needs PostgreSQL; the seeded rows are "
+        "deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--concurrency", type=int, default=4)
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Connection pooling needs PostgreSQL.")
+
+        db = connections.settings["default"]
+        saved = {key: db.get(key) for key in ("CONN_MAX_AGE", "OPTIONS")}
+        with throwaway_household(items=10, tasks_per_item=1) as (owner, location):
+            try:
+                cookie = session_cookie(owner)
+                paths = [
+                    (reverse("task-calendar-feed", args=[location.calendar_token]), ""),
+                    (reverse("item-list"), cookie),
+                ]
+                self.stdout.write(
+                    f"{db['HOST'] or 'localhost'}: {options['requests']} requests per scenario, "
+                    f"{options['concurrency']} threads"
+                )
+                self.stdout.write(
+                    f"{'scenario':<30}{'connects':>10}{'median ms':>11}{'p95 ms':>9}{'p99 ms':>9}"
+                )
+                for label, max_age, pooled in SCENARIOS:
+                    self._configure(db, saved, max_age, pooled)
+                    timings, connects = self._run(paths, options)
+                    self.stdout.write(
+                        f"{label:<30}{connects:>10}{statistics.median(timings):>11.2f}"
+                        f"{percentile(timings, 0.95):>9.2f}{percentile(timings, 0.99):>9.2f}"
+                    )
+            finally:
+                self._configure(db, saved, saved["CONN_MAX_AGE"], False)
+                db["OPTIONS"] = saved["OPTIONS"]
+
+    def _configure(self, db, saved, max_age, pooled):
+        # Drop this thread's connection and any pool of the previous scenario;
+        # the request threads connect with the new settings.
+        connection.close()
+        connection.close_pool()
+        options = {key: value for key, value in (saved["OPTIONS"] or {}).items() if key != "pool"}
+        if pooled:
+            pool = (saved["OPTIONS"] or {}).get("pool")
+            options["pool"] = pool if isinstance(pool, dict) else {"min_size": 2, "max_size": 8}
+        db["CONN_MAX_AGE"] = max_age
+        db["OPTIONS"] = options
+        if pooled:
+            # As the gunicorn worker does at boot.
+            open_pools()
+
+    def _run(self, paths, options):
+        handler = WSGIHandler()
+        factory = RequestFactory()
+        timings, connects = [], []
+        lock = threading.Lock()
+
+        def count_connects(sender, connection, **kwargs):
+            with lock:
+                connects.append(connection.alias)
+
+        def worker(n, count):
+            local = []
+            for i in range(count):
+                path, cookie = paths[(n + i) % len(paths)]
+                environ = factory.get(path, HTTP_COOKIE=cookie).environ
+                start = time.perf_counter()
+                response = handler(environ, lambda status, headers: None)
+                b"".join(response)
+                # Sends request_finished: Django closes or returns the
+                # connection here.
+                response.close()
+                local.append((time.perf_counter() - start) * 1000)
+            connections.close_all()
+            with lock:
+                timings.extend(local)
+
+        connection_created.connect(count_connects)
+        try:
+            per_thread = options["requests"] // options["concurrency"]
+            threads = [
+                threading.Thread(target=worker, args=(n, per_thread))
+                for n in range(options["concurrency"])
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            connection_created.disconnect(count_connects)
+        timings.sort()
+        if connection.pool:
+            # connection_created fires per checkout; count the pool's own
+            # connections (warm-up included) instead.
+            return timings, connection.pool.get_stats()["connections_num"]
+        return timings, len(connects)
@@ -0,0 +1,88 @@
+import statistics
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings
+
+from upkeep.benchmarks import percentile, rolled_back
+from upkeep.middleware import SESSION_KEY
+
+JSON = "django.contrib.sessions.serializers.JSONSerializer"
+MSGPACK = "common.serializers.MsgPackSerializer"
+
+# (label, session mode, serializer, write active_location_id on every request)
+SCENARIOS = [
+    ("before: db, json, always write", "db", JSON, True),
+    ("db, msgpack", "db", MSGPACK, False),
+    ("cached_db, msgpack", "cached_db", MSGPACK, False),
+    ("signed_cookies, msgpack", "signed_cookies", MSGPACK, False),
+]
+
+# What a logged-in session holds in this app.
+PAYLOAD = {
+    "_auth_user_id": "42",
+    "_auth_user_backend": "common.backends.AccountBackend",
+    "_auth_user_hash": "f" * 64,
+    SESSION_KEY: 7,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures the per-request session overhead (load, read the active "
+        "location, save if modified) for each session engine and serializer. "
+        "Session rows are rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{connection.vendor}: {options['requests']} requests per scenario")
+        self.stdout.write(
+            f"{'scenario':<34}{'bytes':>7}{'queries/req':>13}{'median us':>11}{'p95 us':>9}"
+        )
+        with rolled_back():
+            for scenario in SCENARIOS:
+                self._run(*scenario, requests=options["requests"])
+
+    def _run(self, label, mode, serializer, always_write, requests):
+        with override_settings(SESSION_SERIALIZER=serializer):
+            engine = import_module(settings.SESSION_ENGINES[mode])
+            store = engine.SessionStore()
+            store.update(PAYLOAD)
+            store.save()
+            session_key = store.session_key
+            size = len(store.encode(dict(PAYLOAD)))
+
+            timings = []
+            queries = []
+
+            def count(execute, sql, params, many, context):
+                queries.append(sql)
+                return execute(sql, params, many, context)
+
+            with connection.execute_wrapper(count):
+                for _ in range(requests):
+                    start = time.perf_counter()
+                    # What SessionMiddleware, auth and the active location do.
+                    store = engine.SessionStore(session_key)
+                    store.get("_auth_user_id")
+                    # The active location rarely changes between requests.
+                    location_id = PAYLOAD[SESSION_KEY]
+                    if always_write or store.get(SESSION_KEY) != location_id:
+                        store[SESSION_KEY] = location_id
+                    if store.modified:
+                        store.save()
+                        session_key = store.session_key
+                    timings.append((time.perf_counter() - start) * 1e6)
+
+        timings.sort()
+        p95 = percentile(timings, 0.95)
+        self.stdout.write(
+            f"{label:<34}{size:>7}{len(queries) / requests:>13.2f}"
+            f"{statistics.median(timings):>11.1f}{p95:>9.1f}"
+        )
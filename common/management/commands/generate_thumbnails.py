@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+
+from common import thumbnails
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates the missing thumbnails of uploaded profile pictures and "
+        "receipts (see common.thumbnails), first working out the content "
+        "digest of files uploaded before thumbnails existed. --recompute "
+        "works out every digest again, e.g. after files were replaced on disk."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--kind", choices=sorted(thumbnails.KINDS), action="append")
+        parser.add_argument("--recompute", action="store_true")
+
+    def handle(self, *args, **options):
+        for kind in options["kind"] or sorted(thumbnails.KINDS):
+            model, field, digest_field = thumbnails.kind_model(kind)
+            generated = skipped = 0
+            objects = model.objects.exclude(**{field: ""}).exclude(**{f"{field}__isnull": True})
+            for obj in objects.only("pk", field, digest_field).iterator():
+                fieldfile = getattr(obj, field)
+                digest = getattr(obj, digest_field)
+                if not digest or options["recompute"]:
+                    if not fieldfile.storage.exists(fieldfile.name):
+                        self.stderr.write(f"{kind} {obj.pk}: {fieldfile.name} is missing")
+                        skipped += 1
+                        continue
+                    with fieldfile.open("rb") as f:
+                        digest = thumbnails.image_digest(f)
+                    # update(): save() would treat the file as a new upload.
+                    model.objects.filter(pk=obj.pk).update(**{digest_field: digest})
+                    if not digest:
+                        # Not an image, e.g. a PDF receipt.
+                        continue
+                try:
+                    generated += len(thumbnails.generate(fieldfile, digest))
+                except thumbnails.ERRORS as e:
+                    self.stderr.write(f"{kind} {obj.pk}: {fieldfile.name}: {e}")
+                    skipped += 1
+            self.stdout.write(
+                self.style.SUCCESS(f"{kind}: generated {generated} thumbnail(s), skipped {skipped} file(s).")
+            )
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.15 on 2026-10-18 20:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0002_account_profile_account'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='profile_picture_digest',
+            field=models.CharField(blank=True, editable=False, max_length=16),
+        ),
+    ]
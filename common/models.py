@@ -1,6 +1,8 @@
 from django.db import models
 from django.conf import settings
 
+from . import thumbnails
+
 
 class BaseModel(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
@@ -32,6 +34,14 @@ class Profile(models.Model):
     profile_picture = models.ImageField(
         upload_to="profile_pictures/", blank=True, null=True
     )
+    # Content digest naming the picture's thumbnails (common.thumbnails).
+    profile_picture_digest = models.CharField(max_length=16, blank=True, editable=False)
 
     def __str__(self):
         return f"Profile for {self.user.username}"
+
+    def save(self, *args, **kwargs):
+        uploaded = thumbnails.before_save(self, "profile_picture", "profile_picture_digest")
+        super().save(*args, **kwargs)
+        if uploaded:
+            thumbnails.after_save(self, "profile_picture", "profile_picture_digest")
@@ -0,0 +1,23 @@
+import json
+
+import msgpack
+
+
+class MsgPackSerializer:
+    """
+    Session serializer producing msgpack instead of JSON: smaller session
+    rows and cookies, and faster to encode and decode. Accepts the same
+    values as Django's JSONSerializer, and still reads the JSON sessions
+    written before it, so switching to it logs nobody out.
+    """
+
+    def dumps(self, obj):
+        return msgpack.packb(obj, use_bin_type=True)
+
+    def loads(self, data):
+        try:
+            return msgpack.unpackb(data, raw=False)
+        except ValueError:
+            # A JSON session from before: "{" alone is valid msgpack, so
+            # unpacking stops with the rest of the object left over.
+            return json.loads(data)
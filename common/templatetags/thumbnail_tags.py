@@ -0,0 +1,19 @@
+from django import template
+from django.urls import reverse
+
+from common import thumbnails
+
+register = template.Library()
+
+
+@register.simple_tag
+def thumbnail_url(obj, kind, size, fmt="webp"):
+    """
+    The URL of a thumbnail of ``obj``'s image (see common.thumbnails), or ""
+    when it has none (no file, or one that isn't an image).
+    """
+    _, _, digest_field = thumbnails.KINDS[kind]
+    digest = getattr(obj, digest_field)
+    if not digest:
+        return ""
+    return reverse("thumbnail", args=[kind, obj.pk, digest, size, fmt])
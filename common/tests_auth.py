@@ -0,0 +1,72 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from common.models import Account, Profile
+from upkeep.models import Location
+
+User = get_user_model()
+
+class AccountBackendTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='authuser', password='password')
+        self.account = Account.objects.create(name="Test Household", owner=self.user)
+        self.profile = Profile.objects.create(user=self.user, account=self.account)
+        Location.objects.create(name="Home", account=self.account, default=True)
+        self.client = Client()
+        self.client.login(username='authuser', password='password')
+
+    def identity_queries(self):
+        """
+        Queries against the user, profile and account tables during a page load.
+        """
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('home'))
+        self.assertEqual(response.status_code, 200)
+        return [
+            q["sql"] for q in ctx.captured_queries
+            if any(f'FROM "{table}"' in q["sql"] for table in ("auth_user", "common_profile", "common_account"))
+        ]
+
+    def test_user_profile_and_account_in_one_query(self):
+        queries = self.identity_queries()
+        self.assertEqual(len(queries), 1)
+        self.assertIn("common_account", queries[0])
+
+    def test_user_without_profile(self):
+        self.profile.delete()
+        self.assertEqual(len(self.identity_queries()), 1)
+
+    def test_sessions_from_model_backend_still_authenticate(self):
+        self.assertEqual(self.client.session["_auth_user_backend"], "common.backends.AccountBackend")
+        client = Client()
+        client.force_login(self.user, backend="django.contrib.auth.backends.ModelBackend")
+        response = client.get(reverse('home'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.wsgi_request.user, self.user)
+
+    @override_settings(AUTH_USER_CACHE_TIMEOUT=60)
+    def test_cached_user_is_invalidated_on_changes(self):
+        self.identity_queries()
+        self.assertEqual(self.identity_queries(), [])
+
+        self.account.name = "Renamed"
+        self.account.save()
+        self.assertEqual(len(self.identity_queries()), 1)
+        response = self.client.get(reverse('home'))
+        self.assertEqual(response.wsgi_request.user.profile.account.name, "Renamed")
+
+        self.profile.full_name = "Auth User"
+        self.profile.save()
+        self.assertEqual(len(self.identity_queries()), 1)
+
+    @override_settings(AUTH_USER_CACHE_TIMEOUT=60)
+    def test_deactivated_user_is_logged_out(self):
+        self.identity_queries()
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(reverse('home'))
+        self.assertEqual(response.status_code, 302)
@@ -0,0 +1,87 @@
+import datetime
+
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from common.dashboard import DashboardStats, dashboard_stats
+from common.models import Account, Profile
+from upkeep.models import Item, Location, Task
+
+User = get_user_model()
+
+class DashboardStatsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='dashuser', password='password')
+        self.account = Account.objects.create(name="Test Household", owner=self.user)
+        self.profile = Profile.objects.create(user=self.user, account=self.account)
+        self.location = Location.objects.create(name="Home", account=self.account, default=True)
+        self.today = datetime.date(2026, 3, 10)
+
+        self.fridge = Item.objects.create(
+            name="Fridge", location=self.location, area="Kitchen", purchase_value=1000,
+            warranty_expiration=self.today + datetime.timedelta(days=30),
+        )
+        Item.objects.create(name="Mower", location=self.location, area="Garden", purchase_value=500)
+        Item.objects.create(
+            name="Old Drill", location=self.location, purchase_value=80, status=Item.ItemStatus.BROKEN
+        )
+
+        def task(name, due, snoozed=None, hours=None, item=None):
+            return Task.objects.create(
+                name=name, item=item or self.fridge, frequency=Task.Frequency.MONTHLY,
+                next_due_date=due, snoozed_until=snoozed, estimated_hours_to_complete=hours,
+            )
+
+        task("Overdue", self.today - datetime.timedelta(days=3), hours=1)
+        task("Snoozed", self.today - datetime.timedelta(days=3), snoozed=self.today + datetime.timedelta(days=10))
+        task("This week", self.today + datetime.timedelta(days=5), hours=2)
+        task("This month", self.today + datetime.timedelta(days=20), hours=4)
+        task("Later", self.today + datetime.timedelta(days=90), hours=8, item=Item.objects.get(name="Mower"))
+
+    def test_stats_values(self):
+        stats = dashboard_stats(self.location, today=self.today)
+        self.assertIsInstance(stats, DashboardStats)
+        self.assertEqual(stats.overdue_tasks_count, 1)
+        self.assertEqual(stats.tasks_due_this_week, 2)
+        self.assertEqual(stats.broken_items_count, 1)
+        self.assertEqual(stats.total_active_items, 2)
+        self.assertEqual(stats.total_asset_value, 1500)
+        # Every recurrence in the next 30 days: "Overdue" today and in 30
+        # days (2), "This week" (2) and "This month" (4).
+        self.assertEqual(stats.maintenance_load, 8)
+        self.assertEqual([item.name for item in stats.warranty_watch], ["Fridge"])
+        self.assertEqual(stats.next_up_tasks[0].name, "Overdue")
+        self.assertEqual(stats.most_demanding_area, {"item__area": "Kitchen", "task_count": 4})
+
+    def test_empty_location(self):
+        empty = Location.objects.create(name="Empty", account=self.account)
+        stats = dashboard_stats(empty, today=self.today)
+        self.assertEqual(stats.total_asset_value, 0)
+        self.assertEqual(stats.maintenance_load, 0)
+        self.assertIsNone(stats.most_demanding_area)
+
+    def test_query_count(self):
+        dashboard_stats(self.location, today=self.today)
+        # Stats row lookup plus warranty watch, next up and busiest area.
+        with self.assertNumQueries(4):
+            stats = dashboard_stats(self.location, today=self.today)
+            [task.item.name for task in stats.next_up_tasks]
+
+    def test_home_query_count_is_independent_of_size(self):
+        client = Client()
+        client.login(username='dashuser', password='password')
+
+        def count():
+            with CaptureQueriesContext(connection) as ctx:
+                response = client.get(reverse('home'))
+            self.assertEqual(response.status_code, 200)
+            return len(ctx.captured_queries)
+
+        client.get(reverse('home'))
+        baseline = count()
+        for i in range(10):
+            item = Item.objects.create(name=f"Item {i}", location=self.location, purchase_value=10)
+            Task.objects.create(name=f"Task {i}", item=item, frequency=Task.Frequency.WEEKLY)
+        self.assertEqual(count(), baseline)
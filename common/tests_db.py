@@ -0,0 +1,37 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import TestCase
+from psycopg_pool import PoolTimeout
+
+from common.db import close_pools, open_pools
+
+
+def pooled(alias="default"):
+    return SimpleNamespace(alias=alias, pool=mock.Mock(), close_pool=mock.Mock())
+
+class ConnectionPoolTests(TestCase):
+    def test_pools_are_opened_and_filled_at_boot(self):
+        connections = [pooled(), SimpleNamespace(alias="sqlite")]
+        with mock.patch("common.db.connections.all", return_value=connections):
+            open_pools(timeout=5)
+        connections[0].pool.open.assert_called_once_with(wait=True, timeout=5)
+
+    def test_unreachable_database_does_not_stop_the_worker(self):
+        connection = pooled()
+        connection.pool.open.side_effect = PoolTimeout("no server")
+        with mock.patch("common.db.connections.all", return_value=[connection]), \
+                self.assertLogs("common.db", "WARNING") as logs:
+            open_pools()
+        self.assertIn("'default'", logs.output[0])
+
+    def test_pools_are_closed_on_exit(self):
+        connections = [pooled(), SimpleNamespace(alias="sqlite")]
+        with mock.patch("common.db.connections.all", return_value=connections):
+            close_pools()
+        connections[0].close_pool.assert_called_once_with()
+
+    def test_unpooled_databases_are_left_alone(self):
+        # The test database is SQLite: nothing to open or close.
+        open_pools()
+        close_pools()
@@ -0,0 +1,103 @@
+import json
+import logging
+import re
+
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test import AsyncClient, TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from common.instrumentation import RequestMetrics
+from common.jsonlog import JSONFormatter
+from common.models import Account, Profile
+from upkeep.models import Location, Item
+
+User = get_user_model()
+
+SERVER_TIMING = re.compile(
+    r'^db;dur=[\d.]+;desc="(\d+) queries", tpl;dur=([\d.]+), view;dur=([\d.]+), total;dur=([\d.]+)$'
+)
+
+@override_settings(REQUEST_METRICS=True)
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='metricsuser', password='password')
+        self.account = Account.objects.create(name="Test Household", owner=self.user)
+        self.profile = Profile.objects.create(user=self.user, account=self.account)
+        self.location = Location.objects.create(name="Home", account=self.account, default=True)
+        Item.objects.create(name="Boiler", location=self.location)
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_server_timing_header(self):
+        with CaptureQueriesContext(connection) as ctx, self.assertLogs("common.instrumentation", "INFO"):
+            response = self.client.get(reverse('item-list'))
+        queries, template, view, total = SERVER_TIMING.match(response["Server-Timing"]).groups()
+        self.assertEqual(int(queries), len(ctx.captured_queries))
+        self.assertGreater(float(template), 0)
+        self.assertLessEqual(float(view), float(total))
+
+    def test_structured_log_fields(self):
+        with self.assertLogs("common.instrumentation", "INFO") as logs:
+            self.client.get(reverse('item-list'), {"q": "boiler"})
+        record = logs.records[0]
+        self.assertEqual(record.getMessage(), "GET /items/ 200")
+        self.assertEqual(record.view, "upkeep.views.item_list")
+        self.assertEqual(record.status, 200)
+        self.assertGreater(record.queries, 0)
+        self.assertEqual(record.duplicate_queries, 0)
+
+        line = json.loads(JSONFormatter().format(record))
+        self.assertEqual(line["level"], "INFO")
+        self.assertEqual(line["path"], "/items/")
+        for name in ("db_ms", "template_ms", "view_ms", "total_ms"):
+            self.assertIsInstance(line[name], float)
+
+    @override_settings(REQUEST_METRICS_DUPLICATES=1)
+    def test_duplicate_queries_are_flagged_with_the_view(self):
+        with self.assertLogs("common.instrumentation", "INFO") as logs:
+            self.client.get(reverse('item-list'))
+        info, warning = logs.records
+        self.assertEqual(warning.levelno, logging.WARNING)
+        self.assertIn("Duplicate queries in upkeep.views.item_list: 1x SELECT", warning.getMessage())
+        self.assertEqual(warning.view, "upkeep.views.item_list")
+        self.assertEqual(len(warning.duplicates), info.queries)
+        self.assertEqual(info.duplicate_queries, info.queries)
+
+    def test_async_views_are_measured(self):
+        async def get():
+            client = AsyncClient()
+            await client.aforce_login(self.user)
+            return await client.get(reverse('task-due-list'))
+
+        with self.assertLogs("common.instrumentation", "INFO") as logs:
+            response = async_to_sync(get)()
+        queries = int(SERVER_TIMING.match(response["Server-Timing"])[1])
+        self.assertGreaterEqual(queries, 3)
+        self.assertEqual(logs.records[0].view, "upkeep.views.task_due_list")
+
+    def test_duplicates(self):
+        metrics = RequestMetrics()
+        metrics.queries.update(["SELECT a"] * 4 + ["SELECT b"] * 2 + ["SELECT c"])
+        self.assertEqual(metrics.query_count, 7)
+        self.assertEqual(
+            metrics.duplicates(2),
+            [{"sql": "SELECT a", "count": 4}, {"sql": "SELECT b", "count": 2}],
+        )
+
+class DisabledMetricsTests(TestCase):
+    def test_no_header_when_disabled(self):
+        response = Client().get(reverse('login'))
+        self.assertNotIn("Server-Timing", response)
+
+class JSONFormatterTests(TestCase):
+    def test_messages_are_escaped_and_extras_kept(self):
+        record = logging.makeLogRecord(
+            {"levelname": "WARNING", "msg": 'say "%s"', "args": ("hi",), "module": "views", "view": "x.y", "extra": object}
+        )
+        line = json.loads(JSONFormatter().format(record))
+        self.assertEqual(line["message"], 'say "hi"')
+        self.assertEqual(line["module"], "views")
+        self.assertEqual(line["view"], "x.y")
+        self.assertIn("class 'object'", line["extra"])
@@ -0,0 +1,79 @@
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.core import signing
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from common.models import Account, Profile
+from upkeep.models import Location
+
+User = get_user_model()
+
+class SessionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='sessionuser', password='password')
+        self.account = Account.objects.create(name="Test Household", owner=self.user)
+        self.profile = Profile.objects.create(user=self.user, account=self.account)
+        self.home = Location.objects.create(name="Home", account=self.account, default=True)
+        self.cabin = Location.objects.create(name="Cabin", account=self.account)
+        self.client = Client()
+        self.client.login(username='sessionuser', password='password')
+
+    def session_writes(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertIn(response.status_code, (200, 302))
+        return [
+            q["sql"] for q in ctx.captured_queries
+            if "django_session" in q["sql"] and not q["sql"].startswith("SELECT")
+        ]
+
+    def test_msgpack_round_trip(self):
+        store = SessionStore()
+        store.update({"_auth_user_id": "1", "active_location_id": 3, "flags": [1, "a", None]})
+        store.save()
+        self.assertEqual(
+            dict(SessionStore(store.session_key).items()),
+            {"_auth_user_id": "1", "active_location_id": 3, "flags": [1, "a", None]},
+        )
+
+    def test_json_sessions_from_before_still_load(self):
+        store = SessionStore()
+        store.create()
+        data = signing.dumps(
+            {"_auth_user_id": "1", "active_location_id": 3},
+            salt=store.key_salt, serializer=signing.JSONSerializer, compress=True,
+        )
+        Session.objects.filter(session_key=store.session_key).update(session_data=data)
+        self.assertEqual(
+            dict(SessionStore(store.session_key).items()),
+            {"_auth_user_id": "1", "active_location_id": 3},
+        )
+
+    def test_unchanged_location_is_not_written(self):
+        # The first page stores the default location...
+        self.assertTrue(self.session_writes(reverse('item-list')))
+        # ...and later pages leave the session alone.
+        for url in (reverse('item-list'), reverse('home'), reverse('task-due-list')):
+            self.assertEqual(self.session_writes(url), [], url)
+        self.assertEqual(self.session_writes(reverse('switch-location', args=[self.home.pk])), [])
+        self.assertTrue(self.session_writes(reverse('switch-location', args=[self.cabin.pk])))
+
+    @override_settings(SESSION_ENGINE=settings.SESSION_ENGINES["signed_cookies"])
+    def test_signed_cookie_sessions(self):
+        client = Client()
+        client.login(username='sessionuser', password='password')
+        client.get(reverse('switch-location', args=[self.cabin.pk]))
+        response = client.get(reverse('item-list'))
+        self.assertEqual(response.context["active_location"], self.cabin)
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command("benchmark_sessions", requests=5, stdout=out)
+        self.assertIn("signed_cookies, msgpack", out.getvalue())
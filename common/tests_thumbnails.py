@@ -0,0 +1,173 @@
+import io
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from common import thumbnails
+from common.models import Account, Profile
+from upkeep.models import Item, Location
+
+User = get_user_model()
+
+
+def image_file(name="photo.jpg", size=(2000, 1500), fmt="JPEG", mode="RGB"):
+    buffer = io.BytesIO()
+    Image.new(mode, size, "red" if mode == "RGB" else (255, 0, 0, 128)).save(buffer, fmt)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type=f"image/{fmt.lower()}")
+
+
+class ThumbnailTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(username="thumbs", password="password")
+        self.account = Account.objects.create(name="Household", owner=self.user)
+        self.profile = Profile.objects.create(user=self.user, account=self.account)
+        self.location = Location.objects.create(name="Home", account=self.account, default=True)
+        self.client.login(username="thumbs", password="password")
+
+    def files(self):
+        return sorted(
+            os.path.relpath(os.path.join(root, name), self.media_root)
+            for root, _, names in os.walk(self.media_root)
+            for name in names
+        )
+
+    def url(self, obj, kind, size=320, fmt="webp"):
+        _, _, digest_field = thumbnails.KINDS[kind]
+        return reverse("thumbnail", args=[kind, obj.pk, getattr(obj, digest_field), size, fmt])
+
+    def test_upload_generates_thumbnails(self):
+        self.client.post(
+            reverse("settings-view"),
+            {"update_profile": "", "full_name": "Thumbs", "profile_picture": image_file()},
+        )
+        self.profile.refresh_from_db()
+        digest = self.profile.profile_picture_digest
+        self.assertEqual(len(digest), 16)
+        base = os.path.splitext(self.profile.profile_picture.name)[0]
+        self.assertEqual(
+            self.files(),
+            sorted(
+                [self.profile.profile_picture.name]
+                + [f"{base}.{digest}.{size}.{fmt}" for size in thumbnails.SIZES for fmt in thumbnails.FORMATS]
+            ),
+        )
+        with Image.open(os.path.join(self.media_root, f"{base}.{digest}.320.webp")) as image:
+            self.assertEqual(image.format, "WEBP")
+            self.assertEqual(image.size, (320, 240))
+
+        response = self.client.get(reverse("settings-view"))
+        self.assertContains(response, self.url(self.profile, "profile", 96))
+
+    def test_non_image_receipt(self):
+        item = Item.objects.create(
+            name="Boiler",
+            location=self.location,
+            receipt_file=SimpleUploadedFile("receipt.pdf", b"%PDF-1.4\n", content_type="application/pdf"),
+        )
+        self.assertEqual(item.receipt_digest, "")
+        self.assertEqual(self.files(), [item.receipt_file.name])
+
+    def test_replacing_and_clearing(self):
+        item = Item.objects.create(name="Boiler", location=self.location, receipt_file=image_file())
+        first = item.receipt_digest
+        item.receipt_file = image_file(size=(900, 1600))
+        item.save()
+        self.assertNotEqual(item.receipt_digest, first)
+        # Other saves keep the digest without rehashing.
+        item.name = "Old boiler"
+        item.save()
+        self.assertEqual(Item.objects.get(pk=item.pk).receipt_digest, item.receipt_digest)
+        item.receipt_file = None
+        item.save()
+        self.assertEqual(item.receipt_digest, "")
+
+    def test_transparent_png_as_jpeg(self):
+        item = Item.objects.create(
+            name="Boiler", location=self.location, receipt_file=image_file("scan.png", fmt="PNG", mode="RGBA")
+        )
+        response = self.client.get(self.url(item, "receipt", 96, "jpeg"))
+        self.assertEqual(response["Content-Type"], "image/jpeg")
+        with Image.open(io.BytesIO(response.content)) as image:
+            self.assertEqual(image.mode, "RGB")
+
+    def test_serve(self):
+        item = Item.objects.create(name="Boiler", location=self.location, receipt_file=image_file())
+        response = self.client.get(self.url(item, "receipt"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/webp")
+        self.assertEqual(response["Cache-Control"], "private, max-age=31536000, immutable")
+
+        response = self.client.get(reverse("item-detail", args=[item.pk]))
+        self.assertContains(response, self.url(item, "receipt", 320, "jpeg"))
+
+        # A missing thumbnail is generated on first request.
+        name = thumbnails.thumbnail_name(item.receipt_file.name, item.receipt_digest, 1280, "jpeg")
+        item.receipt_file.storage.delete(name)
+        self.assertEqual(self.client.get(self.url(item, "receipt", 1280, "jpeg")).status_code, 200)
+        self.assertTrue(item.receipt_file.storage.exists(name))
+
+        for url in (
+            reverse("thumbnail", args=["receipt", item.pk, "0" * 16, 320, "webp"]),
+            reverse("thumbnail", args=["receipt", item.pk, item.receipt_digest, 321, "webp"]),
+            reverse("thumbnail", args=["receipt", item.pk, item.receipt_digest, 320, "gif"]),
+            reverse("thumbnail", args=["invoice", item.pk, item.receipt_digest, 320, "webp"]),
+        ):
+            self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_other_household(self):
+        other = User.objects.create_user(username="neighbour", password="password")
+        account = Account.objects.create(name="Neighbours", owner=other)
+        profile = Profile.objects.create(user=other, account=account, profile_picture=image_file())
+        location = Location.objects.create(name="Next door", account=account, default=True)
+        item = Item.objects.create(name="Boiler", location=location, receipt_file=image_file())
+        self.assertEqual(self.client.get(self.url(item, "receipt")).status_code, 404)
+        self.assertEqual(self.client.get(self.url(profile, "profile")).status_code, 404)
+
+        profile.account = self.account
+        profile.save()
+        self.assertEqual(self.client.get(self.url(profile, "profile")).status_code, 200)
+
+    def test_backfill(self):
+        item = Item.objects.create(name="Boiler", location=self.location, receipt_file=image_file())
+        pdf = Item.objects.create(
+            name="Pump",
+            location=self.location,
+            receipt_file=SimpleUploadedFile("receipt.pdf", b"%PDF-1.4\n"),
+        )
+        missing = Item.objects.create(name="Fan", location=self.location, receipt_file="receipts/gone.jpg")
+        # Uploaded before thumbnails existed.
+        digest = item.receipt_digest
+        Item.objects.filter(pk=item.pk).update(receipt_digest="")
+        for size in thumbnails.SIZES:
+            for fmt in thumbnails.FORMATS:
+                item.receipt_file.storage.delete(
+                    thumbnails.thumbnail_name(item.receipt_file.name, digest, size, fmt)
+                )
+
+        out, err = StringIO(), StringIO()
+        call_command("generate_thumbnails", kind=["receipt"], stdout=out, stderr=err)
+        self.assertIn("receipt: generated 6 thumbnail(s), skipped 1 file(s).", out.getvalue())
+        self.assertIn("gone.jpg is missing", err.getvalue())
+        item.refresh_from_db()
+        self.assertEqual(item.receipt_digest, digest)
+        self.assertEqual(thumbnails.missing(item.receipt_file, digest), [])
+        self.assertEqual(Item.objects.get(pk=pdf.pk).receipt_digest, "")
+        self.assertEqual(Item.objects.get(pk=missing.pk).receipt_digest, "")
+
+        # Nothing left to do.
+        call_command("generate_thumbnails", kind=["receipt"], stdout=out, stderr=err)
+        self.assertIn("receipt: generated 0 thumbnail(s), skipped 1 file(s).", out.getvalue())
@@ -0,0 +1,145 @@
+"""
+Thumbnails of uploaded images (profile pictures, photographed receipts) in
+a few fixed sizes, as WebP and JPEG, so pages never load a phone photo of
+several megabytes to show it a few hundred pixels wide.
+
+A thumbnail is stored next to its original under a name that carries the
+SHA-256 of the original's content, e.g. ``receipts/boiler.3f2a9c1b7e4d0a6f.320.webp``.
+The digest is kept on the model (``*_digest``, empty for files that aren't
+images), so the thumbnail URLs change whenever the image does and can be
+cached for good. Thumbnails are generated when the file is uploaded (see
+``before_save``/``after_save``), on first request if one is missing, and
+for older uploads by the ``generate_thumbnails`` command.
+"""
+
+import hashlib
+import io
+import logging
+import os
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+# Bounding boxes in pixels: avatars, previews, and a full-screen view.
+SIZES = (96, 320, 1280)
+
+# Format -> (Pillow format, content type, save options)
+FORMATS = {
+    "webp": ("WEBP", "image/webp", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", "image/jpeg", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+# What decoding an unreadable or oversized image raises.
+ERRORS = (OSError, Image.DecompressionBombError)
+
+# Kind (in the URL) -> (model, file field, digest field)
+KINDS = {
+    "profile": ("common.Profile", "profile_picture", "profile_picture_digest"),
+    "receipt": ("upkeep.Item", "receipt_file", "receipt_digest"),
+}
+
+
+def kind_model(kind):
+    label, field, digest_field = KINDS[kind]
+    return apps.get_model(label), field, digest_field
+
+
+def thumbnail_name(name, digest, size, fmt):
+    return f"{os.path.splitext(name)[0]}.{digest}.{size}.{fmt}"
+
+
+def image_digest(file):
+    """
+    The content digest of ``file`` if Pillow recognises it as an image, else
+    "" (e.g. a PDF receipt). Only reads the header to tell.
+    """
+    try:
+        file.seek(0)
+        with Image.open(file):
+            pass
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        return ""
+    file.seek(0)
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: file.read(1 << 16), b""):
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()[:16]
+
+
+def before_save(instance, field, digest_field):
+    """
+    Call from ``save()`` before saving: refreshes the digest for a newly
+    uploaded (or cleared) file. Returns True when ``after_save`` has
+    thumbnails to generate.
+    """
+    fieldfile = getattr(instance, field)
+    if not fieldfile:
+        setattr(instance, digest_field, "")
+        return False
+    if fieldfile._committed:
+        return False
+    setattr(instance, digest_field, image_digest(fieldfile.file))
+    return bool(getattr(instance, digest_field))
+
+
+def after_save(instance, field, digest_field):
+    fieldfile = getattr(instance, field)
+    try:
+        generate(fieldfile, getattr(instance, digest_field))
+    except ERRORS:
+        # Served lazily (and retried) by the thumbnail view instead.
+        logger.warning("Could not generate the thumbnails of %s", fieldfile.name, exc_info=True)
+
+
+def missing(fieldfile, digest):
+    return [
+        (size, fmt)
+        for size in SIZES
+        for fmt in FORMATS
+        if not fieldfile.storage.exists(thumbnail_name(fieldfile.name, digest, size, fmt))
+    ]
+
+
+def generate(fieldfile, digest):
+    """
+    Writes the thumbnails of ``fieldfile`` that don't exist yet, decoding
+    the original once for all of them. Returns their names.
+    """
+    wanted = missing(fieldfile, digest)
+    if not wanted:
+        return []
+    storage = fieldfile.storage
+    with storage.open(fieldfile.name, "rb") as f, Image.open(f) as original:
+        # JPEGs can be decoded at a fraction of their size, which is much
+        # faster for phone photos than decoding them in full.
+        original.draft("RGB", (max(SIZES), max(SIZES)))
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "RGBA"):
+            alpha = "A" in image.getbands() or "transparency" in image.info
+            image = image.convert("RGBA" if alpha else "RGB")
+
+        names = []
+        # Largest first, each size scaled down from the previous one.
+        for size in sorted({size for size, _ in wanted}, reverse=True):
+            image.thumbnail((size, size), Image.Resampling.LANCZOS, reducing_gap=3.0)
+            for fmt in FORMATS:
+                if (size, fmt) in wanted:
+                    name = thumbnail_name(fieldfile.name, digest, size, fmt)
+                    names.append(storage.save(name, ContentFile(_encode(image, fmt))))
+        return names
+
+
+def _encode(image, fmt):
+    pillow_format, _, options = FORMATS[fmt]
+    if pillow_format == "JPEG" and image.mode == "RGBA":
+        # JPEG has no alpha channel: flatten onto white.
+        background = Image.new("RGB", image.size, "white")
+        background.paste(image, mask=image.getchannel("A"))
+        image = background
+    buffer = io.BytesIO()
+    image.save(buffer, pillow_format, **options)
+    return buffer.getvalue()
@@ -3,4 +3,9 @@ from . import views
 
 urlpatterns = [
     path("", views.home, name="home"),
+    path(
+        "thumbnails/<str:kind>/<int:pk>/<str:digest>/<int:size>.<str:fmt>",
+        views.thumbnail,
+        name="thumbnail",
+    ),
 ]
@@ -0,0 +1,65 @@
+"""
+Gunicorn settings for the container (see the Dockerfile), read by gunicorn
+from the working directory.
+
+SERVER_MODE picks how the app is served:
+
+* ``asgi`` (default): ``core.asgi`` on uvicorn workers. The list pages and
+  the dashboard are async views, so one worker keeps serving other requests
+  while one of them waits on the database, and request bodies (receipt
+  uploads, imports) are read by the event loop before a view runs.
+* ``wsgi``: ``core.wsgi`` on threaded sync workers, e.g. to compare the two
+  (see ``benchmark_servers``).
+
+Every setting can be overridden with the usual GUNICORN_CMD_ARGS. The app
+is loaded in each worker (no preload_app), so every worker gets its own
+database connection pool.
+"""
+
+import multiprocessing
+import os
+
+server_mode = os.environ.get("SERVER_MODE", "asgi")
+if server_mode not in ("asgi", "wsgi"):
+    raise RuntimeError(f"SERVER_MODE must be 'asgi' or 'wsgi', not {server_mode!r}")
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+cores = multiprocessing.cpu_count()
+if server_mode == "asgi":
+    wsgi_app = "core.asgi:application"
+    worker_class = "uvicorn_worker.UvicornWorker"
+    # One event loop per core already overlaps the waits.
+    workers = int(os.environ.get("WEB_CONCURRENCY", str(cores)))
+else:
+    wsgi_app = "core.wsgi:application"
+    # gthread, unlike the plain sync worker, keeps connections alive.
+    worker_class = "gthread"
+    workers = int(os.environ.get("WEB_CONCURRENCY", str(2 * cores + 1)))
+    threads = int(os.environ.get("WEB_THREADS", "4"))
+
+# Longer than the idle timeout of the proxy in front, so it never reuses a
+# connection gunicorn is closing.
+keepalive = int(os.environ.get("WEB_KEEPALIVE", "75"))
+
+# Recycle workers now and then to cap slow memory growth; the jitter keeps
+# them from restarting all at once.
+max_requests = int(os.environ.get("WEB_MAX_REQUESTS", "1000"))
+max_requests_jitter = max_requests // 10
+
+# Imports of large files run inside the request.
+timeout = int(os.environ.get("WEB_TIMEOUT", "300"))
+graceful_timeout = 30
+
+
+def post_worker_init(worker):
+    # Connect before taking requests rather than on the first ones.
+    from common.db import open_pools
+
+    open_pools()
+
+
+def worker_exit(server, worker):
+    from common.db import close_pools
+
+    close_pools()
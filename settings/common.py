@@ -1,4 +1,5 @@
 import environ
+import importlib.util
 import os
 from pathlib import Path
 
@@ -20,17 +21,22 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "django.contrib.humanize",
+    "django.contrib.postgres",
     "django_htmx",
     "common",
     "upkeep",
 ]
 
 MIDDLEWARE = [
+    # First, so its timings cover the other middleware; removes itself
+    # unless REQUEST_METRICS is on.
+    "common.instrumentation.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "upkeep.middleware.ActiveLocationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "django_htmx.middleware.HtmxMiddleware",
@@ -38,6 +44,24 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = "core.urls"
 
+# Per-request query count and database, template and view time as a
+# Server-Timing header and log fields (common.instrumentation); SQL repeated
+# REQUEST_METRICS_DUPLICATES times in one request is logged as a warning.
+REQUEST_METRICS = env.bool("REQUEST_METRICS", default=False)
+REQUEST_METRICS_DUPLICATES = env.int("REQUEST_METRICS_DUPLICATES", default=3)
+
+# AccountBackend loads user, profile and account in one query (see
+# common.backends) and signs everyone in from now on. ModelBackend stays so
+# the sessions it signed in before keep working until they expire.
+AUTHENTICATION_BACKENDS = [
+    "common.backends.AccountBackend",
+    "django.contrib.auth.backends.ModelBackend",
+]
+
+# Seconds to cache the loaded user between requests; 0 disables. Only enable
+# with a cache shared by all workers.
+AUTH_USER_CACHE_TIMEOUT = env.int("AUTH_USER_CACHE_TIMEOUT", default=0)
+
 LOGIN_URL = "/login/"
 LOGOUT_URL = "/logout/"
 LOGIN_REDIRECT_URL = "/"
@@ -70,8 +94,64 @@ DATABASES = {
         "PASSWORD": env("DATABASE_PASSWORD", default="password"),
         "HOST": env("DATABASE_HOST", default="dbhost"),
         "PORT": env("DATABASE_PORT", default="5432"),
+        # Test a reused connection before handing it out.
+        "CONN_HEALTH_CHECKS": True,
+    }
+}
+
+# Connection reuse. By default each worker process keeps a psycopg pool of
+# DATABASE_POOL_MIN_SIZE to DATABASE_POOL_MAX_SIZE connections, opened at
+# worker boot (see gunicorn.conf.py). At worst every pool is full: with the
+# default 8 and one ASGI worker per core that is 8 x cores connections, which
+# must stay below the server's max_connections.
+#
+# With DATABASE_POOL=false, or without psycopg_pool installed, each thread
+# keeps its connection open for DATABASE_CONN_MAX_AGE seconds instead (0
+# reconnects on every request). That defaults to 0 under ASGI (SERVER_MODE,
+# as in gunicorn.conf.py), where requests run their ORM calls in new threads
+# and persistent connections would pile up, one per thread.
+DATABASE_POOL = env.bool("DATABASE_POOL", default=True) and bool(
+    importlib.util.find_spec("psycopg_pool")
+)
+if DATABASE_POOL:
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": env.int("DATABASE_POOL_MIN_SIZE", default=2),
+            "max_size": env.int("DATABASE_POOL_MAX_SIZE", default=8),
+            # Seconds a request waits for a free connection before failing.
+            "timeout": env.float("DATABASE_POOL_TIMEOUT", default=10),
+            "max_idle": 300,
+            "max_lifetime": 1800,
+        }
     }
+else:
+    DATABASES["default"]["CONN_MAX_AGE"] = env.int(
+        "DATABASE_CONN_MAX_AGE", default=0 if env("SERVER_MODE", default="asgi") == "asgi" else 60
+    )
+
+# Shared cache for cached_db sessions and the user cache; point CACHE_URL at
+# Redis or Memcached when running more than one worker.
+CACHES = {
+    "default": env.cache("CACHE_URL", default="locmemcache://"),
+    # Rendered list rows (upkeep.fragments): many small, short-lived entries.
+    "fragments": env.cache(
+        "FRAGMENT_CACHE_URL", default="locmemcache://fragments?max_entries=10000"
+    ),
 }
+FRAGMENT_CACHE = "fragments"
+FRAGMENT_CACHE_TIMEOUT = env.int("FRAGMENT_CACHE_TIMEOUT", default=24 * 60 * 60)
+
+# Session storage, selected per environment with SESSION_ENGINE_MODE.
+SESSION_ENGINES = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+}
+SESSION_SERIALIZER = "common.serializers.MsgPackSerializer"
+
+# Renderer for task descriptions: "python-markdown" or "markdown-it" (see
+# upkeep.rendering). Run render_task_descriptions --all after changing it.
+MARKDOWN_ENGINE = env("MARKDOWN_ENGINE", default="python-markdown")
 
 AUTH_PASSWORD_VALIDATORS = [
     {
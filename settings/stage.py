@@ -6,17 +6,19 @@ ALLOWED_HOSTS = ["*"]
 
 CSRF_TRUSTED_ORIGINS = ["https://*.dkms.se"]
 
+# Database sessions by default, so logging out or changing the password ends
+# them server-side. cached_db needs a shared CACHE_URL once there is more
+# than one worker; signed_cookies needs no storage but can't be revoked.
+SESSION_ENGINE = SESSION_ENGINES[env("SESSION_ENGINE_MODE", default="db")]  # noqa: F405
+
 
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
     "formatters": {
         "json": {
-            "format": (
-                '{{"level": "{levelname}", "time": "{asctime}", '
-                '"module": "{module}", "message": "{message}"}}'
-            ),
-            "style": "{",
+            # Also logs the structured fields passed with ``extra``.
+            "()": "common.jsonlog.JSONFormatter",
         },
     },
     "handlers": {
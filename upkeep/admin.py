@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Item, Task, Location
+from .models import Item, Task, Location, LocationStats
 
 @admin.register(Location)
 class LocationAdmin(admin.ModelAdmin):
@@ -15,3 +15,8 @@ class ItemAdmin(admin.ModelAdmin):
 class TaskAdmin(admin.ModelAdmin):
     list_display = ("name", "item", "frequency", "next_due_date")
     list_filter = ("item__location__account", "frequency")
+
+
+@admin.register(LocationStats)
+class LocationStatsAdmin(admin.ModelAdmin):
+    list_display = ("location", "computed_on", "total_active_items", "overdue_tasks_count")
@@ -1,6 +1,29 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_migrate, post_save
 
 
 class UpkeepConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'upkeep'
+
+    def ready(self):
+        from . import changes, stats
+        from .models import Item, Location, Task
+        from .search import ensure_sqlite_triggers
+
+        post_migrate.connect(ensure_sqlite_triggers, sender=self)
+
+        # Date deletions and moves away from a location on the location
+        # itself; connected first, as the stats handlers re-snapshot the
+        # tracked fields
+        post_save.connect(changes.item_saved, sender=Item)
+        post_save.connect(changes.task_saved, sender=Task)
+        post_delete.connect(changes.item_deleted, sender=Item)
+        post_delete.connect(changes.task_deleted, sender=Task)
+
+        # Keep LocationStats in step with the rows it counts
+        post_save.connect(stats.location_saved, sender=Location)
+        post_save.connect(stats.item_saved, sender=Item)
+        post_delete.connect(stats.item_deleted, sender=Item)
+        post_save.connect(stats.task_saved, sender=Task)
+        post_delete.connect(stats.task_deleted, sender=Task)
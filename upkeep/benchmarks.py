@@ -0,0 +1,95 @@
+"""
+Helpers shared by the benchmark_* management commands: the household they
+seed (from upkeep.synthetic), session cookies for the clients they
+simulate, latency percentiles, and rolling back the data they seed.
+"""
+
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import transaction
+from django.test import Client
+from django.urls import reverse
+
+from .models import Location
+from .synthetic import delete_households, generate_households
+
+
+def seed_household(prefix=None, **options):
+    """
+    Generates a synthetic household with one member and one location (see
+    upkeep.synthetic; ``options`` are items, tasks_per_item and seed).
+    Returns the member and the location.
+    """
+    prefix = prefix or benchmark_prefix()
+    (account,) = generate_households(prefix, accounts=1, members=1, locations=1, **options)
+    return account.owner, Location.objects.get(account=account)
+
+
+@contextmanager
+def throwaway_household(**options):
+    """
+    seed_household, deleted again afterwards, for data that other threads
+    or processes must see (and so can't be rolled back).
+    """
+    prefix = benchmark_prefix()
+    try:
+        yield seed_household(prefix, **options)
+    finally:
+        delete_households(prefix)
+
+
+def benchmark_prefix():
+    return f"benchmark-{uuid.uuid4().hex[:12]}"
+
+
+def session_cookies(user, csrf=False):
+    """
+    The cookies (name -> value) of a session logged in as ``user``. With
+    ``csrf``, the first page is loaded so there is a CSRF cookie as well.
+    """
+    client = Client()
+    client.force_login(user)
+    if csrf:
+        client.get(reverse("home"))
+    return {name: morsel.value for name, morsel in client.cookies.items()}
+
+
+def session_cookie(user):
+    """
+    A Cookie header logging in as ``user``.
+    """
+    name = settings.SESSION_COOKIE_NAME
+    return f"{name}={session_cookies(user)[name]}"
+
+
+def cookie_header(cookies):
+    return "; ".join(f"{name}={value}" for name, value in cookies.items())
+
+
+def percentile(timings, p):
+    """
+    The ``p`` percentile (0-1) of the sorted ``timings``, or None if empty.
+    """
+    if not timings:
+        return None
+    return timings[min(len(timings) - 1, int(len(timings) * p))]
+
+
+class Rollback(Exception):
+    pass
+
+
+@contextmanager
+def rolled_back():
+    """
+    Runs the block in a transaction that is always rolled back, so nothing
+    it seeds is kept.
+    """
+    try:
+        with transaction.atomic():
+            yield
+            raise Rollback
+    except Rollback:
+        pass
@@ -0,0 +1,203 @@
+"""
+Change markers for a location, and the conditional GET handling built on
+them.
+
+Location.updated_at doubles as the location's change marker: besides edits
+of the location itself, it moves whenever one of its items or tasks is
+deleted or moved to another location, which the ``updated_at`` of the rows
+left behind would not show. Together with the latest ``updated_at`` of its
+items and tasks it dates the last change to anything in the location (see
+``location_marker`` and upkeep.ical).
+
+Like the LocationStats handlers, this relies on model signals: queryset
+``update()`` calls that move or delete rows must touch the locations
+themselves.
+"""
+
+import datetime
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.contrib import messages
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import http_date
+
+from .middleware import aprepare_request, get_active_location, get_user_locations
+from .models import Item, Location, Task
+from .stats import _deleted_by, _item_location_id
+
+
+def touch_locations(location_ids):
+    ids = {pk for pk in location_ids if pk is not None}
+    if ids:
+        Location.objects.filter(pk__in=ids).update(updated_at=timezone.now())
+
+
+def item_saved(sender, instance, created, **kwargs):
+    # Runs before stats.item_saved, which takes a new snapshot.
+    old_location_id = instance.loaded_value("location_id", instance.location_id)
+    if not created and old_location_id != instance.location_id:
+        touch_locations([old_location_id])
+
+
+def item_deleted(sender, instance, origin=None, **kwargs):
+    if _deleted_by(origin, Item):
+        touch_locations([instance.loaded_value("location_id", instance.location_id)])
+
+
+def task_saved(sender, instance, created, **kwargs):
+    # Runs before stats.task_saved, which takes a new snapshot.
+    old_item_id = instance.loaded_value("item_id", instance.item_id)
+    if not created and old_item_id != instance.item_id:
+        touch_locations([_item_location_id(instance, old_item_id)])
+
+
+def task_deleted(sender, instance, origin=None, **kwargs):
+    if _deleted_by(origin, Task):
+        item_id = instance.loaded_value("item_id", instance.item_id)
+        touch_locations([_item_location_id(instance, item_id)])
+
+
+def location_marker(location):
+    """
+    The latest ``updated_at`` of the location's items and of its tasks (None
+    when there are none), in one query.
+    """
+    latest = Item.objects.filter(location=location).aggregate(
+        items=Max("updated_at"), tasks=Max("tasks__updated_at")
+    )
+    return latest["items"], latest["tasks"]
+
+
+async def alocation_marker(location):
+    latest = await Item.objects.filter(location=location).aaggregate(
+        items=Max("updated_at"), tasks=Max("tasks__updated_at")
+    )
+    return latest["items"], latest["tasks"]
+
+
+# Request headers that select a different rendering of the same URL.
+HTMX_HEADERS = ("HX-Request", "HX-Target", "HX-Boosted", "HX-History-Restore-Request")
+
+
+def page_validators(request, page):
+    """
+    The (ETag, Last-Modified) pair of a page of the active location, or None
+    when the page must be rendered anyway: pending messages are only shown
+    by a fresh render, and a client without a CSRF cookie gets a new one
+    with the page.
+
+    The ETag covers everything such a page is rendered from: the location's
+    marker, the account's locations (the location switcher), the current
+    day (due dates and badges), the session and CSRF token embedded in the
+    page's forms, the query string and the HTMX headers.
+    """
+    if not _cacheable(request):
+        return None
+    active_location = get_active_location(request)
+    marker = location_marker(active_location) if active_location else (None, None)
+    return _validators(request, page, get_user_locations(request), active_location, marker)
+
+
+async def apage_validators(request, page):
+    """
+    ``page_validators`` for async views; ``aprepare_request`` must have run.
+    """
+    if not _cacheable(request):
+        return None
+    active_location = request._cached_active_location
+    marker = await alocation_marker(active_location) if active_location else (None, None)
+    return _validators(
+        request, page, request._cached_user_locations, active_location, marker
+    )
+
+
+def _cacheable(request):
+    return request.META.get("CSRF_COOKIE") and not len(messages.get_messages(request))
+
+
+def _validators(request, page, locations, active_location, marker):
+    today = timezone.localdate()
+    midnight = timezone.make_aware(datetime.datetime.combine(today, datetime.time()))
+    changes = [location.updated_at for location in locations] + [*marker, midnight]
+    last_modified = max(change for change in changes if change is not None)
+
+    key = "|".join(
+        str(value)
+        for value in (
+            page,
+            request.user.pk,
+            request.session.session_key,
+            request.META["CSRF_COOKIE"],
+            active_location and active_location.pk,
+            [(location.pk, location.name, location.updated_at) for location in locations],
+            marker,
+            today,
+            sorted(request.GET.lists()),
+            [request.headers.get(header) for header in HTMX_HEADERS],
+        )
+    )
+    etag = f'"{hashlib.blake2b(key.encode(), digest_size=16).hexdigest()}"'
+    return etag, last_modified
+
+
+def conditional_page(view):
+    """
+    Answers a GET for a page of the active location with 304 Not Modified,
+    before the view runs, when the client's copy is still current.
+
+    Only If-None-Match is honoured: a page also varies with the session and
+    the query string, which Last-Modified alone cannot tell apart. Responses
+    vary on HX-Request (full page or partial) and must be revalidated on
+    every use. Wraps sync and async views alike.
+    """
+
+    if iscoroutinefunction(view):
+
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            validators = None
+            if request.method in ("GET", "HEAD"):
+                await aprepare_request(request)
+                validators = await apage_validators(request, view.__name__)
+
+            response = None
+            if validators:
+                response = get_conditional_response(request, etag=validators[0])
+            if response is None:
+                response = await view(request, *args, **kwargs)
+            return _patch_response(response, validators)
+
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        validators = None
+        if request.method in ("GET", "HEAD"):
+            validators = page_validators(request, view.__name__)
+
+        response = None
+        if validators:
+            response = get_conditional_response(request, etag=validators[0])
+        if response is None:
+            response = view(request, *args, **kwargs)
+        return _patch_response(response, validators)
+
+    return wrapper
+
+
+def _patch_response(response, validators):
+    if validators and response.status_code in (200, 304):
+        etag, last_modified = validators
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    patch_vary_headers(response, ("HX-Request",))
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
@@ -0,0 +1,161 @@
+"""
+CSV and JSON Lines exports of items and tasks, for one location or a whole
+account.
+
+Rows are read with ``values_list(...).iterator(chunk_size=...)`` (a
+server-side cursor on PostgreSQL) and written as they arrive, so memory
+stays flat whatever the size of the export. Lines are handed out in chunks
+of a few hundred rows rather than one by one, which keeps the per-chunk
+overhead of a streaming response low. Under ASGI the same chunks come from
+``aexport_chunks``, an async iterator, since Django would otherwise buffer
+a sync one in full before sending it.
+
+The columns are the importer's field names, with ``type`` set, so an export
+can be imported again (see upkeep.importer); the extra columns (ids,
+status, derived dates) are ignored on import.
+"""
+
+import csv
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Item, Task
+
+CONTENT_TYPES = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+}
+DATASETS = ("items", "tasks")
+CHUNK_SIZE = 2000
+ROWS_PER_WRITE = 500
+
+ITEM_COLUMNS = [
+    ("type", None),
+    ("id", "pk"),
+    ("name", "name"),
+    ("location", "location__name"),
+    ("area", "area"),
+    ("status", "status"),
+    ("quantity", "quantity"),
+    ("brand", "brand"),
+    ("model_number", "model_number"),
+    ("serial_number", "serial_number"),
+    ("purchase_value", "purchase_value"),
+    ("purchase_place", "purchase_place"),
+    ("purchase_year", "purchase_year"),
+    ("warranty_expiration", "warranty_expiration"),
+    ("end_of_service_date", "end_of_service_date"),
+    ("manufacturer_manual_url", "manufacturer_manual_url"),
+    ("notes", "notes"),
+]
+TASK_COLUMNS = [
+    ("type", None),
+    ("id", "pk"),
+    ("name", "name"),
+    # The importer finds the item by serial number, or else by name.
+    ("item", None),
+    ("item_name", "item__name"),
+    ("item_serial_number", "item__serial_number"),
+    ("location", "item__location__name"),
+    ("frequency", "frequency"),
+    ("estimated_hours_to_complete", "estimated_hours_to_complete"),
+    ("last_performed", "last_performed"),
+    ("next_due_date", "next_due_date"),
+    ("snoozed_until", "snoozed_until"),
+    ("snooze_count", "snooze_count"),
+    ("effective_due_date", "effective_due_date"),
+    ("description", "description"),
+]
+STATUS_LABELS = dict(Item.ItemStatus.choices)
+STATUS_INDEX = [name for name, _ in ITEM_COLUMNS].index("status")
+
+
+def item_rows(location=None, account=None):
+    items = Item.objects.all()
+    if location is not None:
+        items = items.filter(location=location)
+    else:
+        items = items.filter(location__account=account)
+    fields = [field for _, field in ITEM_COLUMNS if field]
+    rows = items.order_by("location__name", "name", "pk").values_list(*fields)
+    for row in rows.iterator(chunk_size=CHUNK_SIZE):
+        row = ["item", *row]
+        row[STATUS_INDEX] = STATUS_LABELS.get(row[STATUS_INDEX], row[STATUS_INDEX])
+        yield row
+
+
+def task_rows(location=None, account=None):
+    tasks = Task.objects.all()
+    if location is not None:
+        tasks = tasks.filter(item__location=location)
+    else:
+        tasks = tasks.filter(item__location__account=account)
+    fields = [field for _, field in TASK_COLUMNS if field]
+    rows = tasks.order_by("item__location__name", "item__name", "name", "pk").values_list(*fields)
+    for pk, name, item_name, serial_number, *rest in rows.iterator(chunk_size=CHUNK_SIZE):
+        yield ["task", pk, name, serial_number or item_name, item_name, serial_number, *rest]
+
+
+DATASET_ROWS = {
+    "items": (ITEM_COLUMNS, item_rows),
+    "tasks": (TASK_COLUMNS, task_rows),
+}
+
+
+class _Line:
+    """
+    A write-only file for csv.writer that hands back the line instead of
+    storing it.
+    """
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(header, rows):
+    writer = csv.writer(_Line())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def jsonl_lines(header, rows):
+    encoder = DjangoJSONEncoder()
+    for row in rows:
+        yield encoder.encode(dict(zip(header, row))) + "\n"
+
+
+LINE_WRITERS = {"csv": csv_lines, "jsonl": jsonl_lines}
+
+
+def export_chunks(dataset, fmt, location=None, account=None):
+    """
+    Yields the export as strings of up to ROWS_PER_WRITE lines.
+    """
+    columns, rows = DATASET_ROWS[dataset]
+    header = [name for name, _ in columns]
+    lines = []
+    for line in LINE_WRITERS[fmt](header, rows(location=location, account=account)):
+        lines.append(line)
+        if len(lines) >= ROWS_PER_WRITE:
+            yield "".join(lines)
+            lines = []
+    if lines:
+        yield "".join(lines)
+
+
+async def aexport_chunks(dataset, fmt, location=None, account=None):
+    """
+    export_chunks as an async iterator, for streaming responses under ASGI.
+    Each chunk is produced in the request's sync thread, so the database
+    cursor stays on the connection that opened it.
+    """
+    chunks = export_chunks(dataset, fmt, location=location, account=account)
+    next_chunk = sync_to_async(next)
+    done = object()
+    try:
+        while (chunk := await next_chunk(chunks, done)) is not done:
+            yield chunk
+    finally:
+        await sync_to_async(chunks.close)()
@@ -0,0 +1,147 @@
+"""
+Workload forecast: the maintenance hours due on each day of a horizon,
+counting every recurrence of every task.
+
+A task is assumed to be done on the day it is due, so it comes back every
+``frequency`` days from its first due day in the horizon: its effective
+due date (the later of next_due_date and snoozed_until), or the first day
+of the horizon if that has already passed.
+
+Nothing walks the tasks one by one. The database groups them by
+(frequency, first due day) and sums their hours, which leaves at most one
+row per frequency and day whatever the number of tasks. Each frequency's
+hours by first due day are then expanded into hours due per day with one
+strided running sum, ``due[d] = starts[d] + due[d - frequency]``, so the
+Python work is proportional to the horizon times the seven frequencies.
+"""
+
+import datetime
+from dataclasses import dataclass
+
+from django.db.models import Count, DateField, Q, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+
+DEFAULT_DAYS = 365
+MAX_DAYS = 2 * 366
+
+
+@dataclass(frozen=True)
+class ForecastPeriod:
+    start: datetime.date
+    hours: int
+    tasks: int
+
+    def as_dict(self):
+        return {"start": self.start.isoformat(), "hours": self.hours, "tasks": self.tasks}
+
+
+@dataclass(frozen=True)
+class Forecast:
+    start: datetime.date
+    days: list
+    weeks: list
+
+    @property
+    def end(self):
+        """
+        The last day of the horizon.
+        """
+        return self.start + datetime.timedelta(days=len(self.days) - 1)
+
+    @property
+    def total_hours(self):
+        return sum(day.hours for day in self.days)
+
+    @property
+    def total_tasks(self):
+        return sum(day.tasks for day in self.days)
+
+    def as_dict(self):
+        return {
+            "start": self.start.isoformat(),
+            "end": self.end.isoformat(),
+            "total_hours": self.total_hours,
+            "total_tasks": self.total_tasks,
+            "days": [day.as_dict() for day in self.days],
+            "weeks": [week.as_dict() for week in self.weeks],
+        }
+
+
+def occurrences(effective_due_date, frequency, start, days):
+    """
+    How many times one task is due in the ``days`` days from ``start``; the
+    per-task mirror of ``forecast`` for the incremental dashboard counters.
+    """
+    first = max(effective_due_date or start, start)
+    offset = (first - start).days
+    if offset >= days:
+        return 0
+    if not frequency or frequency <= 0:
+        return 1
+    return (days - 1 - offset) // frequency + 1
+
+
+def _starts(tasks, start, days):
+    """
+    Hours and task counts by frequency and first due day (as an offset from
+    ``start``), aggregated in the database.
+    """
+    start_value = Value(start, output_field=DateField())
+    end = start + datetime.timedelta(days=days)
+    rows = (
+        tasks.filter(Q(effective_due_date__lt=end) | Q(effective_due_date__isnull=True))
+        .annotate(
+            first_due=Greatest(
+                Coalesce("effective_due_date", start_value), start_value, output_field=DateField()
+            )
+        )
+        .values_list("frequency", "first_due")
+        .annotate(hours=Sum(Coalesce("estimated_hours_to_complete", 0)), count=Count("id"))
+        .order_by()
+    )
+    return list(rows)
+
+
+def forecast(tasks, start, days=DEFAULT_DAYS):
+    """
+    Forecasts the workload of the Task queryset ``tasks`` for ``days`` days
+    from ``start``: hours and number of tasks due per day, and per week
+    (weeks start on Monday; the first and last may be partial).
+    """
+    hours = [0] * days
+    counts = [0] * days
+    by_frequency = {}
+    for frequency, first_due, row_hours, row_count in _starts(tasks, start, days):
+        offset = (first_due - start).days
+        if not 0 <= offset < days:
+            continue
+        starts = by_frequency.setdefault(frequency, ([0] * days, [0] * days))
+        starts[0][offset] += row_hours
+        starts[1][offset] += row_count
+
+    for frequency, (due_hours, due_counts) in by_frequency.items():
+        if frequency and frequency > 0:
+            for d in range(frequency, days):
+                due_hours[d] += due_hours[d - frequency]
+                due_counts[d] += due_counts[d - frequency]
+        hours = [a + b for a, b in zip(hours, due_hours)]
+        counts = [a + b for a, b in zip(counts, due_counts)]
+
+    day_periods = [
+        ForecastPeriod(start + datetime.timedelta(days=d), hours[d], counts[d])
+        for d in range(days)
+    ]
+    return Forecast(start=start, days=day_periods, weeks=_weeks(day_periods))
+
+
+def _weeks(days):
+    weeks = []
+    for day in days:
+        monday = day.start - datetime.timedelta(days=day.start.weekday())
+        if weeks and weeks[-1].start == monday:
+            last = weeks.pop()
+            day = ForecastPeriod(monday, last.hours + day.hours, last.tasks + day.tasks)
+        else:
+            day = ForecastPeriod(monday, day.hours, day.tasks)
+        weeks.append(day)
+    return weeks
@@ -24,12 +24,38 @@ class LocationForm(forms.ModelForm):
         }
 
 
+def location_choices(locations):
+    """
+    Returns the rendered choices for ItemForm's location select from already
+    loaded locations, so several forms in one request share one query.
+    """
+    choices = [("", "---------")]
+    choices.extend((location.pk, str(location)) for location in locations)
+    return choices
+
+
+def item_choices(items):
+    """
+    Returns the rendered choices for TaskForm's item select from already
+    loaded items, e.g. by an async view, which can't let the select query
+    while the template renders.
+    """
+    choices = [("", "---------")]
+    choices.extend((item.pk, str(item)) for item in items)
+    return choices
+
+
 class ItemForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         account = kwargs.pop("account", None)
+        choices = kwargs.pop("location_choices", None)
         super().__init__(*args, **kwargs)
         if account:
             self.fields["location"].queryset = Location.objects.filter(account=account)
+        if choices is not None:
+            # Render from the precomputed choices; the queryset is still used
+            # to validate submitted data.
+            self.fields["location"].widget.choices = choices
 
     class Meta:
         model = Item
@@ -87,9 +113,12 @@ class ItemForm(forms.ModelForm):
 class TaskForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         account = kwargs.pop("account", None)
+        choices = kwargs.pop("item_choices", None)
         super().__init__(*args, **kwargs)
         if account:
             self.fields["item"].queryset = Item.objects.filter(location__account=account)
+        if choices is not None:
+            self.fields["item"].widget.choices = choices
 
     def clean_description(self):
         description = self.cleaned_data.get("description")
@@ -143,3 +172,38 @@ class TaskForm(forms.ModelForm):
         help_texts = {
             "description": "Required format: Must include '## Tools & Parts' and '## Steps' headers."
         }
+
+
+class ItemImportForm(ItemForm):
+    """
+    ItemForm's rules for an imported row. The importer sets the location
+    itself, and files cannot be imported.
+    """
+
+    class Meta(ItemForm.Meta):
+        fields = [f for f in ItemForm.Meta.fields if f not in ("location", "receipt_file")]
+
+
+class TaskImportForm(TaskForm):
+    """
+    TaskForm's rules (including the description headers) for an imported
+    row. The importer resolves the item itself.
+    """
+
+    class Meta(TaskForm.Meta):
+        fields = [f for f in TaskForm.Meta.fields if f != "item"]
+
+
+class ImportForm(forms.Form):
+    file = forms.FileField(
+        help_text="CSV, JSON Lines (.jsonl) or YAML (.yaml).",
+        widget=forms.ClearableFileInput(
+            attrs={"class": "form-control", "accept": ".csv,.jsonl,.ndjson,.yaml,.yml"}
+        ),
+    )
+    dry_run = forms.BooleanField(
+        required=False,
+        initial=True,
+        label="Dry run (validate only, change nothing)",
+        widget=forms.CheckboxInput(attrs={"class": "form-check-input"}),
+    )
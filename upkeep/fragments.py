@@ -0,0 +1,53 @@
+"""
+Cached template fragments for the per-row markup of the list pages (item
+cards, maintenance task rows and due task cards).
+
+Each fragment depends only on its own row and the related rows it shows,
+so its cache key is built from their primary keys and ``updated_at``
+(plus today's date for fragments with date-relative badges). A change to
+any of them gives a new key; stale entries are never read again and
+expire with FRAGMENT_CACHE_TIMEOUT. The key also holds a fingerprint of
+the fragment's template source, so editing the template invalidates it
+too. Fragments must not contain per-user or per-request markup such as
+CSRF tokens.
+
+Rows that move ``updated_at`` only through ``update()``/``bulk_update()``
+must set it themselves, as the bulk task views and commands do.
+
+The fragments live in the FRAGMENT_CACHE alias; give it a shared backend
+(Redis, Memcached) when running several workers. A page fetches all its
+fragments with one ``get_many`` (see the prefetch_fragments tag) instead of
+one cache round trip per row.
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.utils import make_template_fragment_key
+from django.utils import timezone
+
+# What each fragment shows, besides any values passed to the template tags.
+FRAGMENT_KEYS = {
+    "item-card": lambda item: (item.pk, item.updated_at),
+    "task-row": lambda task: (task.pk, task.updated_at, task.item.updated_at),
+    # Under its item's header, so without the item name.
+    "item-task-row": lambda task: (task.pk, task.updated_at),
+    # The location's updated_at moves with every change in it; only its
+    # name is shown.
+    "due-task-card": lambda task: (
+        task.pk,
+        task.updated_at,
+        task.item.updated_at,
+        task.item.location.name,
+        timezone.now().date(),
+    ),
+}
+
+
+def fragment_cache():
+    return caches[settings.FRAGMENT_CACHE]
+
+
+def fragment_key(name, fingerprint, obj, vary_on=()):
+    return make_template_fragment_key(
+        f"{name}.{fingerprint}", [*FRAGMENT_KEYS[name](obj), *vary_on]
+    )
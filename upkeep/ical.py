@@ -0,0 +1,131 @@
+"""
+iCalendar (RFC 5545) feed of a location's maintenance tasks, for calendar
+apps to subscribe to.
+
+Each task with a due date is one all-day event that repeats every
+``frequency`` days. Like the workload forecast, an overdue task is shown as
+due today, and a snoozed task from its snoozed_until date.
+
+Calendar apps poll their subscriptions every few minutes, so the feed has
+cheap validators: ``feed_validators`` runs one aggregate query, and the view
+answers 304 from it without loading any task. The ETag covers everything
+the feed is rendered from: the latest ``updated_at`` of the location, its
+tasks and their items, the number of tasks (which catches deletions) and
+the current day (overdue tasks move forward at midnight).
+"""
+
+import datetime
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .models import Task
+
+CONTENT_TYPE = "text/calendar; charset=utf-8"
+PRODID = "-//Household//Upkeep//EN"
+
+
+def feed_validators(location, today=None):
+    """
+    The (ETag, Last-Modified) pair of the location's feed.
+    """
+    today = today or timezone.localdate()
+    # Items without tasks are not in the feed, so the tasks' items will do.
+    tasks = Task.objects.filter(item__location=location).aggregate(
+        tasks_changed=Max("updated_at"), items_changed=Max("item__updated_at"), count=Count("id")
+    )
+    midnight = timezone.make_aware(datetime.datetime.combine(today, datetime.time()))
+    changes = [location.updated_at, tasks["tasks_changed"], tasks["items_changed"], midnight]
+    last_modified = max(change for change in changes if change is not None)
+
+    key = "|".join(str(value) for value in (location.pk, *changes, tasks["count"]))
+    etag = f'"{hashlib.blake2b(key.encode(), digest_size=16).hexdigest()}"'
+    return etag, last_modified
+
+
+def escape(text):
+    return (
+        text.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold(line):
+    """
+    Splits a content line into lines of at most 75 octets, without cutting
+    a UTF-8 character in two.
+    """
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line
+    parts = []
+    limit = 75
+    while encoded:
+        cut = min(limit, len(encoded))
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode())
+        encoded = encoded[cut:]
+        # Continuation lines start with a space.
+        limit = 74
+    return "\r\n ".join(parts)
+
+
+def _timestamp(value):
+    return value.astimezone(datetime.UTC).strftime("%Y%m%dT%H%M%SZ")
+
+
+def task_event(task, today):
+    start = max(task.effective_due_date, today)
+    details = [f"Repeats: {task.get_frequency_display()}"]
+    if task.estimated_hours_to_complete:
+        details.append(f"Estimated time: {task.estimated_hours_to_complete} h")
+    if task.description:
+        details.append("")
+        details.append(task.description)
+    return [
+        "BEGIN:VEVENT",
+        f"UID:upkeep-task-{task.pk}",
+        f"DTSTAMP:{_timestamp(task.updated_at)}",
+        f"LAST-MODIFIED:{_timestamp(task.updated_at)}",
+        f"DTSTART;VALUE=DATE:{start:%Y%m%d}",
+        f"DTEND;VALUE=DATE:{start + datetime.timedelta(days=1):%Y%m%d}",
+        f"RRULE:FREQ=DAILY;INTERVAL={task.frequency}",
+        f"SUMMARY:{escape(f'{task.name} – {task.item.name}')}",
+        f"DESCRIPTION:{escape(chr(10).join(details))}",
+        "TRANSP:TRANSPARENT",
+        "END:VEVENT",
+    ]
+
+
+def render_feed(location, today=None):
+    """
+    The location's feed as a string, with CRLF line endings.
+    """
+    today = today or timezone.localdate()
+    tasks = (
+        Task.objects.filter(item__location=location, effective_due_date__isnull=False)
+        .select_related("item")
+        .only(
+            "name", "description", "frequency", "estimated_hours_to_complete",
+            "effective_due_date", "updated_at", "item__name",
+        )
+        .order_by("effective_due_date", "pk")
+    )
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{escape(f'{location.name} maintenance')}",
+        "REFRESH-INTERVAL;VALUE=DURATION:PT1H",
+    ]
+    for task in tasks.iterator(chunk_size=2000):
+        lines.extend(task_event(task, today))
+    lines.append("END:VCALENDAR")
+    return "".join(fold(line) + "\r\n" for line in lines)
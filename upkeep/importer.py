@@ -0,0 +1,313 @@
+"""
+Bulk import of items and tasks from CSV, JSON Lines or YAML.
+
+Records are read from the file one at a time, validated with the UI's form
+rules (ItemImportForm and TaskImportForm, so task descriptions need the
+``## Tools & Parts`` and ``## Steps`` headers) and inserted with
+bulk_create in batches. The whole import runs in one transaction: if any
+record is invalid nothing is kept, and a dry run goes through exactly the
+same steps before rolling back, so its report is what a real import does.
+
+A record is an item unless its ``type`` is ``task``. Items go to the
+import's location unless they name another location of the account in
+``location``. A task names its item in ``item``, by serial number or else
+by name, either an existing item or one earlier in the file. In JSON and
+YAML an item may instead carry its tasks in a nested ``tasks`` list.
+
+Items are deduplicated by serial number: one that already exists in the
+account, or appeared earlier in the file, is skipped together with its
+tasks, so importing the same file twice adds nothing the second time.
+"""
+
+import csv
+import json
+import os
+from dataclasses import dataclass, field
+
+import yaml
+from django.db import transaction
+
+from .forms import ItemImportForm, TaskImportForm
+from .models import Item, Location, Task
+from .stats import refresh_location_stats
+
+FORMATS = {
+    ".csv": "csv",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".yaml": "yaml",
+    ".yml": "yaml",
+}
+DEFAULT_BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 100
+
+# The C loader is several times faster when libyaml is available.
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+def detect_format(filename):
+    extension = os.path.splitext(filename)[1].lower()
+    try:
+        return FORMATS[extension]
+    except KeyError:
+        raise ImportFormatError(
+            f"Unsupported file type '{extension or filename}', expected one of "
+            f"{', '.join(sorted(FORMATS))}."
+        ) from None
+
+
+def read_csv(stream):
+    for row in csv.DictReader(stream):
+        # Empty cells are missing values, so model defaults apply.
+        yield {key.strip(): value for key, value in row.items() if key and value not in ("", None)}
+
+
+def read_jsonl(stream):
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def read_yaml(stream):
+    # Each document is one record or a list of records; documents are
+    # parsed one at a time.
+    for document in yaml.load_all(stream, Loader=YamlLoader):
+        if isinstance(document, list):
+            yield from document
+        elif document is not None:
+            yield document
+
+
+READERS = {"csv": read_csv, "jsonl": read_jsonl, "yaml": read_yaml}
+
+
+def _form_defaults(form_class):
+    model = form_class._meta.model
+    return {
+        name: model._meta.get_field(name).get_default()
+        for name in form_class.base_fields
+        if model._meta.get_field(name).has_default()
+    }
+
+
+ITEM_DEFAULTS = _form_defaults(ItemImportForm)
+TASK_DEFAULTS = _form_defaults(TaskImportForm)
+FREQUENCIES = {
+    key.lower(): value
+    for value, label in Task.Frequency.choices
+    for key in (label, Task.Frequency(value).name)
+}
+
+
+@dataclass
+class ImportReport:
+    """
+    The outcome of an import. The created counts are the records that were,
+    or in a dry run would be, inserted; nothing is kept unless ``committed``.
+    """
+
+    dry_run: bool = False
+    records: int = 0
+    items_created: int = 0
+    tasks_created: int = 0
+    items_skipped: int = 0
+    tasks_skipped: int = 0
+    error_count: int = 0
+    errors: list = field(default_factory=list)
+
+    @property
+    def ok(self):
+        return not self.error_count
+
+    @property
+    def committed(self):
+        return self.ok and not self.dry_run
+
+    def summary(self):
+        if not self.ok:
+            return f"{self.error_count} error(s) in {self.records} record(s); nothing was imported."
+        verb = "Would import" if self.dry_run else "Imported"
+        return (
+            f"{verb} {self.items_created} item(s) and {self.tasks_created} task(s) "
+            f"from {self.records} record(s); skipped {self.items_skipped} duplicate "
+            f"item(s) and {self.tasks_skipped} of their task(s)."
+        )
+
+    def add_error(self, where, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"{where}: {message}")
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Importer:
+    def __init__(self, account, location, batch_size=DEFAULT_BATCH_SIZE, dry_run=False):
+        self.account = account
+        self.location = location
+        self.batch_size = batch_size
+        self.report = ImportReport(dry_run=dry_run)
+        self._items = []
+        self._tasks = []
+        self._location_ids = set()
+
+    def run(self, stream, fmt):
+        """
+        Imports the records in ``stream`` (a text file object) and returns
+        the ImportReport.
+        """
+        try:
+            with transaction.atomic():
+                self._load_lookups()
+                self._import(READERS[fmt](stream))
+                self._flush()
+                if not self.report.committed:
+                    raise _Rollback
+                # bulk_create does not send post_save, which keeps the
+                # counters in sync.
+                refresh_location_stats(self._location_ids)
+        except _Rollback:
+            pass
+        return self.report
+
+    def _load_lookups(self):
+        self.locations = {}
+        for location in Location.objects.filter(account=self.account):
+            self.locations[str(location.pk)] = location
+            self.locations.setdefault(location.name, location)
+
+        # Existing items, for deduplication and for tasks that refer to them.
+        self.serials = {}
+        self.names = {}
+        existing = Item.objects.filter(location__account=self.account).only(
+            "pk", "name", "serial_number", "location_id"
+        )
+        for item in existing.iterator(chunk_size=2000):
+            self._remember(item)
+        # Items (by identity) whose duplicate in the file was skipped.
+        self.skipped = set()
+
+    def _remember(self, item):
+        if item.serial_number:
+            self.serials[item.serial_number] = item
+        self.names.setdefault(item.name, []).append(item)
+
+    def _import(self, records):
+        number = 0
+        try:
+            for number, record in enumerate(records, start=1):
+                self.report.records = number
+                where = f"Record {number}"
+                if not isinstance(record, dict):
+                    self.report.add_error(where, "expected a mapping of field names to values.")
+                elif str(record.get("type", "item")).lower() == "task":
+                    self._add_task(where, record)
+                else:
+                    self._add_item(where, record)
+                if len(self._items) + len(self._tasks) >= self.batch_size:
+                    self._flush()
+        except (ValueError, csv.Error, yaml.YAMLError) as e:
+            # The file itself cannot be parsed any further.
+            self.report.add_error(f"After record {number}", f"could not read the file ({e}).")
+
+    def _add_item(self, where, record):
+        record = dict(record)
+        record.pop("type", None)
+        nested = record.pop("tasks", None) or []
+
+        location = self.location
+        if "location" in record:
+            location = self.locations.get(str(record.pop("location")))
+            if location is None:
+                self.report.add_error(where, "unknown location.")
+                return
+
+        form = ItemImportForm({**ITEM_DEFAULTS, **record}, instance=Item(location=location))
+        if not form.is_valid():
+            self._form_errors(where, form)
+            return
+        item = form.instance
+
+        if item.serial_number and item.serial_number in self.serials:
+            self.skipped.add(id(self.serials[item.serial_number]))
+            self.report.items_skipped += 1
+            self.report.tasks_skipped += len(nested)
+            return
+
+        self._remember(item)
+        self._items.append(item)
+        self._location_ids.add(location.pk)
+        for index, task in enumerate(nested, start=1):
+            if isinstance(task, dict):
+                self._add_task(f"{where}, task {index}", task, item)
+            else:
+                self.report.add_error(f"{where}, task {index}", "expected a mapping of field names to values.")
+
+    def _add_task(self, where, record, item=None):
+        record = dict(record)
+        record.pop("type", None)
+        key = record.pop("item", None)
+        if item is None:
+            item = self._resolve_item(where, key)
+            if item is None:
+                return
+            if id(item) in self.skipped:
+                self.report.tasks_skipped += 1
+                return
+
+        frequency = record.get("frequency")
+        if isinstance(frequency, str):
+            record["frequency"] = FREQUENCIES.get(frequency.strip().lower(), frequency)
+
+        form = TaskImportForm({**TASK_DEFAULTS, **record}, instance=Task(item=item))
+        if not form.is_valid():
+            self._form_errors(where, form)
+            return
+        task = form.instance
+        if task.next_due_date is None:
+            # As Task.save() does; bulk_create skips it.
+            task.next_due_date = task.calculate_next_due_date()
+        self._tasks.append(task)
+        self._location_ids.add(item.location_id)
+
+    def _resolve_item(self, where, key):
+        if key in (None, ""):
+            self.report.add_error(where, "'item' is required (a serial number or item name).")
+            return None
+        key = str(key)
+        if key in self.serials:
+            return self.serials[key]
+        matches = self.names.get(key, [])
+        if len(matches) == 1:
+            return matches[0]
+        if matches:
+            self.report.add_error(where, f"several items are named '{key}', use the serial number.")
+        else:
+            self.report.add_error(where, f"no item with serial number or name '{key}'.")
+        return None
+
+    def _form_errors(self, where, form):
+        for name, errors in form.errors.items():
+            for error in errors:
+                self.report.add_error(where, f"{name}: {error}" if name != "__all__" else error)
+
+    def _flush(self):
+        if self.report.ok:
+            # Items first: their new primary keys are filled in on the task
+            # instances that point at them.
+            Item.objects.bulk_create(self._items, batch_size=self.batch_size)
+            Task.objects.bulk_create(self._tasks, batch_size=self.batch_size)
+        self.report.items_created += len(self._items)
+        self.report.tasks_created += len(self._tasks)
+        self._items = []
+        self._tasks = []
+
+
+def import_file(stream, fmt, account, location, batch_size=DEFAULT_BATCH_SIZE, dry_run=False):
+    return Importer(account, location, batch_size=batch_size, dry_run=dry_run).run(stream, fmt)
@@ -0,0 +1,89 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.template.loader import render_to_string
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from upkeep.benchmarks import percentile, rolled_back, seed_household
+from upkeep.fragments import fragment_cache
+from upkeep.models import Task
+from upkeep.pagination import keyset_paginate
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds a throwaway location and times the rendering of the task rows "
+        "of the maintenance page (all tasks on one page) and of the due task "
+        "cards without fragment caching, with an empty fragment cache and "
+        "with a warm one. All data is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tasks", type=int, default=2000)
+        parser.add_argument("--repeat", type=int, default=10)
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            _owner, location = seed_household(
+                items=max(1, options["tasks"] // 2), tasks_per_item=2, seed=options["seed"]
+            )
+            self.stdout.write(
+                f"{connection.vendor}, fragment cache "
+                f"{type(fragment_cache()).__name__}: "
+                f"{Task.objects.filter(item__location=location).count()} tasks, "
+                f"{options['repeat']} runs"
+            )
+            self._run(location, options["repeat"])
+
+    def _run(self, location, repeat):
+        tasks = Task.objects.filter(item__location=location).select_related("item", "item__location")
+        page = keyset_paginate(tasks, ["item__name", "name", "id"], page_size=tasks.count())
+        task_groups = []
+        for task in page.object_list:
+            if task_groups and task_groups[-1][0] == task.item.name:
+                task_groups[-1][1].append(task)
+            else:
+                task_groups.append((task.item.name, [task], False))
+        pages = [
+            (
+                "maintenance rows",
+                "components/_task_groups.html",
+                {"grouping_type": "item", "task_groups": task_groups, "page": page, "query": ""},
+            ),
+            (
+                "due task cards",
+                "components/_task_due_list.html",
+                {"tasks": page.object_list, "today": timezone.now().date()},
+            ),
+        ]
+
+        self.stdout.write(f"{'page':<18}{'cache':<8}{'median ms':>12}{'p95 ms':>10}")
+        for label, template_name, context in pages:
+            for mode in ("off", "cold", "warm"):
+                timings = self._time(template_name, context, mode, repeat)
+                p95 = percentile(timings, 0.95)
+                self.stdout.write(
+                    f"{label:<18}{mode:<8}{statistics.median(timings):>12.2f}{p95:>10.2f}"
+                )
+
+    def _time(self, template_name, context, mode, repeat):
+        if mode == "off":
+            # A dummy cache misses every time: the rows render as before.
+            dummy = {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+            with override_settings(CACHES={"default": dummy, "fragments": dummy}):
+                return self._time(template_name, context, "cold", repeat)
+
+        timings = []
+        render_to_string(template_name, context)
+        for _ in range(repeat):
+            if mode == "cold":
+                fragment_cache().clear()
+            start = time.perf_counter()
+            render_to_string(template_name, context)
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        return timings
@@ -0,0 +1,210 @@
+import json
+import random
+import statistics
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import RequestFactory
+from django.urls import reverse
+
+from upkeep.benchmarks import (
+    benchmark_prefix,
+    cookie_header,
+    percentile,
+    session_cookies,
+)
+from upkeep.models import Item, Task
+from upkeep.synthetic import delete_households, generate_households
+
+# (name, method, url name, query string, weight): what a member does, and
+# how often, relative to the others.
+ENDPOINTS = [
+    ("dashboard", "GET", "home", "", 4),
+    ("items", "GET", "item-list", "", 3),
+    ("maintenance by item", "GET", "task-management-list", "group_by=item", 2),
+    ("maintenance by area", "GET", "task-management-list", "group_by=area", 1),
+    ("maintenance by frequency", "GET", "task-management-list", "group_by=frequency", 1),
+    ("todo", "GET", "task-due-list", "", 3),
+    ("complete", "POST", "task-complete", "", 1),
+    ("snooze", "POST", "task-snooze", "", 1),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Drives the main pages (dashboard, items, maintenance grouped by "
+        "item, area and frequency, the due list) and the complete and "
+        "snooze actions through the WSGI app from concurrent threads, each "
+        "logged in as a member of a synthetic household (see "
+        "generate_households), and prints throughput and p50/p95/p99 "
+        "latency overall and per endpoint as JSON. Without --prefix a "
+        "throwaway dataset is generated and deleted afterwards; with it, the "
+        "existing households of that prefix are used (and their tasks "
+        "completed and snoozed). Needs a file or server database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--prefix", help="Use the existing households of this prefix.")
+        parser.add_argument("--accounts", type=int, default=4)
+        parser.add_argument("--members", type=int, default=2)
+        parser.add_argument("--locations", type=int, default=1)
+        parser.add_argument("--items", type=int, default=500)
+        parser.add_argument("--tasks-per-item", type=int, default=2)
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument("--duration", type=float, default=10)
+        parser.add_argument("--output", "-o", help="Write the JSON report to this file.")
+
+    def handle(self, *args, **options):
+        name = connection.settings_dict["NAME"]
+        if connection.vendor == "sqlite" and connection.is_in_memory_db() and "cache=shared" not in str(name):
+            raise CommandError("The request threads can't share a private in-memory database.")
+
+        prefix = options["prefix"]
+        throwaway = prefix is None
+        if throwaway:
+            prefix = benchmark_prefix()
+            generate_households(
+                prefix,
+                accounts=options["accounts"],
+                members=options["members"],
+                locations=options["locations"],
+                items=options["items"],
+                tasks_per_item=options["tasks_per_item"],
+                seed=options["seed"],
+            )
+        try:
+            members = self._members(prefix)
+            if not members:
+                raise CommandError(f"No households with the prefix '{prefix}'.")
+            report = {"data": self._describe(prefix), **_run(members, options)}
+        finally:
+            if throwaway:
+                delete_households(prefix)
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(output + "\n")
+        self.stdout.write(output)
+
+    def _members(self, prefix):
+        """
+        A session and CSRF cookie per member, with the tasks of the member's
+        default location to complete and snooze.
+        """
+        users = get_user_model().objects.filter(
+            username__startswith=f"{prefix}-", profile__account__isnull=False
+        ).select_related("profile").order_by("username")
+        members = []
+        for user in users:
+            cookies = session_cookies(user, csrf=True)
+            task_ids = list(
+                Task.objects.filter(
+                    item__location__account=user.profile.account_id,
+                    item__location__default=True,
+                ).values_list("pk", flat=True)
+            )
+            members.append(
+                {
+                    "cookie": cookie_header(cookies),
+                    "csrf_token": cookies[settings.CSRF_COOKIE_NAME],
+                    "task_ids": task_ids,
+                }
+            )
+        return members
+
+    def _describe(self, prefix):
+        users = get_user_model().objects.filter(username__startswith=f"{prefix}-")
+        return {
+            "vendor": connection.vendor,
+            "members": users.count(),
+            "items": Item.objects.filter(location__account__owner__in=users).count(),
+            "tasks": Task.objects.filter(item__location__account__owner__in=users).count(),
+        }
+
+
+def _run(members, options):
+    handler = WSGIHandler()
+    factory = RequestFactory()
+    timings = {name: [] for name, *_ in ENDPOINTS}
+    errors = dict.fromkeys(timings, 0)
+    lock = threading.Lock()
+    deadline = time.monotonic() + options["duration"]
+
+    def environ(endpoint, member, rng):
+        _, method, url_name, query, _ = endpoint
+        if method == "POST":
+            path = reverse(url_name, args=[rng.choice(member["task_ids"])])
+            return factory.post(
+                path,
+                HTTP_COOKIE=member["cookie"],
+                HTTP_X_CSRFTOKEN=member["csrf_token"],
+            ).environ
+        path = reverse(url_name) + (f"?{query}" if query else "")
+        return factory.get(path, HTTP_COOKIE=member["cookie"]).environ
+
+    def worker(n):
+        # Each thread replays its own seeded sequence of requests.
+        rng = random.Random(options["seed"] * 1000 + n)
+        member = members[n % len(members)]
+        endpoints = [e for e in ENDPOINTS if e[1] == "GET" or member["task_ids"]]
+        local_timings = {name: [] for name in timings}
+        local_errors = dict.fromkeys(timings, 0)
+        while time.monotonic() < deadline:
+            endpoint = rng.choices(endpoints, [weight for *_, weight in endpoints])[0]
+            name, method = endpoint[:2]
+            request = environ(endpoint, member, rng)
+            start = time.perf_counter()
+            response = handler(request, lambda status, headers: None)
+            b"".join(response)
+            response.close()
+            elapsed = (time.perf_counter() - start) * 1000
+            if response.status_code == (302 if method == "POST" else 200):
+                local_timings[name].append(elapsed)
+            else:
+                local_errors[name] += 1
+        connections.close_all()
+        with lock:
+            for name, values in local_timings.items():
+                timings[name].extend(values)
+                errors[name] += local_errors[name]
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(options["concurrency"])]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - start
+
+    return {
+        "concurrency": options["concurrency"],
+        "duration": round(elapsed, 2),
+        "seed": options["seed"],
+        **_summary([t for values in timings.values() for t in values], sum(errors.values()), elapsed),
+        "endpoints": {
+            name: _summary(timings[name], errors[name], elapsed) for name in timings
+        },
+    }
+
+
+def _summary(timings, errors, elapsed):
+    timings = sorted(timings)
+    return {
+        "requests": len(timings),
+        "errors": errors,
+        "throughput": round(len(timings) / elapsed, 2),
+        "p50": round(statistics.median(timings), 2) if timings else None,
+        "p95": _round(percentile(timings, 0.95)),
+        "p99": _round(percentile(timings, 0.99)),
+    }
+
+
+def _round(value):
+    return None if value is None else round(value, 2)
@@ -0,0 +1,82 @@
+import random
+import re
+import time
+
+import markdown as md
+from django.core.management.base import BaseCommand
+
+from upkeep.rendering import ENGINES, EXTENSIONS
+
+TOOLS = [
+    "Screwdriver", "Bleed key", "Rag", "Bucket", "Vacuum cleaner", "Filter (F7)",
+    "Silicone grease", "Ladder", "Gloves", "Multimeter", "Torx T20", "Descaler",
+]
+VERBS = ["Turn off", "Open", "Remove", "Inspect", "Clean", "Replace", "Tighten", "Check"]
+PARTS = ["the pump", "the valve", "the filter", "the cover", "the drain hose", "the seals"]
+
+
+def corpus(size, seed):
+    """
+    Task descriptions shaped like the ones users write: the required
+    ``## Tools & Parts`` and ``## Steps`` sections, with the occasional
+    emphasis, link, note, table or code block.
+    """
+    rng = random.Random(seed)
+    docs = []
+    for _ in range(size):
+        lines = ["## Tools & Parts"]
+        lines += [f"- {tool}" for tool in rng.sample(TOOLS, rng.randint(1, 5))]
+        lines += ["", "## Steps"]
+        for n in range(1, rng.randint(3, 9)):
+            step = f"{rng.choice(VERBS)} {rng.choice(PARTS)}"
+            if rng.random() < 0.3:
+                step += " **carefully**"
+            if rng.random() < 0.1:
+                step += " (see [manual](https://example.com/manual.pdf))"
+            lines.append(f"{n}. {step}")
+        if rng.random() < 0.3:
+            lines += ["", "> Note: wait until it has *cooled down*."]
+        if rng.random() < 0.2:
+            lines += ["", "| Part | Interval |", "|------|----------|", "| Filter | 3 months |"]
+        if rng.random() < 0.2:
+            lines += ["", "```", "pressure: 1.5 bar", "```"]
+        docs.append("\n".join(lines) + "\n")
+    return docs
+
+
+def normalize(html):
+    return re.sub(r">\s+<", "><", html.strip())
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the throughput of the Markdown engines on a corpus of "
+        "generated task descriptions, and their output against Python-Markdown."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--docs", type=int, default=500)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        docs = corpus(options["docs"], options["seed"])
+        reference = [md.markdown(doc, extensions=EXTENSIONS) for doc in docs]
+
+        renderers = [("python-markdown, markdown.markdown()", lambda doc: md.markdown(doc, extensions=EXTENSIONS))]
+        renderers += [(name, engine().render) for name, engine in ENGINES.items()]
+
+        self.stdout.write(f"{len(docs)} descriptions, best of {options['repeat']} runs")
+        self.stdout.write(f"{'renderer':<38}{'docs/s':>10}{'us/doc':>9}{'parity':>9}")
+        for label, render in renderers:
+            best = None
+            for _ in range(options["repeat"]):
+                start = time.perf_counter()
+                output = [render(doc) for doc in docs]
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            same = sum(normalize(a) == normalize(b) for a, b in zip(output, reference))
+            self.stdout.write(
+                f"{label:<38}{len(docs) / best:>10.0f}{best / len(docs) * 1e6:>9.1f}"
+                f"{same / len(docs):>9.1%}"
+            )
@@ -0,0 +1,95 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Q
+
+from upkeep import search
+from upkeep.benchmarks import percentile, rolled_back, seed_household
+from upkeep.models import Item, Task
+
+QUERIES = ["fil", "filter", "filtr", "heat pump", "bosch", "garage door", "xyz"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds a throwaway location and compares the icontains search with the "
+        "indexed full-text search. All data is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--items", type=int, default=5000)
+        parser.add_argument("--tasks-per-item", type=int, default=2)
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            location = self._seed(options)
+            self.stdout.write(
+                f"{connection.vendor}: {options['items']} items, "
+                f"{Task.objects.filter(item__location=location).count()} tasks, "
+                f"{options['repeat']} runs per query"
+            )
+            self._run(location, options["repeat"])
+
+    def _seed(self, options):
+        _owner, location = seed_household(
+            items=options["items"],
+            tasks_per_item=options["tasks_per_item"],
+            seed=options["seed"],
+        )
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE upkeep_item")
+                cursor.execute("ANALYZE upkeep_task")
+        return location
+
+    def _run(self, location, repeat):
+        items = Item.objects.filter(location=location)
+        tasks = Task.objects.filter(item__location=location)
+
+        def icontains_items(query):
+            return items.filter(
+                Q(name__icontains=query) | Q(brand__icontains=query) | Q(area__icontains=query)
+            ).order_by("area", "name")
+
+        def icontains_tasks(query):
+            return tasks.filter(
+                Q(name__icontains=query)
+                | Q(item__name__icontains=query)
+                | Q(description__icontains=query)
+            ).order_by("item__name", "name")
+
+        def indexed_items(query):
+            queryset, rank = search.search_items(items, query)
+            return queryset.order_by(rank, "id")
+
+        def indexed_tasks(query):
+            queryset, rank = search.search_tasks(tasks, query)
+            return queryset.order_by(rank, "id")
+
+        self.stdout.write(
+            f"{'query':<14}{'path':<16}{'hits':>7}{'median ms':>12}{'p95 ms':>10}"
+        )
+        for query in QUERIES:
+            for label, build in (
+                ("items icontains", icontains_items),
+                ("items indexed", indexed_items),
+                ("tasks icontains", icontains_tasks),
+                ("tasks indexed", indexed_tasks),
+            ):
+                timings = []
+                hits = 0
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    # The views fetch one page, so time the first 50 rows.
+                    hits = len(list(build(query)[:50]))
+                    timings.append((time.perf_counter() - start) * 1000)
+                timings.sort()
+                p95 = percentile(timings, 0.95)
+                self.stdout.write(
+                    f"{query:<14}{label:<16}{hits:>7}"
+                    f"{statistics.median(timings):>12.2f}{p95:>10.2f}"
+                )
@@ -0,0 +1,172 @@
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.urls import reverse
+
+from upkeep.benchmarks import percentile, session_cookie, throwaway_household
+
+
+class Command(BaseCommand):
+    help = (
+        "Serves the app with gunicorn in WSGI and in ASGI mode (see "
+        "gunicorn.conf.py) and loads the dashboard and list pages of a "
+        "seeded location from concurrent keep-alive clients, reporting "
+        "throughput and latency percentiles per mode. With --slow-clients, "
+        "that many clients keep trickling request bodies in meanwhile, like "
+        "large receipt uploads over a slow link. The servers use this "
+        "command's settings and database, which must therefore be a file "
+        "or server database; the seeded data is deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--modes", nargs="+", choices=["wsgi", "asgi"], default=["wsgi", "asgi"])
+        parser.add_argument("--workers", type=int, default=1)
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument("--duration", type=float, default=10)
+        parser.add_argument("--slow-clients", type=int, default=0)
+        parser.add_argument("--tasks", type=int, default=1000)
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        if connection.vendor == "sqlite" and connection.is_in_memory_db():
+            raise CommandError("The servers can't share an in-memory database.")
+
+        household = throwaway_household(
+            items=max(1, options["tasks"] // 2), tasks_per_item=2, seed=options["seed"]
+        )
+        with household as (owner, _location):
+            cookie = session_cookie(owner)
+            paths = [
+                (reverse("home"), {}),
+                (reverse("item-list"), {}),
+                (reverse("task-management-list"), {}),
+                (reverse("task-management-list") + "?group_by=area", {"HX-Request": "true"}),
+                (reverse("task-due-list"), {}),
+            ]
+            self.stdout.write(
+                f"{connection.vendor}, {options['workers']} worker(s), "
+                f"{options['concurrency']} clients, {options['slow_clients']} slow, "
+                f"{options['duration']:g}s per mode"
+            )
+            self.stdout.write(
+                f"{'mode':<6}{'requests':>10}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}"
+            )
+            for mode in options["modes"]:
+                with _server(mode, options["port"], options["workers"]):
+                    result = _load(options, paths, cookie)
+                self.stdout.write(
+                    f"{mode:<6}{result['requests']:>10}{result['throughput']:>9.1f}"
+                    f"{result['p50']:>9.1f}{result['p95']:>9.1f}{result['p99']:>9.1f}{result['errors']:>8}"
+                )
+
+
+class _server:
+    def __init__(self, mode, port, workers):
+        self.mode, self.port, self.workers = mode, port, workers
+
+    def __enter__(self):
+        env = {**os.environ, "SERVER_MODE": self.mode, "WEB_CONCURRENCY": str(self.workers)}
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "--bind", f"127.0.0.1:{self.port}", "--log-level", "warning"],
+            cwd=settings.BASE_DIR,
+            env=env,
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise CommandError(f"gunicorn ({self.mode}) exited with {self.process.returncode}")
+            try:
+                conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+                conn.request("GET", "/")
+                conn.getresponse().read()
+                conn.close()
+                return self
+            except OSError:
+                time.sleep(0.2)
+        self.__exit__()
+        raise CommandError(f"gunicorn ({self.mode}) did not start")
+
+    def __exit__(self, *exc_info):
+        self.process.terminate()
+        self.process.wait(timeout=30)
+
+
+def _load(options, paths, cookie):
+    deadline = time.monotonic() + options["duration"]
+    timings, errors = [], []
+    lock = threading.Lock()
+
+    def client(n):
+        conn = http.client.HTTPConnection("127.0.0.1", options["port"], timeout=60)
+        local_timings, local_errors = [], 0
+        i = n
+        while time.monotonic() < deadline:
+            path, headers = paths[i % len(paths)]
+            i += 1
+            start = time.perf_counter()
+            try:
+                conn.request("GET", path, headers={"Cookie": cookie, **headers})
+                response = conn.getresponse()
+                response.read()
+                ok = response.status == 200
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", options["port"], timeout=60)
+                ok = False
+            if ok:
+                local_timings.append((time.perf_counter() - start) * 1000)
+            else:
+                local_errors += 1
+        conn.close()
+        with lock:
+            timings.extend(local_timings)
+            errors.append(local_errors)
+
+    def slow_client():
+        # A large body sent a few bytes at a time until the run ends.
+        with socket.create_connection(("127.0.0.1", options["port"])) as sock:
+            sock.sendall(
+                f"POST {reverse('item-import')} HTTP/1.1\r\nHost: 127.0.0.1\r\n"
+                f"Cookie: {cookie}\r\nContent-Type: text/csv\r\n"
+                f"Content-Length: {10 ** 9}\r\n\r\n".encode()
+            )
+            while time.monotonic() < deadline:
+                try:
+                    sock.sendall(b"name,area\n")
+                except OSError:
+                    return
+                time.sleep(0.5)
+
+    threads = [threading.Thread(target=slow_client) for _ in range(options["slow_clients"])]
+    for thread in threads:
+        thread.start()
+    # Let the slow clients take their connections first.
+    time.sleep(0.5 if threads else 0)
+
+    start = time.monotonic()
+    clients = [threading.Thread(target=client, args=(n,)) for n in range(options["concurrency"])]
+    for thread in clients:
+        thread.start()
+    for thread in clients + threads:
+        thread.join()
+    elapsed = time.monotonic() - start
+
+    timings.sort()
+    return {
+        "requests": len(timings),
+        "throughput": len(timings) / elapsed,
+        "p50": statistics.median(timings) if timings else 0,
+        "p95": percentile(timings, 0.95) or 0,
+        "p99": percentile(timings, 0.99) or 0,
+        "errors": sum(errors),
+    }
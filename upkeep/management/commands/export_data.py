@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from common.models import Account
+from upkeep.exporter import CONTENT_TYPES, DATASETS, export_chunks
+from upkeep.models import Location
+
+
+class Command(BaseCommand):
+    help = (
+        "Writes the items or tasks of a location or a whole account as CSV or "
+        "JSON Lines, the same files as the export links. Rows are streamed, so "
+        "memory use does not grow with the export."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("dataset", choices=DATASETS)
+        scope = parser.add_mutually_exclusive_group(required=True)
+        scope.add_argument("--location", type=int, help="Location id.")
+        scope.add_argument("--account", type=int, help="Account id.")
+        parser.add_argument("--format", choices=sorted(CONTENT_TYPES), default="csv")
+        parser.add_argument("--output", "-o", help="File to write (default: stdout).")
+
+    def handle(self, *args, **options):
+        if options["location"] is not None:
+            model, key = Location, "location"
+        else:
+            model, key = Account, "account"
+        try:
+            scope = model.objects.get(pk=options[key])
+        except model.DoesNotExist:
+            raise CommandError(f"{model.__name__} {options[key]} does not exist.") from None
+
+        chunks = export_chunks(options["dataset"], options["format"], **{key: scope})
+        if options["output"]:
+            with open(options["output"], "w", newline="", encoding="utf-8") as out:
+                out.writelines(chunks)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}."))
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
@@ -0,0 +1,56 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from upkeep.models import Item, Task
+from upkeep.synthetic import delete_households, generate_households
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-generates synthetic households (members, locations, items and "
+        "tasks of every frequency) for local load testing. The same --seed "
+        "always produces the same data; users are named <prefix>-<n>-<m>. "
+        "--delete removes the households of a prefix again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--prefix", default="synthetic")
+        parser.add_argument("--accounts", type=int, default=10)
+        parser.add_argument("--members", type=int, default=3)
+        parser.add_argument("--locations", type=int, default=2)
+        parser.add_argument("--items", type=int, default=200, help="Items per location.")
+        parser.add_argument("--tasks-per-item", type=int, default=2)
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument(
+            "--password", help="Password of every generated user (default: unusable)."
+        )
+        parser.add_argument("--delete", action="store_true")
+
+    def handle(self, *args, **options):
+        prefix = options["prefix"]
+        if options["delete"]:
+            count = delete_households(prefix)
+            self.stdout.write(self.style.SUCCESS(f"Deleted {count} '{prefix}' household(s)."))
+            return
+
+        if get_user_model().objects.filter(username__startswith=f"{prefix}-").exists():
+            raise CommandError(
+                f"Households with the prefix '{prefix}' exist; pass --delete first "
+                "or choose another --prefix."
+            )
+        accounts = generate_households(
+            prefix,
+            accounts=options["accounts"],
+            members=options["members"],
+            locations=options["locations"],
+            items=options["items"],
+            tasks_per_item=options["tasks_per_item"],
+            seed=options["seed"],
+            password=options["password"],
+        )
+        items = Item.objects.filter(location__account__in=accounts)
+        tasks = Task.objects.filter(item__location__account__in=accounts)
+        message = f"Generated {len(accounts)} household(s): {items.count()} items, {tasks.count()} tasks."
+        if options["password"]:
+            message += f" Log in as {prefix}-0000-0."
+        self.stdout.write(self.style.SUCCESS(message))
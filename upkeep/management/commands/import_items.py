@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from upkeep.importer import (
+    DEFAULT_BATCH_SIZE,
+    FORMATS,
+    ImportFormatError,
+    detect_format,
+    import_file,
+)
+from upkeep.models import Location
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports items and their tasks from a CSV, JSON Lines or YAML file into "
+        "a location. Rows are validated like the item and task forms; any error "
+        "rolls back the whole import. See upkeep/importer.py for the format."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--location", type=int, required=True, help="Location id to import into.")
+        parser.add_argument("--format", choices=sorted(set(FORMATS.values())), help="Default: from the file extension.")
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument("--dry-run", action="store_true", help="Validate and report, change nothing.")
+
+    def handle(self, *args, **options):
+        try:
+            location = Location.objects.select_related("account").get(pk=options["location"])
+        except Location.DoesNotExist:
+            raise CommandError(f"Location {options['location']} does not exist.") from None
+        try:
+            fmt = options["format"] or detect_format(options["path"])
+        except ImportFormatError as e:
+            raise CommandError(str(e)) from None
+
+        # utf-8-sig also accepts the byte order mark spreadsheets write.
+        with open(options["path"], newline="", encoding="utf-8-sig") as stream:
+            report = import_file(
+                stream, fmt, location.account, location,
+                batch_size=options["batch_size"], dry_run=options["dry_run"],
+            )
+
+        for error in report.errors:
+            self.stderr.write(error)
+        if report.error_count > len(report.errors):
+            self.stderr.write(f"... and {report.error_count - len(report.errors)} more error(s).")
+        if not report.ok:
+            raise CommandError(report.summary())
+        self.stdout.write(self.style.SUCCESS(report.summary()))
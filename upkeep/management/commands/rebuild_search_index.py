@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from upkeep import search
+from upkeep.models import Item, Task
+
+
+class Command(BaseCommand):
+    help = "Recreates and repopulates the item and task full-text search index."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            search.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt {connection.vendor} search index for "
+                f"{Item.objects.count()} items and {Task.objects.count()} tasks."
+            )
+        )
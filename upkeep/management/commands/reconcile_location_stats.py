@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from upkeep.models import Location
+from upkeep.stats import refresh_location_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the LocationStats counters from scratch. Run nightly, after "
+        "midnight, so the date-sensitive task counters roll over to the new day."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--location", type=int, action="append", dest="locations",
+            help="Only reconcile this location id (repeatable).",
+        )
+
+    def handle(self, *args, **options):
+        location_ids = options["locations"] or list(
+            Location.objects.values_list("pk", flat=True)
+        )
+        for location_id in location_ids:
+            with transaction.atomic():
+                refresh_location_stats([location_id])
+        self.stdout.write(
+            self.style.SUCCESS(f"Reconciled stats for {len(location_ids)} location(s).")
+        )
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from upkeep.models import Task
+from upkeep.rendering import render_markdown
+
+
+class Command(BaseCommand):
+    help = (
+        "Stores the rendered Markdown of task descriptions. By default only "
+        "tasks with a description but no stored HTML; --all re-renders every "
+        "task (e.g. after changing the Markdown extensions)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Re-render every task.")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        tasks = Task.objects.exclude(description__isnull=True).exclude(description="")
+        if not options["all"]:
+            tasks = tasks.filter(description_html="")
+
+        batch_size = options["batch_size"]
+        rendered = 0
+        batch = []
+        # updated_at moves too: cached task fragments and page validators
+        # (upkeep.fragments, upkeep.changes) are keyed on it.
+        now = timezone.now()
+        for task in tasks.only("pk", "description").iterator(chunk_size=batch_size):
+            batch.append(
+                Task(pk=task.pk, description_html=render_markdown(task.description), updated_at=now)
+            )
+            if len(batch) == batch_size:
+                rendered += self._save(batch)
+                batch = []
+        rendered += self._save(batch)
+        self.stdout.write(self.style.SUCCESS(f"Rendered {rendered} task description(s)."))
+
+    def _save(self, batch):
+        with transaction.atomic():
+            Task.objects.bulk_update(batch, ["description_html", "updated_at"])
+        return len(batch)
@@ -0,0 +1,142 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.utils.functional import SimpleLazyObject
+
+from common.models import Profile
+
+from .models import Location
+
+SESSION_KEY = "active_location_id"
+
+
+def get_account(request):
+    """
+    The household account of the logged-in user, or None. Resolved once per
+    request and cached on it.
+    """
+    if not hasattr(request, "_cached_account"):
+        account = None
+        user = request.user
+        if user.is_authenticated:
+            profile = getattr(user, "profile", None)
+            account = profile.account if profile else None
+        request._cached_account = account
+    return request._cached_account
+
+
+def get_user_locations(request):
+    """
+    The account's locations, default first, as a list. One query serves both
+    the active location and the location switcher.
+    """
+    if not hasattr(request, "_cached_user_locations"):
+        account = get_account(request)
+        request._cached_user_locations = (
+            list(_locations(account)) if account else []
+        )
+    return request._cached_user_locations
+
+
+def get_active_location(request):
+    """
+    The location selected in the session, falling back to the default (or
+    first) location when the session holds nothing valid for this account.
+    The session is updated so the choice persists.
+    """
+    if not hasattr(request, "_cached_active_location"):
+        locations = get_user_locations(request)
+        selected = request.session.get(SESSION_KEY)
+        active_location = _pick_location(locations, selected)
+        if active_location and active_location.pk != selected:
+            request.session[SESSION_KEY] = active_location.pk
+        request._cached_active_location = active_location
+    return request._cached_active_location
+
+
+# Async counterparts for async views. They fill the same per-request cache,
+# so the lazy attributes and the context processor answer from it instead
+# of querying, which they can't do on the event loop.
+
+
+async def aget_account(request):
+    if not hasattr(request, "_cached_account"):
+        account = None
+        user = await request.auser()
+        if user.is_authenticated:
+            if type(user).profile.is_cached(user):
+                # Loaded with the user by AccountBackend.
+                profile = getattr(user, "profile", None)
+            else:
+                profile = await Profile.objects.select_related("account").filter(user=user).afirst()
+            account = profile.account if profile else None
+        request._cached_account = account
+    return request._cached_account
+
+
+async def aget_user_locations(request):
+    if not hasattr(request, "_cached_user_locations"):
+        account = await aget_account(request)
+        request._cached_user_locations = (
+            [location async for location in _locations(account)] if account else []
+        )
+    return request._cached_user_locations
+
+
+async def aget_active_location(request):
+    if not hasattr(request, "_cached_active_location"):
+        locations = await aget_user_locations(request)
+        selected = await request.session.aget(SESSION_KEY)
+        active_location = _pick_location(locations, selected)
+        if active_location and active_location.pk != selected:
+            await request.session.aset(SESSION_KEY, active_location.pk)
+        request._cached_active_location = active_location
+    return request._cached_active_location
+
+
+async def aprepare_request(request):
+    """
+    Loads the user, the session, the account and its locations for an async
+    view, so that neither the view nor its templates query synchronously.
+    """
+    request.user = await request.auser()
+    await aget_active_location(request)
+
+
+def _locations(account):
+    return Location.objects.filter(account=account).order_by("-default", "name")
+
+
+def _pick_location(locations, selected):
+    try:
+        selected = int(selected)
+    except (TypeError, ValueError):
+        selected = None
+    return next(
+        (location for location in locations if location.pk == selected),
+        locations[0] if locations else None,
+    )
+
+
+class ActiveLocationMiddleware:
+    """
+    Sets ``request.account`` and ``request.active_location``. Both are lazy:
+    nothing is queried until a view, template or context processor uses
+    them, and then only once per request. Must come after
+    AuthenticationMiddleware.
+
+    Runs natively in both modes, so an ASGI request reaches async views
+    without a detour through a thread. Async views resolve the values with
+    ``aprepare_request`` before touching them.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        request.account = SimpleLazyObject(lambda: get_account(request))
+        request.active_location = SimpleLazyObject(lambda: get_active_location(request))
+        return self.get_response(request)
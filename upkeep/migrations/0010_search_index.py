@@ -0,0 +1,23 @@
+from django.db import migrations
+
+from upkeep import search
+
+
+def install_search_index(apps, schema_editor):
+    search.install(schema_editor, apps.get_model("upkeep", "Item"), apps.get_model("upkeep", "Task"))
+    search.populate(schema_editor.connection)
+
+
+def uninstall_search_index(apps, schema_editor):
+    search.uninstall(schema_editor, apps.get_model("upkeep", "Item"), apps.get_model("upkeep", "Task"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('upkeep', '0009_remove_item_account_remove_item_user_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.15 on 2026-10-18 19:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('upkeep', '0010_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LocationStats',
+            fields=[
+                ('location', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='upkeep.location')),
+                ('computed_on', models.DateField()),
+                ('total_active_items', models.IntegerField(default=0)),
+                ('broken_items_count', models.IntegerField(default=0)),
+                ('total_asset_value', models.BigIntegerField(default=0)),
+                ('overdue_tasks_count', models.IntegerField(default=0)),
+                ('tasks_due_this_week', models.IntegerField(default=0)),
+                ('maintenance_load', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'Location stats',
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.15 on 2026-10-18 19:36
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Coalesce, Greatest
+
+
+def backfill_effective_due_date(apps, schema_editor):
+    Task = apps.get_model("upkeep", "Task")
+    Task.objects.update(
+        effective_due_date=Greatest(
+            Coalesce("next_due_date", "snoozed_until"),
+            Coalesce("snoozed_until", "next_due_date"),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('upkeep', '0011_location_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='effective_due_date',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_effective_due_date, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['item', 'effective_due_date'], name='upkeep_task_item_due_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.15 on 2026-10-18 19:37
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0002_account_profile_account'),
+        ('upkeep', '0012_task_effective_due_date'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['location', 'status'], name='upkeep_item_loc_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['location', 'area', 'name'], name='upkeep_item_loc_area_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='location',
+            index=models.Index(fields=['account', '-default', 'name'], name='upkeep_loc_account_default_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['item', 'next_due_date'], name='upkeep_task_item_next_due_idx'),
+        ),
+    ]
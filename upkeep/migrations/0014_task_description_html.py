@@ -0,0 +1,23 @@
+# Generated by Django 5.2.15 on 2026-10-18 19:44
+
+from django.db import migrations, models
+
+from upkeep import search
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('upkeep', '0013_hot_path_indexes'),
+    ]
+
+    operations = [
+        # SQLite rebuilds upkeep_task to add a NOT NULL column.
+        migrations.RunPython(search.drop_sqlite_triggers, search.restore_sqlite_triggers),
+        migrations.AddField(
+            model_name='task',
+            name='description_html',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(search.restore_sqlite_triggers, search.drop_sqlite_triggers),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.15 on 2026-10-18 20:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('upkeep', '0014_task_description_html'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='location',
+            name='calendar_token',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True, unique=True),
+        ),
+    ]
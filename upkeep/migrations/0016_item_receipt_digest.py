@@ -0,0 +1,23 @@
+# Generated by Django 5.2.15 on 2026-10-18 20:46
+
+from django.db import migrations, models
+
+from upkeep import search
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('upkeep', '0015_location_calendar_token'),
+    ]
+
+    operations = [
+        # SQLite rebuilds upkeep_item to add a NOT NULL column.
+        migrations.RunPython(search.drop_sqlite_triggers, search.restore_sqlite_triggers),
+        migrations.AddField(
+            model_name='item',
+            name='receipt_digest',
+            field=models.CharField(blank=True, editable=False, max_length=16),
+        ),
+        migrations.RunPython(search.restore_sqlite_triggers, search.drop_sqlite_triggers),
+    ]
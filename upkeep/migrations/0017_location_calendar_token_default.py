@@ -0,0 +1,29 @@
+# Generated by Django 5.2.15 on 2026-10-18 20:59
+
+import secrets
+
+import upkeep.models
+from django.db import migrations, models
+
+
+def backfill_calendar_tokens(apps, schema_editor):
+    # The settings page only reads the tokens, so every location needs one.
+    Location = apps.get_model("upkeep", "Location")
+    for pk in Location.objects.filter(calendar_token__isnull=True).values_list("pk", flat=True):
+        Location.objects.filter(pk=pk).update(calendar_token=secrets.token_urlsafe(32))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('upkeep', '0016_item_receipt_digest'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='location',
+            name='calendar_token',
+            field=models.CharField(blank=True, default=upkeep.models.new_calendar_token, editable=False, max_length=64, null=True, unique=True),
+        ),
+        migrations.RunPython(backfill_calendar_tokens, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,18 @@
 import datetime
+import secrets
 from django.db import models
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce, Greatest
+from common import thumbnails
 from common.models import BaseModel
+from .rendering import render_markdown
 from django.core.validators import MaxValueValidator, MinValueValidator
 
 
+def new_calendar_token():
+    return secrets.token_urlsafe(32)
+
+
 class Location(BaseModel):
     name = models.CharField(max_length=255)
     address = models.CharField(max_length=255, blank=True, null=True)
@@ -14,15 +23,59 @@ class Location(BaseModel):
         "common.Account", on_delete=models.CASCADE, related_name="locations", null=True
     )
     default = models.BooleanField(default=False)
+    # Secret in the URL of the location's calendar feed (calendar apps
+    # cannot log in). Set when the location is created; resetting it
+    # revokes old links.
+    calendar_token = models.CharField(
+        max_length=64, unique=True, blank=True, null=True, editable=False,
+        default=new_calendar_token,
+    )
 
     class Meta:
         verbose_name_plural = "Locations"
+        indexes = [
+            # The account's locations, default first (switcher, fallback).
+            models.Index(fields=["account", "-default", "name"], name="upkeep_loc_account_default_idx"),
+        ]
 
     def __str__(self):
         return self.name
 
+    def reset_calendar_token(self):
+        self.calendar_token = new_calendar_token()
+        self.save(update_fields=["calendar_token"])
+
+
+class TrackedFieldsMixin:
+    """
+    Remembers the database values of ``tracked_fields`` when an instance is
+    loaded, so save/delete handlers can compute what changed without
+    re-reading the row.
+    """
+
+    tracked_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.snapshot_tracked_fields()
+        return instance
+
+    def snapshot_tracked_fields(self):
+        deferred = self.get_deferred_fields()
+        self._loaded_values = {
+            name: getattr(self, name)
+            for name in self.tracked_fields
+            if name not in deferred
+        }
+
+    def loaded_value(self, name, default=None):
+        return getattr(self, "_loaded_values", {}).get(name, default)
+
+
+class Item(TrackedFieldsMixin, BaseModel):
+    tracked_fields = ("location_id", "status", "purchase_value")
 
-class Item(BaseModel):
     class ItemStatus(models.IntegerChoices):
         ACTIVE = 1, "Active"
         RETIRED = 2, "Retired"
@@ -58,6 +111,9 @@ class Item(BaseModel):
     )
     warranty_expiration = models.DateField(blank=True, null=True)
     receipt_file = models.FileField(upload_to="receipts/", blank=True, null=True)
+    # Content digest naming the thumbnails of an image receipt, empty for
+    # other files (common.thumbnails).
+    receipt_digest = models.CharField(max_length=16, blank=True, editable=False)
     notes = models.TextField(blank=True, null=True)
     manufacturer_manual_url = models.URLField(null=True, blank=True)
 
@@ -65,10 +121,22 @@ class Item(BaseModel):
 
     class Meta:
         verbose_name_plural = "Items"
+        indexes = [
+            # Dashboard counters and warranty watch filter by status.
+            models.Index(fields=["location", "status"], name="upkeep_item_loc_status_idx"),
+            # The item list, ordered by area and name.
+            models.Index(fields=["location", "area", "name"], name="upkeep_item_loc_area_name_idx"),
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        uploaded = thumbnails.before_save(self, "receipt_file", "receipt_digest")
+        super().save(*args, **kwargs)
+        if uploaded:
+            thumbnails.after_save(self, "receipt_file", "receipt_digest")
+
     def is_under_warranty(self):
         return self.warranty_expiration and self.warranty_expiration >= datetime.date.today()
 
@@ -83,7 +151,86 @@ class Item(BaseModel):
         return self.ItemStatus(self.status).label
 
 
-class Task(BaseModel):
+_CURRENT = object()
+
+
+def effective_due_date_expression(next_due_date=_CURRENT, snoozed_until=_CURRENT):
+    """
+    SQL for the later of next_due_date and snoozed_until (either may be
+    NULL). Pass the new values to compute it in an UPDATE that changes them,
+    since the right-hand side of SET sees the old column values.
+    """
+
+    def as_expression(value, name):
+        if value is _CURRENT:
+            return F(name)
+        if hasattr(value, "resolve_expression"):
+            return value
+        return Value(value, output_field=models.DateField())
+
+    next_due_date = as_expression(next_due_date, "next_due_date")
+    snoozed_until = as_expression(snoozed_until, "snoozed_until")
+    return Greatest(
+        Coalesce(next_due_date, snoozed_until),
+        Coalesce(snoozed_until, next_due_date),
+        output_field=models.DateField(),
+    )
+
+
+class TaskQuerySet(models.QuerySet):
+    """
+    Keeps the stored effective_due_date in step on the bulk write paths,
+    which skip Task.save().
+    """
+
+    due_date_fields = frozenset({"next_due_date", "snoozed_until"})
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for task in objs:
+            task.refresh_effective_due_date()
+            task.render_description()
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        fields = list(fields)
+        objs = list(objs)
+        if self.due_date_fields & set(fields):
+            for task in objs:
+                task.refresh_effective_due_date()
+            if "effective_due_date" not in fields:
+                fields.append("effective_due_date")
+        if "description" in fields and "description_html" not in fields:
+            for task in objs:
+                task.render_description()
+            fields.append("description_html")
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
+    def update(self, **kwargs):
+        if self.due_date_fields & set(kwargs) and "effective_due_date" not in kwargs:
+            kwargs["effective_due_date"] = effective_due_date_expression(
+                kwargs.get("next_due_date", _CURRENT),
+                kwargs.get("snoozed_until", _CURRENT),
+            )
+        description = kwargs.get("description", _CURRENT)
+        if description is not _CURRENT and "description_html" not in kwargs:
+            # Only a literal value can be rendered here; rows updated with an
+            # expression keep stale HTML until render_task_descriptions runs.
+            if description is None or isinstance(description, str):
+                kwargs["description_html"] = render_markdown(description)
+        return super().update(**kwargs)
+
+
+class Task(TrackedFieldsMixin, BaseModel):
+    tracked_fields = (
+        "item_id",
+        "description",
+        "next_due_date",
+        "snoozed_until",
+        "estimated_hours_to_complete",
+        "frequency",
+    )
+
     class Frequency(models.IntegerChoices):
         DAILY = 1, "Daily"
         WEEKLY = 7, "Weekly"
@@ -95,6 +242,8 @@ class Task(BaseModel):
 
     name = models.CharField(max_length=255)
     description = models.TextField(blank=True, null=True)
+    # Markdown rendering of description, refreshed by save() when it changes.
+    description_html = models.TextField(blank=True, default="", editable=False)
     description_url = models.URLField(blank=True, null=True)
     item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name="tasks")
     frequency = models.IntegerField(choices=Frequency.choices, null=False)
@@ -103,9 +252,20 @@ class Task(BaseModel):
     next_due_date = models.DateField(blank=True, null=True)
     snoozed_until = models.DateField(blank=True, null=True)
     snooze_count = models.PositiveIntegerField(default=0)
+    # The later of next_due_date and snoozed_until, stored so the due list
+    # and dashboard can filter and sort on an index.
+    effective_due_date = models.DateField(blank=True, null=True, editable=False)
+
+    objects = TaskQuerySet.as_manager()
 
     class Meta:
         verbose_name_plural = "Tasks"
+        indexes = [
+            # Due tasks of a location: its items, then a range scan per item.
+            models.Index(fields=["item", "effective_due_date"], name="upkeep_task_item_due_idx"),
+            # Maintenance load: tasks due within the next month.
+            models.Index(fields=["item", "next_due_date"], name="upkeep_task_item_next_due_idx"),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.item.name})"
@@ -113,20 +273,32 @@ class Task(BaseModel):
     @property
     def days_overdue(self):
         from django.utils import timezone
-        
-        # Determine the effective due date: use snoozed_until if it's later than next_due_date
-        effective_due_date = self.next_due_date
-        if self.snoozed_until:
-            if not effective_due_date or self.snoozed_until > effective_due_date:
-                effective_due_date = self.snoozed_until
-        
-        if not effective_due_date:
+
+        if not self.effective_due_date:
             return 0
-            
+
         today = timezone.now().date()
-        delta = today - effective_due_date
+        delta = today - self.effective_due_date
         return delta.days
 
+    @staticmethod
+    def compute_effective_due_date(next_due_date, snoozed_until):
+        dates = [date for date in (next_due_date, snoozed_until) if date]
+        return max(dates) if dates else None
+
+    def refresh_effective_due_date(self):
+        self.effective_due_date = self.compute_effective_due_date(
+            self.next_due_date, self.snoozed_until
+        )
+
+    def render_description(self):
+        self.description_html = render_markdown(self.description)
+
+    def description_changed(self):
+        if self._state.adding or "description" not in getattr(self, "_loaded_values", {}):
+            return True
+        return self.description != self.loaded_value("description")
+
     def calculate_next_due_date(self):
         if self.last_performed and self.frequency:
             return self.last_performed + datetime.timedelta(days=self.frequency)
@@ -136,8 +308,44 @@ class Task(BaseModel):
     def save(self, *args, **kwargs):
         if not self.next_due_date:
             self.next_due_date = self.calculate_next_due_date()
-        
+        self.refresh_effective_due_date()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and TaskQuerySet.due_date_fields & set(update_fields):
+            update_fields = kwargs["update_fields"] = {*update_fields, "effective_due_date"}
+        if self.description_changed():
+            self.render_description()
+            if update_fields is not None and "description" in update_fields:
+                kwargs["update_fields"] = {*update_fields, "description_html"}
+
         # If last_performed was just updated, reset snooze data
         # Note: This is a simple check; for more robust tracking one might use __init__ to track old values
         # but for this logic it's usually sufficient if task_complete handles it.
         super().save(*args, **kwargs)
+
+
+class LocationStats(models.Model):
+    """
+    Dashboard counters for a location, kept up to date incrementally by the
+    handlers in upkeep.stats. The task counters depend on the date, so they
+    are only valid for ``computed_on`` and get recomputed on the first read
+    of a new day (and by the nightly reconcile_location_stats command).
+    """
+
+    location = models.OneToOneField(
+        Location, on_delete=models.CASCADE, primary_key=True, related_name="stats"
+    )
+    computed_on = models.DateField()
+
+    total_active_items = models.IntegerField(default=0)
+    broken_items_count = models.IntegerField(default=0)
+    total_asset_value = models.BigIntegerField(default=0)
+
+    overdue_tasks_count = models.IntegerField(default=0)
+    tasks_due_this_week = models.IntegerField(default=0)
+    maintenance_load = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "Location stats"
+
+    def __str__(self):
+        return f"Stats for location {self.location_id}"
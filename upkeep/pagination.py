@@ -0,0 +1,112 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q
+
+PAGE_SIZE = 50
+
+
+@dataclass
+class KeysetPage:
+    object_list: list
+    # Sort key of the row just before this page, None on the first page.
+    previous_key: tuple | None
+    next_cursor: str | None
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+def encode_cursor(key):
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode()
+
+
+def decode_cursor(cursor, length, valid=None):
+    """
+    Returns the sort key encoded in ``cursor``, or None when the cursor is
+    missing or malformed so the caller falls back to the first page.
+    ``valid(key)``, if given, can reject keys of the right shape whose values
+    the caller can't use.
+    """
+    if not cursor:
+        return None
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    if not isinstance(key, list) or len(key) != length:
+        return None
+    if not all(isinstance(value, (str, int, float)) for value in key):
+        return None
+    key = tuple(key)
+    if valid is not None and not valid(key):
+        return None
+    return key
+
+
+def row_key(obj, length):
+    return tuple(getattr(obj, f"keyset_{i}") for i in range(length))
+
+
+def keyset_paginate(queryset, keys, cursor=None, page_size=PAGE_SIZE, valid_key=None):
+    """
+    Paginates ``queryset`` by seeking past the sort key in ``cursor`` instead
+    of using OFFSET, so every page costs the same regardless of its depth.
+
+    ``keys`` are field names or expressions sorted ascending. They must not
+    produce NULLs (wrap nullable columns in Coalesce) and must end with a
+    unique column so the ordering is total. ``valid_key`` is passed on to
+    decode_cursor.
+    """
+    queryset, previous_key = _seek(queryset, keys, cursor, valid_key)
+    rows = list(queryset[: page_size + 1])
+    return _page(rows, len(keys), previous_key, page_size)
+
+
+async def akeyset_paginate(queryset, keys, cursor=None, page_size=PAGE_SIZE, valid_key=None):
+    """
+    ``keyset_paginate`` for async views.
+    """
+    queryset, previous_key = _seek(queryset, keys, cursor, valid_key)
+    rows = [row async for row in queryset[: page_size + 1]]
+    return _page(rows, len(keys), previous_key, page_size)
+
+
+def _seek(queryset, keys, cursor, valid_key):
+    names = [f"keyset_{i}" for i in range(len(keys))]
+    queryset = queryset.annotate(
+        **{
+            name: F(key) if isinstance(key, str) else key
+            for name, key in zip(names, keys)
+        }
+    ).order_by(*names)
+
+    previous_key = decode_cursor(cursor, len(keys), valid_key)
+    if previous_key is not None:
+        after = Q()
+        for i, name in enumerate(names):
+            after |= Q(
+                **{prev: value for prev, value in zip(names[:i], previous_key)},
+                **{f"{name}__gt": previous_key[i]},
+            )
+        try:
+            queryset = queryset.filter(after)
+        except (TypeError, ValueError, ValidationError):
+            # A tampered cursor whose values don't fit the key columns.
+            previous_key = None
+    return queryset, previous_key
+
+
+def _page(rows, length, previous_key, page_size):
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(row_key(rows[-1], length))
+
+    return KeysetPage(
+        object_list=rows, previous_key=previous_key, next_cursor=next_cursor
+    )
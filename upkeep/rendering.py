@@ -0,0 +1,99 @@
+"""
+Markdown rendering for task descriptions.
+
+The engine is chosen with ``settings.MARKDOWN_ENGINE``:
+
+- ``python-markdown`` (default): Python-Markdown with the "extra" and
+  "sane_lists" extensions, the original renderer.
+- ``markdown-it``: markdown-it-py, CommonMark plus tables, opt-in. Fenced
+  code and sane list numbering are CommonMark behaviour already.
+
+Both are configured for equivalent output on task descriptions (see the
+benchmark_markdown command for throughput and parity).
+
+Task.save() stores the rendered HTML in ``Task.description_html``, so pages
+normally never render Markdown. ``cached_render_markdown`` is the fallback for
+rows that have not been rendered yet: an in-process LRU keyed by a hash of the
+engine and source text, so a description is rendered once per worker however
+many times it is shown.
+"""
+
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
+
+import markdown as md
+from django.conf import settings
+from markdown_it import MarkdownIt
+
+DEFAULT_ENGINE = "python-markdown"
+EXTENSIONS = ["extra", "sane_lists"]
+CACHE_SIZE = 1024
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+class PythonMarkdownEngine:
+    def __init__(self):
+        # Building a Markdown instance (loading the extensions) costs more
+        # than a typical conversion, so keep one per thread and reset it.
+        self._local = threading.local()
+
+    def _converter(self):
+        converter = getattr(self._local, "converter", None)
+        if converter is None:
+            converter = self._local.converter = md.Markdown(extensions=EXTENSIONS)
+        return converter
+
+    def render(self, text):
+        return self._converter().reset().convert(text)
+
+
+class MarkdownItEngine:
+    def __init__(self):
+        self._md = MarkdownIt("commonmark").enable("table")
+
+    def render(self, text):
+        # Python-Markdown does not end its output with a newline.
+        return self._md.render(text).rstrip("\n")
+
+
+ENGINES = {
+    "markdown-it": MarkdownItEngine,
+    "python-markdown": PythonMarkdownEngine,
+}
+
+
+@functools.cache
+def _engine(name):
+    return ENGINES[name]()
+
+
+def get_engine(name=None):
+    return _engine(name or getattr(settings, "MARKDOWN_ENGINE", DEFAULT_ENGINE))
+
+
+def render_markdown(text):
+    if not text:
+        return ""
+    return get_engine().render(text)
+
+
+def cached_render_markdown(text):
+    if not text:
+        return ""
+    name = getattr(settings, "MARKDOWN_ENGINE", DEFAULT_ENGINE)
+    key = (name, hashlib.blake2b(text.encode(), digest_size=16).digest())
+    with _lock:
+        rendered = _cache.get(key)
+        if rendered is not None:
+            _cache.move_to_end(key)
+            return rendered
+    rendered = get_engine(name).render(text)
+    with _lock:
+        _cache[key] = rendered
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return rendered
@@ -0,0 +1,335 @@
+"""
+Indexed full-text search for items and tasks.
+
+PostgreSQL matches a tsvector over the searchable columns (GIN expression
+index) with prefix queries for search-as-you-type, and trigram word
+similarity (pg_trgm GIN index) for typo tolerance. SQLite matches FTS5
+tables kept in sync by triggers, and expands misspelt terms against the
+FTS5 vocabulary.
+
+Both backends return the queryset filtered to the matches together with a
+rank expression that sorts best matches first, so it can be used directly
+as a keyset pagination key.
+"""
+
+import difflib
+import re
+
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramWordSimilarity,
+)
+from django.db import connection, connections
+from django.db.models import FloatField, Q
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast
+
+SEARCH_CONFIG = "simple"
+MAX_TERMS = 8
+
+ITEM_FTS = "upkeep_item_fts"
+TASK_FTS = "upkeep_task_fts"
+
+SQLITE_SCHEMA = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {ITEM_FTS} USING fts5(
+        name, brand, area, tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {TASK_FTS} USING fts5(
+        name, item_name, description, tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {ITEM_FTS}_vocab USING fts5vocab({ITEM_FTS}, 'row')",
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {TASK_FTS}_vocab USING fts5vocab({TASK_FTS}, 'row')",
+    f"""CREATE TRIGGER IF NOT EXISTS {ITEM_FTS}_ai AFTER INSERT ON upkeep_item BEGIN
+        INSERT INTO {ITEM_FTS}(rowid, name, brand, area)
+        VALUES (new.id, new.name, new.brand, new.area);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {ITEM_FTS}_au AFTER UPDATE OF name, brand, area ON upkeep_item BEGIN
+        UPDATE {ITEM_FTS} SET name = new.name, brand = new.brand, area = new.area
+        WHERE rowid = new.id;
+        UPDATE {TASK_FTS} SET item_name = new.name
+        WHERE rowid IN (SELECT id FROM upkeep_task WHERE item_id = new.id);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {ITEM_FTS}_ad AFTER DELETE ON upkeep_item BEGIN
+        DELETE FROM {ITEM_FTS} WHERE rowid = old.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {TASK_FTS}_ai AFTER INSERT ON upkeep_task BEGIN
+        INSERT INTO {TASK_FTS}(rowid, name, item_name, description)
+        SELECT new.id, new.name, name, new.description FROM upkeep_item WHERE id = new.item_id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {TASK_FTS}_au AFTER UPDATE OF name, description, item_id ON upkeep_task BEGIN
+        UPDATE {TASK_FTS} SET
+            name = new.name,
+            description = new.description,
+            item_name = (SELECT name FROM upkeep_item WHERE id = new.item_id)
+        WHERE rowid = new.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {TASK_FTS}_ad AFTER DELETE ON upkeep_task BEGIN
+        DELETE FROM {TASK_FTS} WHERE rowid = old.id;
+    END""",
+]
+
+SQLITE_TRIGGER_TEARDOWN = [
+    f"DROP TRIGGER IF EXISTS {table}_{suffix}"
+    for table in (ITEM_FTS, TASK_FTS)
+    for suffix in ("ai", "au", "ad")
+]
+
+SQLITE_TEARDOWN = [
+    f"DROP TABLE IF EXISTS {ITEM_FTS}_vocab",
+    f"DROP TABLE IF EXISTS {TASK_FTS}_vocab",
+    f"DROP TABLE IF EXISTS {ITEM_FTS}",
+    f"DROP TABLE IF EXISTS {TASK_FTS}",
+] + SQLITE_TRIGGER_TEARDOWN
+
+
+def item_vector():
+    return SearchVector("name", "brand", "area", config=SEARCH_CONFIG)
+
+
+def task_vector():
+    return SearchVector("name", "description", config=SEARCH_CONFIG)
+
+
+def postgres_indexes():
+    """
+    The GIN indexes backing the PostgreSQL search path, as (model name, index).
+    The expression indexes must stay identical to item_vector()/task_vector()
+    or the planner will not use them.
+    """
+    return [
+        ("item", GinIndex(item_vector(), name="upkeep_item_search_idx")),
+        ("item", GinIndex(fields=["name"], opclasses=["gin_trgm_ops"], name="upkeep_item_name_trgm_idx")),
+        ("task", GinIndex(task_vector(), name="upkeep_task_search_idx")),
+        ("task", GinIndex(fields=["name"], opclasses=["gin_trgm_ops"], name="upkeep_task_name_trgm_idx")),
+    ]
+
+
+def install(schema_editor, item_model, task_model):
+    """
+    Creates the search tables, triggers and indexes for the current backend.
+    Safe to run repeatedly.
+    """
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        for statement in SQLITE_SCHEMA:
+            schema_editor.execute(statement)
+    elif vendor == "postgresql":
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        models = {"item": item_model, "task": task_model}
+        with schema_editor.connection.cursor() as cursor:
+            existing = {
+                name
+                for model in models.values()
+                for name in schema_editor.connection.introspection.get_constraints(
+                    cursor, model._meta.db_table
+                )
+            }
+        for model_name, index in postgres_indexes():
+            if index.name not in existing:
+                schema_editor.add_index(models[model_name], index)
+
+
+def uninstall(schema_editor, item_model, task_model):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        for statement in SQLITE_TEARDOWN:
+            schema_editor.execute(statement)
+    elif vendor == "postgresql":
+        for _, index in postgres_indexes():
+            schema_editor.execute(f"DROP INDEX IF EXISTS {index.name}")
+
+
+def drop_sqlite_triggers(apps, schema_editor):
+    """
+    RunPython operation for migrations that make SQLite rebuild upkeep_item
+    or upkeep_task: the rebuild fails while the other table's triggers still
+    reference the table. Pair with restore_sqlite_triggers afterwards.
+    """
+    if schema_editor.connection.vendor == "sqlite":
+        for statement in SQLITE_TRIGGER_TEARDOWN:
+            schema_editor.execute(statement)
+
+
+def restore_sqlite_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        for statement in SQLITE_SCHEMA:
+            schema_editor.execute(statement)
+
+
+def populate(conn):
+    """
+    Refills the search index from the item and task tables. On SQLite the
+    FTS5 tables are rewritten; on PostgreSQL the GIN indexes are rebuilt.
+    """
+    with conn.cursor() as cursor:
+        if conn.vendor == "sqlite":
+            cursor.execute(f"DELETE FROM {ITEM_FTS}")
+            cursor.execute(
+                f"INSERT INTO {ITEM_FTS}(rowid, name, brand, area) "
+                "SELECT id, name, brand, area FROM upkeep_item"
+            )
+            cursor.execute(f"DELETE FROM {TASK_FTS}")
+            cursor.execute(
+                f"INSERT INTO {TASK_FTS}(rowid, name, item_name, description) "
+                "SELECT t.id, t.name, i.name, t.description "
+                "FROM upkeep_task t JOIN upkeep_item i ON i.id = t.item_id"
+            )
+            cursor.execute(f"INSERT INTO {ITEM_FTS}({ITEM_FTS}) VALUES ('optimize')")
+            cursor.execute(f"INSERT INTO {TASK_FTS}({TASK_FTS}) VALUES ('optimize')")
+        elif conn.vendor == "postgresql":
+            for _, index in postgres_indexes():
+                cursor.execute(f"REINDEX INDEX {index.name}")
+            cursor.execute("ANALYZE upkeep_item")
+            cursor.execute("ANALYZE upkeep_task")
+
+
+def rebuild():
+    """
+    Reinstalls any missing search tables, triggers or indexes (SQLite drops
+    triggers when a migration rebuilds a table) and repopulates the index.
+    """
+    from .models import Item, Task
+
+    if connection.vendor == "sqlite":
+        # The SQLite schema editor refuses to run inside a transaction; the
+        # statements are plain DDL anyway.
+        with connection.cursor() as cursor:
+            for statement in SQLITE_SCHEMA:
+                cursor.execute(statement)
+    else:
+        with connection.schema_editor() as schema_editor:
+            install(schema_editor, Item, Task)
+    populate(connection)
+
+
+def ensure_sqlite_triggers(sender, using, **kwargs):
+    """
+    post_migrate handler: SQLite drops a table's triggers when a migration
+    rebuilds it, so put them back after every migrate run.
+    """
+    conn = connections[using]
+    if conn.vendor != "sqlite":
+        return
+    if ITEM_FTS not in conn.introspection.table_names():
+        # The search migration has not been applied (or was reversed).
+        return
+    with conn.cursor() as cursor:
+        for statement in SQLITE_SCHEMA:
+            cursor.execute(statement)
+
+
+def search_terms(query):
+    return re.findall(r"\w+", query.lower())[:MAX_TERMS]
+
+
+def search_items(queryset, query):
+    """
+    Filters an Item queryset to rows matching ``query``. Returns the queryset
+    and a rank expression (lower is better), or None when there is nothing
+    to search for.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return queryset, None
+
+    if connections[queryset.db].vendor == "postgresql":
+        search_query = _prefix_query(terms)
+        vector = item_vector()
+        queryset = queryset.alias(search_vector=vector).filter(
+            Q(search_vector=search_query) | Q(name__trigram_word_similar=query)
+        )
+        rank = SearchRank(vector, search_query) + TrigramWordSimilarity(query, "name")
+        return queryset, Cast(-rank, FloatField())
+
+    match = _fts_match(queryset.db, ITEM_FTS, terms)
+    return _fts_join(queryset, ITEM_FTS, match), RawSQL(
+        f"bm25({ITEM_FTS}, 10.0, 2.0, 2.0)", [], output_field=FloatField()
+    )
+
+
+def search_tasks(queryset, query):
+    """
+    Filters a Task queryset to rows whose name, description or item name
+    match ``query``. Returns the queryset and a rank expression (lower is
+    better), or None when there is nothing to search for.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return queryset, None
+
+    if connections[queryset.db].vendor == "postgresql":
+        search_query = _prefix_query(terms)
+        # The terms may be spread over the task and its item ("furnace
+        # filter"), as with the item_name column of the FTS5 table. The item
+        # name is in another table, so this vector can't use the task's
+        # expression index; task searches are scoped to a location anyway.
+        vector = task_vector() + SearchVector("item__name", config=SEARCH_CONFIG)
+        queryset = queryset.alias(search_vector=vector).filter(
+            Q(search_vector=search_query)
+            | Q(name__trigram_word_similar=query)
+            | Q(item__name__trigram_word_similar=query)
+        )
+        rank = (
+            SearchRank(vector, search_query)
+            + TrigramWordSimilarity(query, "name")
+            + TrigramWordSimilarity(query, "item__name")
+        )
+        return queryset, Cast(-rank, FloatField())
+
+    match = _fts_match(queryset.db, TASK_FTS, terms)
+    return _fts_join(queryset, TASK_FTS, match), RawSQL(
+        f"bm25({TASK_FTS}, 10.0, 5.0, 1.0)", [], output_field=FloatField()
+    )
+
+
+def _fts_join(queryset, table, match):
+    # Joining the FTS5 table (rather than a correlated subquery per row) lets
+    # SQLite run the MATCH once and makes bm25() available to the outer query.
+    # The ORM has no way to express this join, hence extra().
+    return queryset.extra(
+        tables=[table],
+        where=[f"{table}.rowid = {queryset.model._meta.db_table}.id", f"{table} MATCH %s"],
+        params=[match],
+    )
+
+
+def _prefix_query(terms):
+    # Terms are \w+ only, so they are safe to splice into a raw tsquery.
+    return SearchQuery(
+        " & ".join(f"{term}:*" for term in terms),
+        search_type="raw",
+        config=SEARCH_CONFIG,
+    )
+
+
+def _fts_match(using, table, terms):
+    """
+    Builds an FTS5 MATCH expression: every term must match, either as a
+    prefix or as one of its close spellings from the index vocabulary.
+    """
+    clauses = []
+    for term in terms:
+        alternatives = [f'"{term}"*']
+        alternatives.extend(f'"{close}"' for close in _close_terms(using, table, term))
+        clauses.append("(" + " OR ".join(alternatives) + ")")
+    return " AND ".join(clauses)
+
+
+def _close_terms(using, table, term):
+    if len(term) < 4:
+        return []
+    # Typos rarely hit the first letter, which keeps the candidate set small.
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f"SELECT term FROM {table}_vocab WHERE term >= %s AND term < %s",
+            [term[0], chr(ord(term[0]) + 1)],
+        )
+        candidates = [row[0] for row in cursor.fetchall()]
+    return [
+        close
+        for close in difflib.get_close_matches(term, candidates, n=3, cutoff=0.75)
+        if close != term
+    ]
@@ -0,0 +1,239 @@
+"""
+Incrementally maintained per-location dashboard counters (LocationStats).
+
+Saving or deleting an Item or Task applies the difference between the row's
+old and new contribution to its location's counters with a single
+``UPDATE ... SET x = x + delta``. Writes that bypass model signals
+(bulk_create, QuerySet.update) must call ``refresh_location_stats`` for the
+locations they touch.
+"""
+
+import datetime
+
+from asgiref.sync import sync_to_async
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from .forecast import forecast, occurrences
+from .models import Item, Location, LocationStats, Task
+
+# The maintenance load covers today and the next 30 days.
+LOAD_DAYS = 31
+
+
+def item_contribution(status, purchase_value):
+    active = status == Item.ItemStatus.ACTIVE
+    return {
+        "total_active_items": int(active),
+        "broken_items_count": int(status == Item.ItemStatus.BROKEN),
+        "total_asset_value": (purchase_value or 0) if active else 0,
+    }
+
+
+def task_contribution(next_due_date, snoozed_until, hours, frequency, today):
+    """
+    Python mirror of ``compute_counters``; the two must agree or the
+    incremental counters drift until the next reconciliation.
+    """
+    week_from_now = today + datetime.timedelta(days=7)
+    effective_due_date = Task.compute_effective_due_date(next_due_date, snoozed_until)
+    overdue = effective_due_date is not None and effective_due_date < today
+    due_this_week = effective_due_date is not None and effective_due_date <= week_from_now
+    # Every time the task is due in the window, overdue tasks from today.
+    times_due = occurrences(effective_due_date, frequency, today, LOAD_DAYS)
+    return {
+        "overdue_tasks_count": int(overdue),
+        "tasks_due_this_week": int(due_this_week),
+        "maintenance_load": (hours or 0) * times_due,
+    }
+
+
+def compute_counters(location_id, today):
+    """
+    Computes every counter for a location from scratch: one conditional
+    aggregate over its items and one over its tasks.
+    """
+    week_from_now = today + datetime.timedelta(days=7)
+    active = Q(status=Item.ItemStatus.ACTIVE)
+
+    counters = Item.objects.filter(location_id=location_id).aggregate(
+        total_active_items=Count("id", filter=active),
+        broken_items_count=Count("id", filter=Q(status=Item.ItemStatus.BROKEN)),
+        total_asset_value=Sum("purchase_value", filter=active),
+    )
+    tasks = Task.objects.filter(item__location_id=location_id)
+    counters.update(
+        tasks.aggregate(
+            # Overdue: due (and not snoozed) before today
+            overdue_tasks_count=Count("id", filter=Q(effective_due_date__lt=today)),
+            tasks_due_this_week=Count("id", filter=Q(effective_due_date__lte=week_from_now)),
+        )
+    )
+    # Estimated hours for every recurrence due in the next 30 days.
+    counters["maintenance_load"] = forecast(tasks, today, LOAD_DAYS).total_hours
+    return {name: value or 0 for name, value in counters.items()}
+
+
+def refresh_location_stats(location_ids, today=None):
+    """
+    Recomputes and stores the counters for the given locations.
+    """
+    today = today or timezone.now().date()
+    existing = set(Location.objects.filter(pk__in=location_ids).values_list("pk", flat=True))
+    for location_id in existing:
+        LocationStats.objects.update_or_create(
+            location_id=location_id,
+            defaults={"computed_on": today, **compute_counters(location_id, today)},
+        )
+
+
+def get_location_stats(location, today=None):
+    """
+    Returns the counters for ``location`` with a primary-key lookup,
+    recomputing them first if they are missing or from an earlier day.
+    """
+    today = today or timezone.now().date()
+    stats = LocationStats.objects.filter(pk=location.pk).first()
+    if stats is None or stats.computed_on != today:
+        refresh_location_stats([location.pk], today)
+        stats = LocationStats.objects.get(pk=location.pk)
+    return stats
+
+
+async def aget_location_stats(location, today=None):
+    """
+    ``get_location_stats`` for async views.
+    """
+    today = today or timezone.now().date()
+    stats = await LocationStats.objects.filter(pk=location.pk).afirst()
+    if stats is None or stats.computed_on != today:
+        # Once per location and day; the recount runs in a transaction.
+        await sync_to_async(refresh_location_stats)([location.pk], today)
+        stats = await LocationStats.objects.aget(pk=location.pk)
+    return stats
+
+
+def apply_delta(location_id, old, new):
+    """
+    Adds ``new - old`` to the counters of ``location_id``. A location without
+    a stats row yet is computed from scratch instead.
+    """
+    if location_id is None:
+        return
+    changes = {
+        name: new.get(name, 0) - old.get(name, 0)
+        for name in set(old) | set(new)
+        if new.get(name, 0) != old.get(name, 0)
+    }
+    if not changes:
+        return
+    updated = LocationStats.objects.filter(location_id=location_id).update(
+        **{name: F(name) + delta for name, delta in changes.items()}
+    )
+    if not updated:
+        refresh_location_stats([location_id])
+
+
+def _item_location_id(task, item_id):
+    if item_id is None:
+        return None
+    item = Task.item.field.get_cached_value(task, None)
+    if item is not None and item.pk == item_id:
+        return item.location_id
+    return Item.objects.filter(pk=item_id).values_list("location_id", flat=True).first()
+
+
+def _deleted_by(origin, model):
+    """
+    True when the delete was started on ``model`` itself rather than
+    cascading from a parent row.
+    """
+    origin_model = getattr(origin, "model", None) or type(origin)
+    return origin is None or origin_model is model
+
+
+def _has_snapshot(instance):
+    return len(getattr(instance, "_loaded_values", {})) == len(instance.tracked_fields)
+
+
+def item_saved(sender, instance, created, **kwargs):
+    new = item_contribution(instance.status, instance.purchase_value)
+    if created:
+        apply_delta(instance.location_id, {}, new)
+    elif not _has_snapshot(instance):
+        refresh_location_stats([instance.location_id])
+    else:
+        old_location_id = instance.loaded_value("location_id")
+        old = item_contribution(
+            instance.loaded_value("status"), instance.loaded_value("purchase_value")
+        )
+        if old_location_id != instance.location_id:
+            # The item's tasks moved along with it.
+            refresh_location_stats([old_location_id, instance.location_id])
+        else:
+            apply_delta(instance.location_id, old, new)
+    instance.snapshot_tracked_fields()
+
+
+def item_deleted(sender, instance, origin=None, **kwargs):
+    if not _deleted_by(origin, Item):
+        # Cascading from its location, whose stats row goes with it.
+        return
+    # The item's tasks were deleted just before it, so recount the location.
+    refresh_location_stats([instance.loaded_value("location_id", instance.location_id)])
+
+
+def task_saved(sender, instance, created, **kwargs):
+    today = timezone.now().date()
+    new = task_contribution(
+        instance.next_due_date,
+        instance.snoozed_until,
+        instance.estimated_hours_to_complete,
+        instance.frequency,
+        today,
+    )
+    location_id = _item_location_id(instance, instance.item_id)
+    if created:
+        apply_delta(location_id, {}, new)
+    elif not _has_snapshot(instance):
+        refresh_location_stats([location_id])
+    else:
+        old = task_contribution(
+            instance.loaded_value("next_due_date"),
+            instance.loaded_value("snoozed_until"),
+            instance.loaded_value("estimated_hours_to_complete"),
+            instance.loaded_value("frequency"),
+            today,
+        )
+        old_item_id = instance.loaded_value("item_id")
+        if old_item_id == instance.item_id:
+            apply_delta(location_id, old, new)
+        else:
+            apply_delta(_item_location_id(instance, old_item_id), old, {})
+            apply_delta(location_id, {}, new)
+    instance.snapshot_tracked_fields()
+
+
+def task_deleted(sender, instance, origin=None, **kwargs):
+    if not _deleted_by(origin, Task):
+        # Cascading from an item or location; item_deleted recounts.
+        return
+    today = timezone.now().date()
+    old = task_contribution(
+        instance.loaded_value("next_due_date", instance.next_due_date),
+        instance.loaded_value("snoozed_until", instance.snoozed_until),
+        instance.loaded_value(
+            "estimated_hours_to_complete", instance.estimated_hours_to_complete
+        ),
+        instance.loaded_value("frequency", instance.frequency),
+        today,
+    )
+    item_id = instance.loaded_value("item_id", instance.item_id)
+    apply_delta(_item_location_id(instance, item_id), old, {})
+
+
+def location_saved(sender, instance, created, **kwargs):
+    if created:
+        LocationStats.objects.get_or_create(
+            location=instance, defaults={"computed_on": timezone.now().date()}
+        )
@@ -0,0 +1,203 @@
+"""
+Synthetic households for local load testing: accounts with their members,
+locations, items and tasks, bulk-created from a seeded random generator so
+the same arguments always produce the same data (relative to today).
+
+Every user is named ``<prefix>-<account>-<member>``, which is how
+``delete_households`` finds a generated dataset again.
+"""
+
+import datetime
+import random
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from common.models import Account, Profile
+
+from .models import Item, Location, Task
+from .stats import refresh_location_stats
+
+# Area -> (item names, brands)
+CATALOG = {
+    "Kitchen": (
+        ["Refrigerator", "Dishwasher", "Oven", "Range hood", "Microwave", "Coffee machine"],
+        ["Bosch", "Miele", "Siemens", "Whirlpool", "Samsung"],
+    ),
+    "Laundry": (
+        ["Washing machine", "Tumble dryer", "Water softener"],
+        ["Miele", "LG", "Electrolux", "AEG"],
+    ),
+    "Bathroom": (
+        ["Extractor fan", "Shower", "Towel radiator", "Toilet cistern"],
+        ["Grohe", "Hansgrohe", "Geberit", "Vent-Axia"],
+    ),
+    "Basement": (
+        ["Boiler", "Water heater", "Sump pump", "Dehumidifier", "Heat pump"],
+        ["Viessmann", "Vaillant", "Daikin", "Bosch"],
+    ),
+    "Garage": (
+        ["Garage door opener", "Car charger", "Air compressor", "Chest freezer"],
+        ["Chamberlain", "Wallbox", "Makita", "Liebherr"],
+    ),
+    "Garden": (
+        ["Lawn mower", "Robotic mower", "Pond pump", "Irrigation controller", "Hedge trimmer"],
+        ["Husqvarna", "Stihl", "Gardena", "Bosch"],
+    ),
+    "Living room": (
+        ["Smoke detector", "Air purifier", "Fireplace", "Thermostat"],
+        ["Nest", "Philips", "Dyson", "Honeywell"],
+    ),
+}
+AREAS = list(CATALOG)
+
+TASKS = [
+    "Inspect {}",
+    "Clean {}",
+    "Service {}",
+    "Replace the filter of {}",
+    "Check the seals of {}",
+    "Descale {}",
+]
+DESCRIPTION = (
+    "## Tools & Parts\n- Screwdriver\n- Cloth\n\n"
+    "## Steps\n1. Switch off the **{}**\n2. {}\n3. Switch it back on"
+)
+
+# How common each frequency is among real tasks; daily chores are rare.
+FREQUENCY_WEIGHTS = {
+    Task.Frequency.DAILY: 1,
+    Task.Frequency.WEEKLY: 3,
+    Task.Frequency.BI_WEEKLY: 2,
+    Task.Frequency.MONTHLY: 5,
+    Task.Frequency.BI_MONTHLY: 2,
+    Task.Frequency.QUARTERLY: 4,
+    Task.Frequency.YEARLY: 5,
+}
+
+LOCATION_NAMES = ["Home", "Cabin", "Flat", "Parents' house", "Boat", "Allotment"]
+
+BATCH_SIZE = 500
+
+
+def generate_households(
+    prefix,
+    *,
+    accounts=10,
+    members=3,
+    locations=2,
+    items=200,
+    tasks_per_item=2,
+    seed=1,
+    password=None,
+    today=None,
+):
+    """
+    Creates ``accounts`` households of ``members`` users each (the first is
+    the owner), with ``locations`` locations of ``items`` items and about
+    ``tasks_per_item`` tasks per item; the first seven tasks of each location
+    cover every frequency. Returns the accounts.
+
+    The users get ``password`` if given, else an unusable one.
+    """
+    rng = random.Random(seed)
+    today = today or timezone.now().date()
+    hashed = make_password(password)
+    created = []
+    with transaction.atomic():
+        for a in range(accounts):
+            users = get_user_model().objects.bulk_create(
+                get_user_model()(username=f"{prefix}-{a:04}-{m}", password=hashed)
+                for m in range(max(1, members))
+            )
+            account = Account.objects.create(name=f"Household {a}", owner=users[0])
+            Profile.objects.bulk_create(Profile(user=user, account=account) for user in users)
+            for n in range(locations):
+                name = LOCATION_NAMES[n % len(LOCATION_NAMES)]
+                location = Location.objects.create(
+                    name=name if n < len(LOCATION_NAMES) else f"{name} {n}",
+                    account=account,
+                    default=n == 0,
+                )
+                _fill(rng, location, items, tasks_per_item, today)
+            created.append(account)
+        refresh_location_stats(
+            list(Location.objects.filter(account__in=created).values_list("pk", flat=True)),
+            today,
+        )
+    return created
+
+
+def _fill(rng, location, count, tasks_per_item, today):
+    items = Item.objects.bulk_create(
+        (_item(rng, location, n, today) for n in range(count)), batch_size=BATCH_SIZE
+    )
+    frequencies = list(FREQUENCY_WEIGHTS)
+    weights = list(FREQUENCY_WEIGHTS.values())
+    tasks = []
+    for item in items:
+        for _ in range(rng.randint(0, 2 * tasks_per_item)):
+            # The first tasks of a location take every frequency in turn.
+            if len(tasks) < len(frequencies):
+                frequency = frequencies[len(tasks)]
+            else:
+                frequency = rng.choices(frequencies, weights)[0]
+            tasks.append(_task(rng, item, frequency, today))
+    Task.objects.bulk_create(tasks, batch_size=BATCH_SIZE)
+
+
+def _item(rng, location, n, today):
+    area = rng.choice(AREAS)
+    names, brands = CATALOG[area]
+    brand = rng.choice(brands)
+    purchased = today - datetime.timedelta(days=rng.randint(30, 15 * 365))
+    status = rng.choices(list(Item.ItemStatus), [90, 4, 6])[0]
+    return Item(
+        name=f"{rng.choice(names)} {n}",
+        location=location,
+        status=status,
+        quantity=rng.choices([1, 2, 4], [90, 8, 2])[0],
+        area=area,
+        brand=brand,
+        model_number=f"{brand[:3].upper()}{rng.randint(100, 999)}",
+        serial_number=f"{brand[:2].upper()}-{rng.randrange(10 ** 8):08}",
+        purchase_value=round(rng.lognormvariate(5.5, 1.0)),
+        purchase_place=rng.choice(["Online", "Local store", "Installer", None]),
+        purchase_year=purchased.year,
+        # Two to five years of warranty: most have expired, some run out soon.
+        warranty_expiration=purchased + datetime.timedelta(days=365 * rng.randint(2, 5)),
+    )
+
+
+def _task(rng, item, frequency, today):
+    name = rng.choice(TASKS).format(item.name.lower())
+    last_performed = today - datetime.timedelta(days=rng.randint(0, 2 * frequency))
+    snoozed = rng.random() < 0.05
+    return Task(
+        name=name,
+        description=DESCRIPTION.format(item.name, name) if rng.random() < 0.5 else None,
+        item=item,
+        frequency=frequency,
+        estimated_hours_to_complete=rng.choices([1, 2, 4, 8], [60, 25, 10, 5])[0],
+        last_performed=last_performed,
+        next_due_date=last_performed + datetime.timedelta(days=frequency),
+        snoozed_until=today + datetime.timedelta(days=rng.randint(1, 7)) if snoozed else None,
+        snooze_count=rng.randint(1, 3) if snoozed else 0,
+    )
+
+
+def delete_households(prefix):
+    """
+    Deletes the households generated with ``prefix`` and their users.
+    Returns the number of accounts deleted.
+    """
+    users = get_user_model().objects.filter(username__startswith=f"{prefix}-")
+    accounts = Account.objects.filter(owner__in=users)
+    with transaction.atomic():
+        count = accounts.count()
+        Location.objects.filter(account__in=accounts).delete()
+        accounts.delete()
+        users.delete()
+    return count
@@ -1,17 +1,114 @@
-import markdown as md
+import hashlib
+
 from django import template
+from django.conf import settings
 from django.utils.safestring import mark_safe
 
+from upkeep.fragments import FRAGMENT_KEYS, fragment_cache, fragment_key
+from upkeep.rendering import cached_render_markdown
+
 register = template.Library()
 
 @register.filter(name='markdownify')
 def markdownify(value):
     """
-    Converts a markdown string into HTML.
+    Converts a markdown string into HTML. Tasks store their rendered
+    description (Task.description_html); this is the fallback for text
+    without one, cached by content hash.
     """
     if not value:
         return ""
-    
-    # We can add extensions here later if needed (e.g., 'extra', 'toc')
-    html = md.markdown(value, extensions=['extra', 'sane_lists'])
-    return mark_safe(html)
+
+    return mark_safe(cached_render_markdown(value))
+
+
+# Fragments prefetched for the template being rendered, by cache key.
+PREFETCHED = "upkeep.prefetched_fragments"
+
+
+def _fragment_bits(parser, token, what):
+    bits = token.split_contents()
+    if len(bits) < 3 or bits[1][0] not in "\"'" or bits[1][1:-1] not in FRAGMENT_KEYS:
+        raise template.TemplateSyntaxError(
+            f"'{bits[0]}' takes a fragment name from upkeep.fragments, {what} "
+            "and optionally more values the markup depends on."
+        )
+    return bits[1][1:-1], [parser.compile_filter(bit) for bit in bits[2:]]
+
+
+class FragmentNode(template.Node):
+    def __init__(self, name, obj, vary_on, nodelist):
+        self.name = name
+        self.obj = obj
+        self.vary_on = vary_on
+        self.nodelist = nodelist
+        source = "".join(node.token.contents for node in nodelist.get_nodes_by_type(template.Node))
+        self.fingerprint = hashlib.md5(source.encode(), usedforsecurity=False).hexdigest()[:12]
+
+    def render(self, context):
+        vary_on = [var.resolve(context) for var in self.vary_on]
+        key = fragment_key(self.name, self.fingerprint, self.obj.resolve(context), vary_on)
+        prefetched = context.render_context.get(PREFETCHED, {})
+        if key in prefetched:
+            html = prefetched[key]
+        else:
+            html = fragment_cache().get(key)
+        if html is None:
+            html = self.nodelist.render(context)
+            fragment_cache().set(key, html, settings.FRAGMENT_CACHE_TIMEOUT)
+        return html
+
+
+@register.tag(name="fragment")
+def do_fragment(parser, token):
+    """
+    Caches the enclosed markup for one object, keyed as configured in
+    upkeep.fragments:
+
+        {% fragment "task-row" task grouping_type %}...{% endfragment %}
+    """
+    name, (obj, *vary_on) = _fragment_bits(parser, token, "an object")
+    nodelist = parser.parse(("endfragment",))
+    parser.delete_first_token()
+    return FragmentNode(name, obj, vary_on, nodelist)
+
+
+class PrefetchFragmentsNode(template.Node):
+    def __init__(self, name, objects, vary_on):
+        self.name = name
+        self.objects = objects
+        self.vary_on = vary_on
+
+    def render(self, context):
+        fragments = [
+            node
+            for node in context.render_context.template.nodelist.get_nodes_by_type(FragmentNode)
+            if node.name == self.name
+        ]
+        if not fragments:
+            return ""
+        vary_on = [var.resolve(context) for var in self.vary_on]
+        keys = [
+            fragment_key(self.name, fragments[0].fingerprint, obj, vary_on)
+            for obj in self.objects.resolve(context) or ()
+        ]
+        found = fragment_cache().get_many(keys)
+        prefetched = context.render_context.get(PREFETCHED)
+        if prefetched is None:
+            prefetched = context.render_context[PREFETCHED] = {}
+        # Misses are remembered too, so they are not looked up again.
+        prefetched.update((key, found.get(key)) for key in keys)
+        return ""
+
+
+@register.tag(name="prefetch_fragments")
+def do_prefetch_fragments(parser, token):
+    """
+    Reads the cached fragments of every object in a list with one cache
+    round trip, ahead of the loop that renders them with {% fragment %}
+    (in the same template):
+
+        {% prefetch_fragments "task-row" page.object_list grouping_type %}
+    """
+    name, (objects, *vary_on) = _fragment_bits(parser, token, "a list")
+    return PrefetchFragmentsNode(name, objects, vary_on)
@@ -0,0 +1,103 @@
+import re
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.http import HttpResponse
+from django.test import AsyncClient, RequestFactory, TestCase, Client
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from .middleware import ActiveLocationMiddleware
+from .models import Location, Item, Task
+
+from common.models import Account, Profile
+
+User = get_user_model()
+
+PAGES = ('home', 'item-list', 'task-management-list', 'task-due-list')
+
+def strip_csrf(content):
+    return re.sub(rb'(csrfmiddlewaretoken" value=|X-CSRFToken": )"[^"]+"', b"", content)
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='asyncuser', password='password')
+        self.account = Account.objects.create(name="Test Household", owner=self.user)
+        self.profile = Profile.objects.create(user=self.user, account=self.account)
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.async_client = AsyncClient()
+        self.async_client.cookies = self.client.cookies
+
+        self.home = Location.objects.create(name="Home", account=self.account, default=True)
+        self.cabin = Location.objects.create(name="Cabin", account=self.account)
+        self.item = Item.objects.create(name="Boiler", location=self.home, area="Basement")
+        Item.objects.create(name="Stove", location=self.cabin)
+        Task.objects.create(
+            name="Bleed radiators", item=self.item, frequency=Task.Frequency.YEARLY,
+            next_due_date=timezone.now().date(),
+        )
+
+    async def test_pages_match_the_sync_rendering(self):
+        for page in PAGES:
+            for data, headers in (
+                ({}, {}),
+                ({}, {"HX-Request": "true"}),
+                ({"q": "boiler"}, {"HX-Request": "true"}),
+                ({"group_by": "area"}, {}),
+            ):
+                response = await self.async_client.get(reverse(page), data, headers=headers)
+                self.assertEqual(response.status_code, 200, (page, data, headers))
+                expected = await sync_to_async(self.client.get)(reverse(page), data, headers=headers)
+                self.assertEqual(strip_csrf(response.content), strip_csrf(expected.content), (page, data, headers))
+
+        response = await self.async_client.get(reverse('task-management-list'))
+        self.assertContains(response, f'<option value="{self.item.pk}">Boiler</option>', html=True)
+
+    async def test_not_modified(self):
+        response = await self.async_client.get(reverse('item-list'))
+        response = await self.async_client.get(reverse('item-list'))
+        response = await self.async_client.get(reverse('item-list'), headers={"If-None-Match": response["ETag"]})
+        self.assertEqual(response.status_code, 304)
+
+    async def test_session_location_is_validated_and_kept(self):
+        session = await self.async_client.asession()
+        await session.aset("active_location_id", "garbage")
+        await session.asave()
+        response = await self.async_client.get(reverse('item-list'))
+        self.assertContains(response, "Boiler")
+        session = await self.async_client.asession()
+        self.assertEqual(await session.aget("active_location_id"), self.home.pk)
+
+        await session.aset("active_location_id", self.cabin.pk)
+        await session.asave()
+        response = await self.async_client.get(reverse('item-list'))
+        self.assertContains(response, "Stove")
+        self.assertNotContains(response, "Boiler")
+
+    async def test_login_required(self):
+        response = await AsyncClient().get(reverse('task-due-list'))
+        self.assertEqual(response.status_code, 302)
+
+    async def test_user_without_account(self):
+        loner = await User.objects.acreate(username='loner')
+        client = AsyncClient()
+        await client.aforce_login(loner)
+        response = await client.get(reverse('home'))
+        self.assertEqual(response.status_code, 200)
+        response = await client.get(reverse('task-due-list'))
+        self.assertContains(response, "No maintenance tasks are currently due.")
+
+    async def test_sync_views_still_work(self):
+        response = await self.async_client.get(reverse('item-detail', args=[self.item.pk]))
+        self.assertContains(response, "Boiler")
+
+    def test_middleware_runs_in_both_modes(self):
+        request = RequestFactory().get("/")
+
+        async def async_view(request):
+            return HttpResponse()
+
+        self.assertTrue(iscoroutinefunction(ActiveLocationMiddleware(async_view)))
+        self.assertFalse(iscoroutinefunction(ActiveLocationMiddleware(lambda request: HttpResponse())))
+        ActiveLocationMiddleware(lambda request: HttpResponse())(request)
+        self.assertTrue(hasattr(request, "active_location"))
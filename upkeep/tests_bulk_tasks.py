@@ -0,0 +1,102 @@
+import datetime
+
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from .models import Location, Item, Task, LocationStats
+
+from common.models import Account, Profile
+
+User = get_user_model()
+
+class BulkTaskActionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='bulkuser', password='password')
+        self.account = Account.objects.create(name="Test Household", owner=self.user)
+        self.profile = Profile.objects.create(user=self.user, account=self.account)
+        self.client = Client()
+        self.client.login(username='bulkuser', password='password')
+
+        self.today = timezone.now().date()
+        self.location = Location.objects.create(name="Home", account=self.account, default=True)
+        self.item = Item.objects.create(name="Boiler", location=self.location)
+        self.weekly = self.due_task("Check pressure", Task.Frequency.WEEKLY)
+        self.monthly = self.due_task("Clean filter", Task.Frequency.MONTHLY)
+        self.yearly = self.due_task("Service", Task.Frequency.YEARLY)
+
+        other_user = User.objects.create_user(username='otheruser', password='password')
+        other_account = Account.objects.create(name="Other Household", owner=other_user)
+        other_location = Location.objects.create(name="Other", account=other_account, default=True)
+        other_item = Item.objects.create(name="Other boiler", location=other_location)
+        self.foreign = Task.objects.create(
+            name="Not yours", item=other_item, frequency=Task.Frequency.WEEKLY,
+            next_due_date=self.today - datetime.timedelta(days=3),
+        )
+
+    def due_task(self, name, frequency):
+        return Task.objects.create(
+            name=name, item=self.item, frequency=frequency,
+            next_due_date=self.today - datetime.timedelta(days=3),
+        )
+
+    def post(self, url_name, tasks, **headers):
+        return self.client.post(reverse(url_name), {"task": [t.pk for t in tasks]}, **headers)
+
+    def test_complete_sets_next_due_date_per_frequency(self):
+        response = self.post('task-bulk-complete', [self.weekly, self.monthly, self.yearly])
+        self.assertRedirects(response, reverse('task-due-list'))
+
+        for task, days in ((self.weekly, 7), (self.monthly, 30), (self.yearly, 365)):
+            task.refresh_from_db()
+            self.assertEqual(task.last_performed, self.today)
+            self.assertEqual(task.next_due_date, self.today + datetime.timedelta(days=days))
+            self.assertEqual(task.effective_due_date, task.next_due_date)
+            self.assertEqual(task.snooze_count, 0)
+        self.assertEqual(LocationStats.objects.get(pk=self.location.pk).overdue_tasks_count, 0)
+
+    def test_snooze_updates_selected_tasks(self):
+        Task.objects.filter(pk=self.weekly.pk).update(snooze_count=2)
+        self.post('task-bulk-snooze', [self.weekly, self.monthly])
+
+        week = self.today + datetime.timedelta(days=7)
+        self.assertEqual(
+            dict(Task.objects.filter(snoozed_until=week).values_list("pk", "snooze_count")),
+            {self.weekly.pk: 3, self.monthly.pk: 1},
+        )
+        self.yearly.refresh_from_db()
+        self.assertIsNone(self.yearly.snoozed_until)
+        self.assertEqual(LocationStats.objects.get(pk=self.location.pk).overdue_tasks_count, 1)
+
+    def test_other_accounts_tasks_are_ignored(self):
+        for url_name in ('task-bulk-complete', 'task-bulk-snooze'):
+            self.post(url_name, [self.foreign])
+        self.foreign.refresh_from_db()
+        self.assertIsNone(self.foreign.last_performed)
+        self.assertIsNone(self.foreign.snoozed_until)
+
+    def test_query_count_does_not_grow_with_selection(self):
+        def queries(tasks):
+            with CaptureQueriesContext(connection) as ctx:
+                self.post('task-bulk-complete', tasks)
+            return len(ctx.captured_queries)
+
+        few = queries([self.weekly])
+        many_tasks = [self.due_task(f"Task {n}", Task.Frequency.DAILY) for n in range(20)]
+        self.assertEqual(queries(many_tasks + [self.monthly, self.yearly]), few)
+
+    def test_htmx_renders_the_list_once(self):
+        response = self.post('task-bulk-snooze', [self.weekly], HTTP_HX_REQUEST='true')
+        self.assertTemplateUsed(response, 'components/_task_due_list.html')
+        self.assertTemplateNotUsed(response, 'task_due_list.html')
+        self.assertContains(response, "1 task(s) snoozed")
+        self.assertNotContains(response, "Check pressure")
+        self.assertContains(response, "Clean filter")
+
+    def test_get_does_nothing(self):
+        response = self.client.get(reverse('task-bulk-complete'))
+        self.assertRedirects(response, reverse('task-due-list'))
+        self.weekly.refresh_from_db()
+        self.assertIsNone(self.weekly.last_performed)
@@ -0,0 +1,136 @@
+import datetime
+
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from .ical import fold
+from .models import Location, Item, Task
+
+from common.models import Account, Profile
+
+User = get_user_model()
+
+class CalendarFeedTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='calendaruser', password='password')
+        self.account = Account.objects.create(name="Test Household", owner=self.user)
+        self.profile = Profile.objects.create(user=self.user, account=self.account)
+        self.client = Client()
+        self.client.login(username='calendaruser', password='password')
+
+        self.today = timezone.localdate()
+        self.location = Location.objects.create(name="Home", account=self.account, default=True)
+        self.item = Item.objects.create(name="Boiler", location=self.location)
+        self.task = Task.objects.create(
+            name="Bleed radiators, all floors", item=self.item, frequency=Task.Frequency.WEEKLY,
+            next_due_date=self.today + datetime.timedelta(days=3), estimated_hours_to_complete=2,
+        )
+        self.url = reverse('task-calendar-feed', args=[self.location.calendar_token])
+        # Feeds are read by calendar apps, without a session.
+        self.feed_client = Client()
+
+    def test_feed(self):
+        Task.objects.create(
+            name="Overdue", item=self.item, frequency=Task.Frequency.MONTHLY,
+            next_due_date=self.today - datetime.timedelta(days=10),
+        )
+        Task.objects.create(
+            name="Snoozed", item=self.item, frequency=Task.Frequency.YEARLY,
+            next_due_date=self.today, snoozed_until=self.today + datetime.timedelta(days=5),
+        )
+        unscheduled = Task.objects.create(name="Unscheduled", item=self.item, frequency=Task.Frequency.DAILY)
+        Task.objects.filter(pk=unscheduled.pk).update(next_due_date=None)
+
+        response = self.feed_client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/calendar; charset=utf-8")
+        body = response.content.decode()
+        self.assertTrue(body.startswith("BEGIN:VCALENDAR\r\n"))
+        self.assertEqual(body.count("BEGIN:VEVENT"), 3)
+        self.assertNotIn("Unscheduled", body)
+
+        def starts(days):
+            return f"DTSTART;VALUE=DATE:{self.today + datetime.timedelta(days=days):%Y%m%d}"
+
+        event = body.split(f"UID:upkeep-task-{self.task.pk}\r\n")[1].split("END:VEVENT")[0]
+        self.assertIn(starts(3), event)
+        self.assertIn("RRULE:FREQ=DAILY;INTERVAL=7", event)
+        self.assertIn("SUMMARY:Bleed radiators\\, all floors – Boiler", event)
+        self.assertIn("Repeats: Weekly\\nEstimated time: 2 h", event)
+        # Overdue tasks are due today; snoozed ones when the snooze ends.
+        self.assertIn(starts(0), body)
+        self.assertIn(starts(5), body)
+
+    def test_token_is_required(self):
+        self.assertEqual(self.feed_client.get(reverse('task-calendar-feed', args=["nope"])).status_code, 404)
+
+        old_url = self.url
+        response = self.client.post(reverse('location-calendar-reset', args=[self.location.pk]))
+        self.assertRedirects(response, reverse('settings-view'))
+        self.location.refresh_from_db()
+        self.assertEqual(self.feed_client.get(old_url).status_code, 404)
+        new_url = reverse('task-calendar-feed', args=[self.location.calendar_token])
+        self.assertEqual(self.feed_client.get(new_url).status_code, 200)
+
+    def test_settings_shows_the_link(self):
+        response = self.client.get(reverse('settings-view'))
+        self.assertContains(response, "http://testserver" + self.url)
+
+    def test_new_locations_get_a_token(self):
+        self.client.post(reverse('location-create'), {"name": "Cabin"})
+        cabin = Location.objects.get(name="Cabin")
+        self.assertEqual(len(cabin.calendar_token), 43)
+        self.assertNotEqual(cabin.calendar_token, self.location.calendar_token)
+        # Showing the links only reads them.
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse('settings-view'))
+        self.assertFalse([q for q in ctx.captured_queries if "upkeep_location" in q["sql"] and not q["sql"].startswith("SELECT")])
+
+    def test_unchanged_feed_is_not_modified(self):
+        response = self.feed_client.get(self.url)
+        etag, last_modified = response["ETag"], response["Last-Modified"]
+
+        with self.assertNumQueries(2):
+            response = self.feed_client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        response = self.feed_client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_changes_give_a_new_etag(self):
+        def etag():
+            return self.feed_client.get(self.url)["ETag"]
+
+        seen = {etag()}
+        changes = [
+            lambda: Task.objects.filter(pk=self.task.pk).update(
+                snoozed_until=self.today + datetime.timedelta(days=9), updated_at=timezone.now()
+            ),
+            lambda: setattr(self.item, "name", "Furnace") or self.item.save(),
+            lambda: setattr(self.location, "name", "House") or self.location.save(),
+            lambda: Task.objects.create(name="New", item=self.item, frequency=Task.Frequency.DAILY),
+            lambda: self.task.delete(),
+        ]
+        for change in changes:
+            change()
+            self.assertNotIn(etag(), seen)
+            seen.add(etag())
+
+    def test_deletion_moves_last_modified(self):
+        yesterday = timezone.now() - datetime.timedelta(days=1)
+        for model, pk in ((Location, self.location.pk), (Item, self.item.pk), (Task, self.task.pk)):
+            model.objects.filter(pk=pk).update(updated_at=yesterday)
+        last_modified = self.feed_client.get(self.url)["Last-Modified"]
+        self.task.delete()
+        response = self.feed_client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("BEGIN:VEVENT", response.content.decode())
+
+    def test_long_lines_are_folded(self):
+        line = "DESCRIPTION:" + "é" * 100
+        folded = fold(line)
+        self.assertTrue(all(len(part.encode()) <= 75 for part in folded.split("\r\n")))
+        self.assertEqual(folded.replace("\r\n ", ""), line)
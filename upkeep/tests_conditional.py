@@ -0,0 +1,109 @@
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from .models import Location, Item, Task
+
+from common.models import Account, Profile
+
+User = get_user_model()
+
+PAGES = ('home', 'item-list', 'task-management-list', 'task-due-list')
+
+class ConditionalPageTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='etaguser', password='password')
+        self.account = Account.objects.create(name="Test Household", owner=self.user)
+        self.profile = Profile.objects.create(user=self.user, account=self.account)
+        self.client = Client()
+        self.client.login(username='etaguser', password='password')
+
+        self.home = Location.objects.create(name="Home", account=self.account, default=True)
+        self.cabin = Location.objects.create(name="Cabin", account=self.account)
+        self.item = Item.objects.create(name="Boiler", location=self.home)
+        self.task = Task.objects.create(
+            name="Bleed radiators", item=self.item, frequency=Task.Frequency.YEARLY,
+            next_due_date=timezone.now().date(),
+        )
+        # The first page sets the CSRF cookie; pages only get validators once
+        # the client has one.
+        response = self.client.get(reverse('home'))
+        self.assertNotIn("ETag", response)
+
+    def etag(self, page='item-list', **headers):
+        response = self.client.get(reverse(page), **headers)
+        self.assertEqual(response.status_code, 200)
+        return response["ETag"]
+
+    def test_unchanged_pages_are_not_modified(self):
+        for page in PAGES:
+            for headers in ({}, {"HTTP_HX_REQUEST": "true"}):
+                response = self.client.get(reverse(page), **headers)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn("HX-Request", response["Vary"])
+                self.assertIn("no-cache", response["Cache-Control"])
+                self.assertTrue(response["Last-Modified"])
+
+                # Session, user, locations and the change marker; no page queries.
+                with self.assertNumQueries(4):
+                    response = self.client.get(reverse(page), HTTP_IF_NONE_MATCH=response["ETag"], **headers)
+                self.assertEqual(response.status_code, 304, (page, headers))
+                self.assertIn("HX-Request", response["Vary"])
+
+    def test_partials_query_and_pages_have_their_own_etags(self):
+        etags = {
+            self.etag(),
+            self.etag(HTTP_HX_REQUEST="true"),
+            self.etag(data={"q": "boiler"}),
+            self.etag('task-management-list'),
+            self.etag('task-management-list', data={"group_by": "area"}),
+        }
+        self.assertEqual(len(etags), 5)
+
+        full = self.etag()
+        response = self.client.get(reverse('item-list'), HTTP_IF_NONE_MATCH=full, HTTP_HX_REQUEST="true")
+        self.assertEqual(response.status_code, 200)
+
+    def test_changes_give_a_new_etag(self):
+        seen = {self.etag()}
+        changes = [
+            lambda: setattr(self.item, "name", "Furnace") or self.item.save(),
+            lambda: setattr(self.task, "estimated_hours_to_complete", 3) or self.task.save(),
+            lambda: setattr(self.cabin, "name", "Sauna") or self.cabin.save(),
+            lambda: self.task.delete(),
+            lambda: Item.objects.create(name="Mower", location=self.home),
+        ]
+        for change in changes:
+            change()
+            etag = self.etag()
+            self.assertNotIn(etag, seen)
+            seen.add(etag)
+
+    def test_moves_touch_the_old_location(self):
+        touched = self.home.updated_at
+        self.item.location = self.cabin
+        self.item.save()
+        self.home.refresh_from_db()
+        self.assertGreater(self.home.updated_at, touched)
+
+        touched = self.cabin.updated_at
+        self.task.item = Item.objects.create(name="Furnace", location=self.home)
+        self.task.save()
+        self.cabin.refresh_from_db()
+        self.assertGreater(self.cabin.updated_at, touched)
+
+    def test_switching_location_changes_the_etag(self):
+        before = self.etag()
+        self.client.get(reverse('switch-location', args=[self.cabin.pk]))
+        response = self.client.get(reverse('item-list'), HTTP_IF_NONE_MATCH=before)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, "Boiler")
+
+    def test_pending_messages_are_rendered(self):
+        etag = self.etag()
+        # Adds a message and changes nothing else.
+        self.client.get(reverse('switch-location', args=[self.home.pk]))
+        response = self.client.get(reverse('item-list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, "Switched to location: Home")
+        response = self.client.get(reverse('item-list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
@@ -0,0 +1,88 @@
+import datetime
+
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from .models import Location, Item, Task
+
+from common.models import Account, Profile
+
+User = get_user_model()
+
+class EffectiveDueDateTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='dueuser', password='password')
+        self.account = Account.objects.create(name="Test Household", owner=self.user)
+        self.profile = Profile.objects.create(user=self.user, account=self.account)
+        self.client = Client()
+        self.client.login(username='dueuser', password='password')
+
+        self.today = timezone.now().date()
+        self.location = Location.objects.create(name="Home", account=self.account, default=True)
+        self.item = Item.objects.create(name="Boiler", location=self.location)
+
+    def days(self, n):
+        return self.today + datetime.timedelta(days=n)
+
+    def stored(self, task):
+        return Task.objects.values_list("effective_due_date", flat=True).get(pk=task.pk)
+
+    def test_save_stores_later_of_due_and_snooze(self):
+        task = Task.objects.create(
+            name="Bleed radiators", item=self.item, frequency=Task.Frequency.YEARLY,
+            next_due_date=self.days(-3),
+        )
+        self.assertEqual(self.stored(task), self.days(-3))
+        self.assertEqual(task.days_overdue, 3)
+
+        task.snoozed_until = self.days(4)
+        task.save(update_fields=["snoozed_until"])
+        self.assertEqual(self.stored(task), self.days(4))
+        self.assertEqual(task.days_overdue, -4)
+
+    def test_complete_and_snooze_views(self):
+        task = Task.objects.create(
+            name="Check pressure", item=self.item, frequency=Task.Frequency.MONTHLY,
+            next_due_date=self.days(-1),
+        )
+        self.client.post(reverse('task-snooze', args=[task.pk]))
+        self.assertEqual(self.stored(task), self.days(7))
+
+        self.client.post(reverse('task-complete', args=[task.pk]))
+        self.assertEqual(self.stored(task), self.days(30))
+
+    def test_bulk_paths(self):
+        tasks = Task.objects.bulk_create([
+            Task(name="A", item=self.item, frequency=Task.Frequency.WEEKLY, next_due_date=self.days(-2)),
+            Task(name="B", item=self.item, frequency=Task.Frequency.WEEKLY, snoozed_until=self.days(2)),
+        ])
+        self.assertEqual([self.stored(task) for task in tasks], [self.days(-2), self.days(2)])
+
+        Task.objects.filter(name="A").update(snoozed_until=self.days(5))
+        self.assertEqual(self.stored(tasks[0]), self.days(5))
+        Task.objects.filter(name="A").update(snoozed_until=None)
+        self.assertEqual(self.stored(tasks[0]), self.days(-2))
+
+        tasks[1].next_due_date = self.days(9)
+        Task.objects.bulk_update(tasks, ["next_due_date"])
+        self.assertEqual(self.stored(tasks[1]), self.days(9))
+
+    def test_due_list_filters_and_orders_on_stored_date(self):
+        Task.objects.create(name="Old", item=self.item, frequency=Task.Frequency.WEEKLY, next_due_date=self.days(-10))
+        Task.objects.create(name="Today", item=self.item, frequency=Task.Frequency.WEEKLY, next_due_date=self.today)
+        Task.objects.create(
+            name="Snooze over", item=self.item, frequency=Task.Frequency.WEEKLY,
+            next_due_date=self.days(-20), snoozed_until=self.days(-1),
+        )
+        Task.objects.create(
+            name="Snoozed", item=self.item, frequency=Task.Frequency.WEEKLY,
+            next_due_date=self.days(-5), snoozed_until=self.days(3),
+        )
+        Task.objects.create(name="Future", item=self.item, frequency=Task.Frequency.WEEKLY, next_due_date=self.days(2))
+
+        response = self.client.get(reverse('task-due-list'))
+        self.assertEqual(
+            [task.name for task in response.context["tasks"]],
+            ["Today", "Snooze over", "Old"],
+        )
@@ -0,0 +1,124 @@
+import csv
+import datetime
+import io
+import json
+import os
+import tempfile
+
+from django.core.management import call_command
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient, TestCase, Client
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from .exporter import export_chunks
+from .importer import import_file
+from .models import Location, Item, Task
+
+from common.models import Account, Profile
+
+User = get_user_model()
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='exportuser', password='password')
+        self.account = Account.objects.create(name="Test Household", owner=self.user)
+        self.profile = Profile.objects.create(user=self.user, account=self.account)
+        self.client = Client()
+        self.client.login(username='exportuser', password='password')
+
+        self.home = Location.objects.create(name="Home", account=self.account, default=True)
+        self.cabin = Location.objects.create(name="Cabin", account=self.account)
+        self.boiler = Item.objects.create(
+            name="Boiler", location=self.home, serial_number="B-1", status=Item.ItemStatus.BROKEN,
+            warranty_expiration=datetime.date(2030, 1, 31),
+        )
+        self.stove = Item.objects.create(name="Stove", location=self.cabin)
+        self.task = Task.objects.create(
+            name="Bleed radiators", item=self.boiler, frequency=Task.Frequency.YEARLY,
+            next_due_date=datetime.date(2026, 1, 1), snoozed_until=datetime.date(2026, 1, 8),
+            snooze_count=1, estimated_hours_to_complete=2,
+        )
+        Task.objects.create(name="Sweep chimney", item=self.stove, frequency=Task.Frequency.YEARLY)
+
+        other = User.objects.create_user(username='otheruser')
+        other_location = Location.objects.create(
+            name="Other", account=Account.objects.create(name="Other", owner=other)
+        )
+        Item.objects.create(name="Not yours", location=other_location)
+
+    def export(self, dataset, **params):
+        response = self.client.get(reverse('export', args=[dataset]), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    def test_items_csv_for_active_location(self):
+        rows = list(csv.DictReader(io.StringIO(self.export("items"))))
+        self.assertEqual([row["name"] for row in rows], ["Boiler"])
+        self.assertEqual(rows[0]["location"], "Home")
+        self.assertEqual(rows[0]["status"], "Broken")
+        self.assertEqual(rows[0]["warranty_expiration"], "2030-01-31")
+
+    def test_tasks_jsonl_for_account(self):
+        records = [json.loads(line) for line in self.export("tasks", format="jsonl", scope="account").splitlines()]
+        self.assertEqual([r["name"] for r in records], ["Sweep chimney", "Bleed radiators"])
+        bleed = records[1]
+        self.assertEqual(bleed["item"], "B-1")
+        self.assertEqual(bleed["next_due_date"], "2026-01-01")
+        self.assertEqual(bleed["snoozed_until"], "2026-01-08")
+        self.assertEqual(bleed["effective_due_date"], "2026-01-08")
+        self.assertEqual((bleed["snooze_count"], bleed["estimated_hours_to_complete"]), (1, 2))
+        self.assertEqual(records[0]["item"], "Stove")
+
+    def test_download_headers(self):
+        response = self.client.get(reverse('export', args=["tasks"]), {"format": "jsonl"})
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertRegex(response["Content-Disposition"], r'attachment; filename="home-tasks-\d{4}-\d\d-\d\d\.jsonl"')
+        for url in (reverse('export', args=["users"]), reverse('export', args=["items"]) + "?format=xml"):
+            self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_chunks_hold_many_rows(self):
+        Item.objects.bulk_create(Item(name=f"Item {n}", location=self.home) for n in range(1200))
+        chunks = list(export_chunks("items", "csv", location=self.home))
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(sum(chunk.count("\n") for chunk in chunks), 1202)
+
+    async def test_async_stream_under_asgi(self):
+        await sync_to_async(Item.objects.bulk_create)(
+            Item(name=f"Item {n}", location=self.home) for n in range(1200)
+        )
+        client = AsyncClient()
+        client.cookies = self.client.cookies
+        response = await client.get(reverse('export', args=["items"]))
+        # An async iterator, which ASGI streams rather than buffers.
+        self.assertTrue(response.is_async)
+        chunks = [chunk async for chunk in response.streaming_content]
+        self.assertEqual(len(chunks), 3)
+        expected = await sync_to_async(self.export)("items")
+        self.assertEqual(b"".join(chunks).decode(), expected)
+
+    def test_export_can_be_imported_again(self):
+        items = "".join(export_chunks("items", "csv", account=self.account))
+        tasks = "".join(export_chunks("tasks", "jsonl", account=self.account))
+        # A household with the same location names.
+        account = Account.objects.create(name="Copy", owner=User.objects.create_user(username='copy'))
+        new_home = Location.objects.create(name="Home", account=account)
+        Location.objects.create(name="Cabin", account=account)
+        for text, fmt in ((items, "csv"), (tasks, "jsonl")):
+            report = import_file(io.StringIO(text), fmt, account, new_home)
+            self.assertTrue(report.committed, report.errors)
+            self.assertEqual(report.items_created + report.tasks_created, 2)
+        copied = Task.objects.get(item__location=new_home, name="Bleed radiators")
+        self.assertEqual(copied.item.serial_number, "B-1")
+        self.assertEqual(copied.snoozed_until, self.task.snoozed_until)
+
+    def test_command(self):
+        out = io.StringIO()
+        call_command("export_data", "items", location=self.cabin.pk, stdout=out)
+        self.assertEqual(out.getvalue().splitlines()[1].split(",")[2], "Stove")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "tasks.jsonl")
+            call_command("export_data", "tasks", account=self.account.pk, format="jsonl", output=path, stdout=out)
+            with open(path) as f:
+                self.assertEqual(len(f.readlines()), 2)
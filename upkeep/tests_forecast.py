@@ -0,0 +1,119 @@
+import datetime
+import random
+
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from .forecast import forecast, occurrences
+from .models import Location, Item, Task
+
+from common.models import Account, Profile
+
+User = get_user_model()
+
+class ForecastTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='forecastuser', password='password')
+        self.account = Account.objects.create(name="Test Household", owner=self.user)
+        self.profile = Profile.objects.create(user=self.user, account=self.account)
+        self.client = Client()
+        self.client.login(username='forecastuser', password='password')
+
+        self.today = timezone.now().date()
+        self.location = Location.objects.create(name="Home", account=self.account, default=True)
+        self.item = Item.objects.create(name="Boiler", location=self.location)
+
+    def days(self, n):
+        return self.today + datetime.timedelta(days=n)
+
+    def task(self, frequency, due, hours=1, snoozed=None):
+        return Task.objects.create(
+            name="Task", item=self.item, frequency=frequency, next_due_date=due,
+            snoozed_until=snoozed, estimated_hours_to_complete=hours,
+        )
+
+    def tasks(self):
+        return Task.objects.filter(item__location=self.location)
+
+    def test_recurrences_are_counted(self):
+        self.task(Task.Frequency.DAILY, self.today)
+        self.task(Task.Frequency.WEEKLY, self.days(3), hours=2)
+        self.task(Task.Frequency.YEARLY, self.days(40), hours=5)
+
+        result = forecast(self.tasks(), self.today, 30)
+        self.assertEqual(len(result.days), 30)
+        self.assertEqual(result.end, self.days(29))
+        # 30 daily hours, plus 2 hours on days 3, 10, 17 and 24.
+        self.assertEqual(result.total_hours, 30 + 4 * 2)
+        self.assertEqual(result.total_tasks, 34)
+        self.assertEqual([d.hours for d in result.days[:4]], [1, 1, 1, 3])
+        self.assertEqual(result.days[10].tasks, 2)
+
+    def test_overdue_and_snoozed_tasks(self):
+        self.task(Task.Frequency.MONTHLY, self.days(-10), hours=3)
+        self.task(Task.Frequency.WEEKLY, self.days(-1), hours=2, snoozed=self.days(5))
+        self.task(Task.Frequency.WEEKLY, self.days(-1), hours=None)
+
+        result = forecast(self.tasks(), self.today, 31)
+        by_offset = {(d.start - self.today).days: d.hours for d in result.days if d.hours}
+        self.assertEqual(by_offset, {0: 3, 30: 3, 5: 2, 12: 2, 19: 2, 26: 2})
+        self.assertEqual(result.days[7].tasks, 1)
+
+    def test_weeks_add_up_and_start_on_monday(self):
+        self.task(Task.Frequency.DAILY, self.today, hours=2)
+        result = forecast(self.tasks(), self.today, 60)
+        self.assertTrue(all(week.start.weekday() == 0 for week in result.weeks))
+        self.assertEqual(sum(week.hours for week in result.weeks), result.total_hours)
+        self.assertEqual(result.weeks[1].hours, 14)
+
+    def test_matches_per_task_occurrences(self):
+        rng = random.Random(7)
+        tasks = [
+            self.task(
+                rng.choice(Task.Frequency.values), self.days(rng.randint(-400, 400)),
+                hours=rng.randint(0, 5), snoozed=rng.choice([None, self.days(rng.randint(-5, 60))]),
+            )
+            for _ in range(60)
+        ]
+        for horizon in (1, 31, 365):
+            expected = sum(
+                task.estimated_hours_to_complete
+                * occurrences(task.effective_due_date, task.frequency, self.today, horizon)
+                for task in tasks
+            )
+            self.assertEqual(forecast(self.tasks(), self.today, horizon).total_hours, expected, horizon)
+
+    def test_one_query(self):
+        for frequency in Task.Frequency.values:
+            self.task(frequency, self.today)
+        with self.assertNumQueries(1):
+            forecast(self.tasks(), self.today, 365)
+
+    def test_json_endpoint(self):
+        self.task(Task.Frequency.WEEKLY, self.today, hours=2)
+        other = Location.objects.create(name="Cabin", account=self.account)
+        Task.objects.create(
+            name="Cabin task", item=Item.objects.create(name="Stove", location=other),
+            frequency=Task.Frequency.WEEKLY, next_due_date=self.today, estimated_hours_to_complete=1,
+        )
+
+        data = self.client.get(reverse('task-forecast-data'), {"days": 14}).json()
+        self.assertEqual(data["start"], self.today.isoformat())
+        self.assertEqual(len(data["days"]), 14)
+        self.assertEqual(data["total_hours"], 4)
+        self.assertEqual(data["days"][0], {"start": self.today.isoformat(), "hours": 2, "tasks": 1})
+
+        data = self.client.get(reverse('task-forecast-data'), {"days": 14, "scope": "account"}).json()
+        self.assertEqual(data["total_hours"], 6)
+        data = self.client.get(reverse('task-forecast-data'), {"days": "100000"}).json()
+        self.assertEqual(len(data["days"]), 732)
+
+    def test_calendar_view(self):
+        self.task(Task.Frequency.DAILY, self.today, hours=1)
+        response = self.client.get(reverse('task-forecast'), {"days": 90})
+        self.assertContains(response, "90 hours")
+        self.assertContains(response, 'class="forecast-level-4"', count=90)
+        rows = response.context["heatmap"]["rows"]
+        self.assertEqual(len(rows), 7)
+        self.assertEqual({len(row) for row in rows}, {len(response.context["forecast"].weeks)})
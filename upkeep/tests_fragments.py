@@ -0,0 +1,109 @@
+import re
+from unittest import mock
+
+from django.template import Context, Template
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from .fragments import fragment_cache
+from .models import Location, Item, Task
+
+from common.models import Account, Profile
+
+User = get_user_model()
+
+def strip_csrf(content):
+    return re.sub(rb'(csrfmiddlewaretoken" value=|X-CSRFToken": )"[^"]+"', b"", content)
+
+class FragmentCacheTests(TestCase):
+    def setUp(self):
+        fragment_cache().clear()
+        self.user = User.objects.create_user(username='fragmentuser', password='password')
+        self.account = Account.objects.create(name="Test Household", owner=self.user)
+        self.profile = Profile.objects.create(user=self.user, account=self.account)
+        self.client = Client()
+        self.client.login(username='fragmentuser', password='password')
+
+        self.today = timezone.now().date()
+        self.location = Location.objects.create(name="Home", account=self.account, default=True)
+        self.item = Item.objects.create(name="Boiler", location=self.location, area="Basement")
+        self.task = Task.objects.create(
+            name="Bleed radiators", item=self.item, frequency=Task.Frequency.YEARLY,
+            next_due_date=self.today, estimated_hours_to_complete=2,
+        )
+
+    def test_rows_are_served_from_the_cache(self):
+        for url in (
+            reverse('item-list'),
+            reverse('task-management-list'),
+            reverse('task-management-list') + "?group_by=area",
+            reverse('task-due-list'),
+        ):
+            first = self.client.get(url).content
+            cache = fragment_cache()
+            with mock.patch.object(cache, "get_many", wraps=cache.get_many) as get_many, \
+                    mock.patch.object(cache, "set") as set_:
+                second = self.client.get(url).content
+            # One read for the page, nothing rendered again.
+            get_many.assert_called_once()
+            set_.assert_not_called()
+            # Equal but for the (masked) CSRF tokens.
+            self.assertEqual(strip_csrf(first), strip_csrf(second), url)
+
+    def test_changes_are_rendered(self):
+        url = reverse('task-management-list') + "?group_by=area"
+        self.assertContains(self.client.get(url), "(Boiler)")
+        self.item.name = "Furnace"
+        self.item.save()
+        self.assertContains(self.client.get(url), "(Furnace)")
+
+        self.task.estimated_hours_to_complete = 5
+        self.task.save()
+        self.assertContains(self.client.get(reverse('task-management-list')), "5h")
+        self.assertContains(self.client.get(reverse('item-list')), "Furnace")
+
+    def test_grouping_is_part_of_the_key(self):
+        self.client.get(reverse('task-management-list') + "?group_by=area")
+        with mock.patch.object(fragment_cache(), "set") as set_:
+            response = self.client.get(reverse('task-management-list') + "?group_by=frequency")
+        set_.assert_called_once()
+        self.assertNotContains(response, "Yearly\n")
+
+    def test_due_cards_follow_the_day_and_bulk_updates(self):
+        url = reverse('task-due-list')
+        self.assertContains(self.client.get(url), "Due Today")
+
+        tomorrow = self.today + timezone.timedelta(days=1)
+        with mock.patch("django.utils.timezone.now", return_value=timezone.now() + timezone.timedelta(days=1)):
+            self.assertEqual(timezone.now().date(), tomorrow)
+            self.assertContains(self.client.get(url), "1 days due")
+
+        Task.objects.filter(pk=self.task.pk).update(snooze_count=4, updated_at=timezone.now())
+        self.assertContains(self.client.get(url), 'title="Snoozed 4 times"')
+
+    def test_csrf_tokens_are_not_cached(self):
+        cache = fragment_cache()
+        with mock.patch.object(cache, "set", wraps=cache.set) as set_:
+            response = self.client.get(reverse('task-due-list'))
+        self.assertTrue(set_.called)
+        for (key, html, timeout), _ in set_.call_args_list:
+            self.assertNotIn("csrf", html.lower())
+
+        # The cards' HTMX posts take the token from the header on the grid.
+        client = Client(enforce_csrf_checks=True)
+        client.login(username='fragmentuser', password='password')
+        response = client.get(reverse('task-due-list'))
+        token = re.search(r'hx-headers=\'\{"X-CSRFToken": "([^"]+)"\}\'', response.content.decode())[1]
+        response = client.post(
+            reverse('task-snooze', args=[self.task.pk]), HTTP_HX_REQUEST="true", HTTP_X_CSRFTOKEN=token
+        )
+        self.assertEqual(response.status_code, 302)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.snooze_count, 1)
+
+    def test_editing_the_template_changes_the_key(self):
+        source = '{% load upkeep_tags %}{% fragment "item-card" item %}<b>VERSION</b>{% endfragment %}'
+        for version in ("one", "two"):
+            rendered = Template(source.replace("VERSION", version)).render(Context({"item": self.item}))
+            self.assertEqual(rendered, f"<b>{version}</b>")
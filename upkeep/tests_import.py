@@ -0,0 +1,158 @@
+import io
+import json
+import os
+import tempfile
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from .importer import import_file
+from .models import Location, Item, Task, LocationStats
+
+from common.models import Account, Profile
+
+User = get_user_model()
+
+DESCRIPTION = "## Tools & Parts\n- Rag\n\n## Steps\n1. Wipe the **filter**"
+
+CSV = (
+    "type,name,item,serial_number,brand,frequency,description\n"
+    "item,Dishwasher,,DW-1,Bosch,,\n"
+    "item,Heat pump,,HP-1,Nibe,,\n"
+    f"task,Clean filter,DW-1,,,30,\"{DESCRIPTION}\"\n"
+    f"task,Check pressure,Heat pump,,,Weekly,\"{DESCRIPTION}\"\n"
+)
+
+YAML = f"""
+- name: Boiler
+  serial_number: B-1
+  area: Basement
+  tasks:
+    - name: Bleed radiators
+      frequency: yearly
+      description: {json.dumps(DESCRIPTION)}
+- name: Mower
+  quantity: 2
+"""
+
+
+class ImportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='importuser', password='password')
+        self.account = Account.objects.create(name="Test Household", owner=self.user)
+        self.profile = Profile.objects.create(user=self.user, account=self.account)
+        self.client = Client()
+        self.client.login(username='importuser', password='password')
+
+        self.location = Location.objects.create(name="Home", account=self.account, default=True)
+        self.cabin = Location.objects.create(name="Cabin", account=self.account)
+
+    def run_import(self, text, fmt, **kwargs):
+        return import_file(io.StringIO(text), fmt, self.account, self.location, **kwargs)
+
+    def test_csv_items_and_tasks(self):
+        report = self.run_import(CSV, "csv")
+        self.assertTrue(report.committed, report.errors)
+        self.assertEqual((report.items_created, report.tasks_created), (2, 2))
+
+        task = Task.objects.get(name="Clean filter")
+        self.assertEqual(task.item.serial_number, "DW-1")
+        self.assertEqual(task.frequency, Task.Frequency.MONTHLY)
+        self.assertIsNotNone(task.next_due_date)
+        self.assertEqual(task.effective_due_date, task.next_due_date)
+        self.assertIn("<strong>filter</strong>", task.description_html)
+        self.assertEqual(Task.objects.get(name="Check pressure").frequency, Task.Frequency.WEEKLY)
+        self.assertEqual(LocationStats.objects.get(pk=self.location.pk).total_active_items, 2)
+
+    def test_yaml_nested_tasks_and_locations(self):
+        report = self.run_import(YAML + "- name: Sauna stove\n  location: Cabin\n", "yaml")
+        self.assertTrue(report.committed, report.errors)
+        boiler = Item.objects.get(serial_number="B-1")
+        self.assertEqual(boiler.location, self.location)
+        self.assertEqual(list(boiler.tasks.values_list("name", flat=True)), ["Bleed radiators"])
+        self.assertEqual(Item.objects.get(name="Mower").quantity, 2)
+        self.assertEqual(Item.objects.get(name="Sauna stove").location, self.cabin)
+
+    def test_invalid_record_rolls_back_everything(self):
+        lines = [
+            {"name": "Dishwasher", "serial_number": "DW-1"},
+            {"type": "task", "item": "DW-1", "name": "Clean", "frequency": 30, "description": "## Steps\n1. Go"},
+            {"type": "task", "item": "nothing", "name": "Orphan", "frequency": 30},
+        ]
+        report = self.run_import("\n".join(json.dumps(line) for line in lines), "jsonl")
+        self.assertFalse(report.ok)
+        self.assertEqual(report.errors, [
+            "Record 2: description: Description must contain the header '## Tools & Parts'",
+            "Record 3: no item with serial number or name 'nothing'.",
+        ])
+        self.assertFalse(Item.objects.exists())
+
+    def test_unreadable_file_is_an_error(self):
+        report = self.run_import('{"name": "Fridge"}\n{not json\n', "jsonl")
+        self.assertEqual(report.records, 1)
+        self.assertIn("could not read the file", report.errors[0])
+        self.assertFalse(Item.objects.exists())
+
+    def test_deduplicates_by_serial_number(self):
+        self.run_import(CSV, "csv")
+        report = self.run_import(CSV + "item,Dishwasher again,,DW-1,,,\n", "csv")
+        self.assertTrue(report.committed, report.errors)
+        self.assertEqual(
+            (report.items_created, report.items_skipped, report.tasks_created, report.tasks_skipped),
+            (0, 3, 0, 2),
+        )
+        self.assertEqual(Item.objects.count(), 2)
+        self.assertEqual(Task.objects.count(), 2)
+        self.assertEqual(Task.objects.filter(name="Clean filter").count(), 1)
+
+    def test_dry_run_changes_nothing(self):
+        report = self.run_import(CSV, "csv", dry_run=True)
+        self.assertTrue(report.ok)
+        self.assertFalse(report.committed)
+        self.assertEqual((report.items_created, report.tasks_created), (2, 2))
+        self.assertIn("Would import 2 item(s) and 2 task(s)", report.summary())
+        self.assertFalse(Item.objects.exists())
+
+    def test_small_batches(self):
+        report = self.run_import(CSV, "csv", batch_size=1)
+        self.assertTrue(report.committed, report.errors)
+        self.assertEqual(Task.objects.filter(item__serial_number="DW-1").count(), 1)
+
+    def test_upload_view(self):
+        def upload(dry_run):
+            data = {"file": SimpleUploadedFile("items.csv", CSV.encode("utf-8-sig"))}
+            if dry_run:
+                data["dry_run"] = "on"
+            return self.client.post(reverse('item-import'), data)
+
+        response = upload(dry_run=True)
+        self.assertContains(response, "Would import 2 item(s) and 2 task(s)")
+        self.assertFalse(Item.objects.exists())
+
+        response = upload(dry_run=False)
+        self.assertRedirects(response, reverse('item-list'))
+        self.assertEqual(Item.objects.filter(location=self.location).count(), 2)
+
+        response = self.client.post(
+            reverse('item-import'), {"file": SimpleUploadedFile("items.xlsx", b"x")}
+        )
+        self.assertContains(response, "Unsupported file type")
+
+    def test_command(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "items.yaml")
+            with open(path, "w") as f:
+                f.write(YAML)
+            out = io.StringIO()
+            call_command("import_items", path, location=self.location.pk, dry_run=True, stdout=out)
+            self.assertIn("Would import 2 item(s) and 1 task(s)", out.getvalue())
+            call_command("import_items", path, location=self.location.pk, stdout=out)
+            self.assertIn("Imported 2 item(s) and 1 task(s)", out.getvalue())
+
+            with open(path, "w") as f:
+                f.write("- {type: task, item: B-1, name: Broken}\n")
+            with self.assertRaisesMessage(CommandError, "nothing was imported"):
+                call_command("import_items", path, location=self.location.pk, stdout=out, stderr=io.StringIO())
+
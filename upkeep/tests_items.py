@@ -0,0 +1,61 @@
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from .models import Location, Item
+
+from common.models import Account, Profile
+
+User = get_user_model()
+
+class ItemListTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='itemuser', password='password')
+        self.account = Account.objects.create(name="Test Household", owner=self.user)
+        self.profile = Profile.objects.create(user=self.user, account=self.account)
+        self.client = Client()
+        self.client.login(username='itemuser', password='password')
+
+        self.location = Location.objects.create(name="Home", account=self.account, default=True)
+        self.other_location = Location.objects.create(name="Cabin", account=self.account)
+        self.item = Item.objects.create(name="Toaster", location=self.location, area="Kitchen")
+
+    def _count_queries(self, url, **extra):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, **extra)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_item_list_renders_cards_without_forms(self):
+        response = self.client.get(reverse('item-list'))
+        self.assertContains(response, "Toaster")
+        self.assertContains(response, reverse('item-detail', args=[self.item.pk]))
+        self.assertNotContains(response, reverse('item-update', args=[self.item.pk]))
+
+    def test_item_list_query_count_does_not_grow_with_items(self):
+        self.client.get(reverse('item-list'))  # settle the session
+        baseline = self._count_queries(reverse('item-list'))
+        for i in range(20):
+            Item.objects.create(name=f"Item {i}", location=self.location)
+        self.assertEqual(self._count_queries(reverse('item-list')), baseline)
+
+    def test_item_detail_returns_edit_form(self):
+        response = self.client.get(reverse('item-detail', args=[self.item.pk]))
+        self.assertContains(response, "Edit: Toaster")
+        self.assertContains(response, reverse('item-update', args=[self.item.pk]))
+        self.assertContains(response, "Cabin")
+
+    def test_item_detail_other_account_is_404(self):
+        other_user = User.objects.create_user(username='stranger', password='password')
+        other_account = Account.objects.create(name="Other", owner=other_user)
+        other_location = Location.objects.create(name="Elsewhere", account=other_account)
+        other_item = Item.objects.create(name="Secret", location=other_location)
+
+        response = self.client.get(reverse('item-detail', args=[other_item.pk]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_item_delete_get_returns_confirmation(self):
+        response = self.client.get(reverse('item-delete', args=[self.item.pk]))
+        self.assertContains(response, "Confirm Deletion")
+        self.assertTrue(Item.objects.filter(pk=self.item.pk).exists())
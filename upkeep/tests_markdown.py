@@ -0,0 +1,140 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from .forms import TaskForm
+from .models import Location, Item, Task
+from .rendering import ENGINES, PythonMarkdownEngine, cached_render_markdown
+from .templatetags.upkeep_tags import markdownify
+
+from common.models import Account, Profile
+
+User = get_user_model()
+
+class MarkdownRenderingTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='mduser', password='password')
+        self.account = Account.objects.create(name="Test Household", owner=self.user)
+        self.profile = Profile.objects.create(user=self.user, account=self.account)
+        self.client = Client()
+        self.client.login(username='mduser', password='password')
+
+        self.location = Location.objects.create(name="Home", account=self.account, default=True)
+        self.item = Item.objects.create(name="Boiler", location=self.location)
+        self.task = Task.objects.create(
+            name="Bleed radiators",
+            description="## Steps\n1. Open the **valve**",
+            item=self.item,
+            frequency=Task.Frequency.YEARLY,
+        )
+
+    def stored_html(self):
+        return Task.objects.values_list("description_html", flat=True).get(pk=self.task.pk)
+
+    def test_html_is_stored_on_create(self):
+        self.assertIn("<strong>valve</strong>", self.stored_html())
+
+    def test_rendered_only_when_description_changes(self):
+        task = Task.objects.get(pk=self.task.pk)
+        with mock.patch("upkeep.models.render_markdown") as render:
+            task.name = "Bleed all radiators"
+            task.save()
+            render.assert_not_called()
+
+        task.description = "*Close* the valve"
+        task.save(update_fields=["description"])
+        self.assertEqual(self.stored_html(), "<p><em>Close</em> the valve</p>")
+
+    def test_bulk_paths_render(self):
+        Task.objects.filter(pk=self.task.pk).update(description="`bleed key`")
+        self.assertEqual(self.stored_html(), "<p><code>bleed key</code></p>")
+
+        task = Task.objects.get(pk=self.task.pk)
+        task.description = ""
+        Task.objects.bulk_update([task], ["description"])
+        self.assertEqual(self.stored_html(), "")
+
+    def test_due_list_uses_stored_html(self):
+        Task.objects.filter(pk=self.task.pk).update(description_html="<p>stored copy</p>")
+        with mock.patch.object(PythonMarkdownEngine, "render") as render:
+            response = self.client.get(reverse('task-due-list'))
+            render.assert_not_called()
+        self.assertContains(response, "<p>stored copy</p>", html=True)
+
+    def test_filter_fallback_is_cached_by_content(self):
+        text = "A *unique* description for the cache test"
+        with mock.patch.object(PythonMarkdownEngine, "render", return_value="<p>x</p>") as render:
+            self.assertEqual(markdownify(text), "<p>x</p>")
+            self.assertEqual(markdownify(text), "<p>x</p>")
+            self.assertEqual(cached_render_markdown("".join(text)), "<p>x</p>")
+        render.assert_called_once()
+
+    def test_backfill_command(self):
+        Task.objects.update(description_html="")
+        out = StringIO()
+        call_command("render_task_descriptions", stdout=out)
+        self.assertIn("Rendered 1 task description(s).", out.getvalue())
+        self.assertIn("<strong>valve</strong>", self.stored_html())
+
+        call_command("render_task_descriptions", stdout=out)
+        self.assertIn("Rendered 0 task description(s).", out.getvalue())
+
+
+SAMPLE = """## Tools & Parts
+- Bleed key
+- Rag
+
+## Steps
+1. Turn off the **pump**
+2. Open the valve
+
+| Radiator | Turns |
+|----------|-------|
+| Hall     | 2     |
+
+```
+pressure: 1.5 bar
+```
+"""
+
+
+class MarkdownEngineTests(TestCase):
+    def test_engines_render_the_same_html(self):
+        outputs = {name: engine().render(SAMPLE) for name, engine in ENGINES.items()}
+        self.assertEqual(outputs["markdown-it"], outputs["python-markdown"])
+        self.assertIn("<td>Hall</td>", outputs["markdown-it"])
+
+    def test_descriptions_render_the_same_under_both_engines(self):
+        for description in (
+            "## Tools & Parts\n- Bleed key\n\n## Steps\n1. Open the *valve*\n2. Close it",
+            "## Tools & Parts\n\n## Steps\n- [link](https://example.com)\n\n> Careful: `hot`",
+            SAMPLE,
+        ):
+            outputs = {name: engine().render(description) for name, engine in ENGINES.items()}
+            self.assertEqual(outputs["markdown-it"], outputs["python-markdown"], description)
+
+    def test_form_validation_is_the_same_under_both_engines(self):
+        for name in ENGINES:
+            with override_settings(MARKDOWN_ENGINE=name):
+                form = TaskForm(data={"name": "T", "description": "## Tools & Parts\n- x", "frequency": 7})
+                form.is_valid()
+                self.assertIn(
+                    "Description must contain the header '## Steps'",
+                    form.errors.get("description", []),
+                    name,
+                )
+                # The headers only have to appear in the text, as always.
+                form = TaskForm(data={
+                    "name": "T", "description": "## Tools & Parts: bleed key\n## Steps", "frequency": 7,
+                })
+                form.is_valid()
+                self.assertNotIn("description", form.errors, name)
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command("benchmark_markdown", docs=20, repeat=1, stdout=out)
+        for name in ENGINES:
+            self.assertRegex(out.getvalue(), rf"{name}\s+\d+\s+[\d.]+\s+100\.0%")
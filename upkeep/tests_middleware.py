@@ -0,0 +1,75 @@
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from .models import Location, Item
+
+from common.models import Account, Profile
+
+User = get_user_model()
+
+class ActiveLocationMiddlewareTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='mwuser', password='password')
+        self.account = Account.objects.create(name="Test Household", owner=self.user)
+        self.profile = Profile.objects.create(user=self.user, account=self.account)
+        self.client = Client()
+        self.client.login(username='mwuser', password='password')
+
+        self.home = Location.objects.create(name="Home", account=self.account, default=True)
+        self.cabin = Location.objects.create(name="Cabin", account=self.account)
+        Item.objects.create(name="Stove", location=self.cabin)
+
+        other = User.objects.create_user(username='other', password='password')
+        other_account = Account.objects.create(name="Other", owner=other)
+        self.foreign = Location.objects.create(name="Elsewhere", account=other_account, default=True)
+
+    def set_session_location(self, value):
+        session = self.client.session
+        session["active_location_id"] = value
+        session.save()
+
+    def location_queries(self, url, **headers):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, **headers)
+        self.assertEqual(response.status_code, 200)
+        return response, [q for q in ctx.captured_queries if 'FROM "upkeep_location"' in q["sql"]]
+
+    def test_session_location_is_used(self):
+        self.set_session_location(self.cabin.pk)
+        response = self.client.get(reverse('item-list'))
+        self.assertEqual(response.context["active_location"], self.cabin)
+        self.assertContains(response, "Stove")
+
+    def test_invalid_session_ids_fall_back_to_default(self):
+        for value in (self.foreign.pk, "not-a-number", 999999):
+            self.set_session_location(value)
+            response = self.client.get(reverse('item-list'))
+            self.assertEqual(response.context["active_location"], self.home)
+            self.assertNotContains(response, "Stove")
+            self.assertEqual(self.client.session["active_location_id"], self.home.pk)
+
+    def test_one_location_query_per_request(self):
+        self.set_session_location(self.cabin.pk)
+        for url in (
+            reverse('home'),
+            reverse('item-list'),
+            reverse('task-management-list'),
+            reverse('task-due-list'),
+        ):
+            for headers in ({}, {"HTTP_HX_REQUEST": "true"}):
+                _, queries = self.location_queries(url, **headers)
+                self.assertEqual(len(queries), 1, (url, headers, queries))
+
+    def test_resolution_is_lazy(self):
+        self.client.logout()
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse('login'))
+        self.assertFalse([q for q in ctx.captured_queries if "upkeep_location" in q["sql"]])
+
+    def test_user_without_account(self):
+        self.profile.account = None
+        self.profile.save()
+        response = self.client.get(reverse('home'))
+        self.assertTrue(response.context["no_account"])
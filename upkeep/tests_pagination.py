@@ -0,0 +1,116 @@
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from .models import Location, Item, Task
+from .pagination import PAGE_SIZE, encode_cursor, keyset_paginate
+
+from common.models import Account, Profile
+
+User = get_user_model()
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='pageuser', password='password')
+        self.account = Account.objects.create(name="Test Household", owner=self.user)
+        self.profile = Profile.objects.create(user=self.user, account=self.account)
+        self.client = Client()
+        self.client.login(username='pageuser', password='password')
+
+        self.location = Location.objects.create(name="Home", account=self.account, default=True)
+
+    def _walk(self, url, params):
+        """Follows the cursors of a list view and returns every page."""
+        pages = []
+        response = self.client.get(url, params, HTTP_HX_REQUEST="true")
+        pages.append(response)
+        while response.context["page"].has_next:
+            cursor = response.context["page"].next_cursor
+            response = self.client.get(url, {**params, "cursor": cursor}, HTTP_HX_REQUEST="true")
+            pages.append(response)
+        return pages
+
+    def test_keyset_paginate_visits_every_row_once(self):
+        for i in range(7):
+            Item.objects.create(name=f"Item {i % 3}", location=self.location, area=None if i % 2 else "Shed")
+        keys = ["name", "id"]
+        seen = []
+        cursor = None
+        while True:
+            page = keyset_paginate(Item.objects.all(), keys, cursor=cursor, page_size=3)
+            seen.extend(item.pk for item in page.object_list)
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+        expected = list(Item.objects.order_by("name", "id").values_list("pk", flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_malformed_cursor_falls_back_to_first_page(self):
+        Item.objects.create(name="Toaster", location=self.location)
+        for cursor in ["not-base64!", encode_cursor(["a"]), encode_cursor([1, "x", "y"])]:
+            page = keyset_paginate(Item.objects.all(), ["name", "id"], cursor=cursor)
+            self.assertIsNone(page.previous_key)
+            self.assertEqual(len(page.object_list), 1)
+
+    def test_item_list_pages_through_all_items(self):
+        Item.objects.bulk_create(
+            Item(name=f"Item {i:03}", location=self.location, area="Kitchen" if i % 2 else None)
+            for i in range(PAGE_SIZE + 10)
+        )
+        pages = self._walk(reverse('item-list'), {})
+        self.assertEqual(len(pages), 2)
+        self.assertTemplateUsed(pages[1], "components/_item_cards.html")
+        names = [item.name for response in pages for item in response.context["items"]]
+        self.assertEqual(len(names), PAGE_SIZE + 10)
+        self.assertEqual(len(set(names)), PAGE_SIZE + 10)
+
+    def test_item_list_cursor_keeps_search(self):
+        Item.objects.bulk_create(
+            Item(name=f"{'Lamp' if i % 2 else 'Chair'} {i:03}", location=self.location)
+            for i in range(PAGE_SIZE * 3)
+        )
+        pages = self._walk(reverse('item-list'), {"q": "Lamp"})
+        names = [item.name for response in pages for item in response.context["items"]]
+        self.assertEqual(len(names), PAGE_SIZE * 3 // 2)
+        self.assertTrue(all(name.startswith("Lamp") for name in names))
+
+    def test_task_groups_continue_across_pages(self):
+        kitchen = Item.objects.create(name="Fridge", location=self.location, area="Kitchen")
+        garden = Item.objects.create(name="Mower", location=self.location, area="Garden")
+        Task.objects.bulk_create(
+            Task(name=f"Task {i:03}", item=kitchen if i < PAGE_SIZE + 5 else garden, frequency=Task.Frequency.WEEKLY)
+            for i in range(PAGE_SIZE + 10)
+        )
+        pages = self._walk(reverse('task-management-list'), {"group_by": "item"})
+        self.assertEqual(len(pages), 2)
+
+        first, second = (response.context["task_groups"] for response in pages)
+        self.assertEqual([(label, continued) for label, _, continued in first], [("Fridge", False)])
+        self.assertEqual(
+            [(label, continued) for label, _, continued in second],
+            [("Fridge", True), ("Mower", False)],
+        )
+        self.assertNotContains(pages[1], '<strong class="text-dark">Fridge</strong>', html=True)
+        self.assertContains(pages[1], '<strong class="text-dark">Mower</strong>', html=True)
+
+    def test_task_groups_by_area_label_empty_area_general(self):
+        item = Item.objects.create(name="Generic Item", location=self.location)
+        Task.objects.create(name="Generic Task", item=item, frequency=Task.Frequency.MONTHLY)
+        response = self.client.get(reverse('task-management-list'), {"group_by": "area"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([label for label, _, _ in response.context["task_groups"]], ["General"])
+
+    def test_tampered_frequency_cursor_falls_back_to_first_page(self):
+        item = Item.objects.create(name="Boiler", location=self.location)
+        Task.objects.create(name="Service", item=item, frequency=Task.Frequency.YEARLY)
+        # Well-formed, but 999 is no frequency to label the previous group with.
+        response = self.client.get(
+            reverse('task-management-list'),
+            {"group_by": "frequency", "cursor": encode_cursor([999, "a", 1])},
+            HTTP_HX_REQUEST="true",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.context["page"].previous_key)
+        self.assertEqual(
+            [(label, continued) for label, _, continued in response.context["task_groups"]],
+            [(Task.Frequency.YEARLY.label, False)],
+        )
@@ -0,0 +1,319 @@
+"""
+Query budgets: every view in upkeep.urls and common.urls, including the
+HTMX partials, must issue the same number of queries for a location with 10
+items and tasks as for one with 1,000, and no more than its budget below.
+A query per row (an N+1, e.g. building an ItemForm per card) fails the
+equality check; an extra query per request fails the budget.
+
+The budgets count everything the test client sees: the session, the user
+and profile, the locations, and for the list pages the change marker of
+the conditional GET handling (see upkeep.changes). Raise a budget only
+together with the change that needs the query.
+
+==================================  ===  ====
+View                                GET  POST
+==================================  ===  ====
+home, home (HTMX)                   8
+item-list, item-list (HTMX)         5
+item-list next page (HTMX)          5
+item-list search (HTMX)             6
+item-detail (HTMX)                  4
+item-create                         n/a  6
+item-update (HTMX modal)            5    6
+item-delete (HTMX modal)            4    15
+item-archive                             5
+item-import                         3    16
+export (items or tasks)             4
+settings-view                       8
+location-create                     n/a  7
+location-update                     n/a  4
+location-delete                          9 / 28
+location-calendar-reset                  4
+switch-location                     3
+task-calendar-feed                  3
+task-due-list, task-due-list (HTMX) 5
+task-management-list                6
+task-management-list (HTMX)         5
+  grouped by area or frequency      5
+  next page                         5
+  search                            6
+task-create (HTMX modal)            4    8
+  for an item                       5
+task-update (HTMX modal)            5    9
+task-delete (HTMX modal)            5    8
+task-complete                            6
+task-snooze                              6
+task-bulk-complete (HTMX)                16
+task-bulk-snooze (HTMX)                  16
+task-forecast, task-forecast-data   4
+==================================  ===  ====
+
+The GET pages of item-create, location-create and location-update render
+templates this tree doesn't have (the forms live in modals of the item list
+and the settings page), so only their POSTs are measured. The writes are
+dominated by the LocationStats refresh (see upkeep.stats); item-delete also
+loads the item's tasks to send their delete signals, a fixed cost here as
+each item has one task.
+
+location-delete is the one view whose cost grows with the rows: the ORM
+cascade loads the location's items and tasks to send their delete signals
+and deletes them in batches. It is budgeted per size (10 rows / 1,000).
+"""
+
+import datetime
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from .fragments import fragment_cache
+from .middleware import SESSION_KEY
+from .models import Location, Item, Task
+from .pagination import encode_cursor
+from .stats import refresh_location_stats
+
+from common.models import Account, Profile
+
+User = get_user_model()
+
+SIZES = (10, 1000)
+
+AREAS = ["Kitchen", "Garage", "Garden", "Basement", None]
+
+HTMX = {"HX-Request": "true"}
+
+# A cursor before the first row of any of the list orderings: the next-page
+# request reads a full page from the start of the location.
+START = encode_cursor(["", "", 0])
+
+# (label, url name, query string, headers, budget) of the pages that only
+# read; the rows are those of the session's active location.
+PAGES = [
+    ("home", "home", {}, {}, 8),
+    ("home (HTMX)", "home", {}, HTMX, 8),
+    ("item-list", "item-list", {}, {}, 5),
+    ("item-list (HTMX)", "item-list", {}, HTMX, 5),
+    ("item-list (HTMX, next page)", "item-list", {"cursor": START}, HTMX, 5),
+    ("item-list (search)", "item-list", {"q": "item"}, HTMX, 6),
+    ("task-due-list", "task-due-list", {}, {}, 5),
+    ("task-due-list (HTMX)", "task-due-list", {}, HTMX, 5),
+    ("task-management-list", "task-management-list", {}, {}, 6),
+    ("task-management-list (HTMX)", "task-management-list", {}, HTMX, 5),
+    ("by area", "task-management-list", {"group_by": "area"}, HTMX, 5),
+    ("by frequency", "task-management-list", {"group_by": "frequency"}, HTMX, 5),
+    ("next page", "task-management-list", {"cursor": START}, HTMX, 5),
+    ("search", "task-management-list", {"q": "task"}, HTMX, 6),
+    ("task-create", "task-create", {}, HTMX, 4),
+    ("item-import", "item-import", {}, {}, 3),
+    ("settings-view", "settings-view", {}, {}, 8),
+    ("task-forecast", "task-forecast", {}, {}, 4),
+    ("task-forecast-data", "task-forecast-data", {}, {}, 4),
+    ("export (items)", "export", {}, {}, 4),
+]
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Seeds one location with 10 items and tasks and one with 1,000, then
+    requests every view in both (see the table above).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='budgetuser', password='password')
+        cls.account = Account.objects.create(name="Test Household", owner=cls.user)
+        Profile.objects.create(user=cls.user, account=cls.account)
+
+        today = timezone.now().date()
+        Location.objects.create(name="Home", account=cls.account, default=True)
+        cls.locations = []
+        for size in SIZES:
+            location = Location.objects.create(name=f"{size} rows", account=cls.account)
+            items = Item.objects.bulk_create(
+                Item(name=f"Item {i:04}", area=AREAS[i % len(AREAS)], location=location)
+                for i in range(size)
+            )
+            frequencies = Task.Frequency.values
+            # Half of them due, so the due list renders rows too.
+            tasks = Task.objects.bulk_create(
+                Task(
+                    name=f"Task {i:04}",
+                    item=item,
+                    frequency=frequencies[i % len(frequencies)],
+                    next_due_date=today + datetime.timedelta(days=i % 60 - 30),
+                )
+                for i, item in enumerate(items)
+            )
+            location.item_ids = [item.pk for item in items]
+            location.task_ids = [task.pk for task in tasks]
+            cls.locations.append(location)
+        refresh_location_stats([location.pk for location in cls.locations], today)
+
+    def setUp(self):
+        fragment_cache().clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+        # Pages only compute their validators once the client has a CSRF
+        # cookie (see upkeep.changes); get it first so both sizes match.
+        self.client.get(reverse('home'))
+
+    def count_queries(self, location, method, url, data, headers):
+        session = self.client.session
+        session[SESSION_KEY] = location.pk
+        session.save()
+        with CaptureQueriesContext(connection) as ctx:
+            response = getattr(self.client, method)(url, data, headers=headers)
+            if response.streaming:
+                b"".join(response.streaming_content)
+        # Writes redirect, or re-render a partial for HTMX.
+        expected = (200, 302) if method == "get" else (200,) if headers else (302,)
+        self.assertIn(response.status_code, expected, url)
+        return len(ctx)
+
+    def assertBudget(self, budget, method, url, data=None, headers=None):
+        """
+        Requests ``url(location)`` with ``data`` (or ``data(location)``) in
+        the small and in the large location and checks that both cost the
+        same number of queries, within ``budget``.
+        """
+        counts = [
+            self.count_queries(
+                location, method, url(location),
+                data(location) if callable(data) else data or {}, headers or {},
+            )
+            for location in self.locations
+        ]
+        self.assertEqual(counts[0], counts[1], "the query count grows with the rows")
+        self.assertLessEqual(counts[1], budget, "over the query budget")
+
+    def test_pages(self):
+        for label, name, data, headers, budget in PAGES:
+            args = ["items"] if name == "export" else []
+            with self.subTest(label):
+                self.assertBudget(
+                    budget, "get", lambda location, name=name, args=args: reverse(name, args=args), data, headers
+                )
+
+    def test_task_export(self):
+        self.assertBudget(4, "get", lambda location: reverse('export', args=["tasks"]))
+
+    def test_item_modals(self):
+        for name, budget in (("item-detail", 4), ("item-update", 5), ("item-delete", 4)):
+            with self.subTest(name):
+                self.assertBudget(
+                    budget, "get", lambda location, name=name: reverse(name, args=[location.item_ids[0]]),
+                    headers=HTMX,
+                )
+
+    def test_task_modals(self):
+        for name in ("task-update", "task-delete"):
+            with self.subTest(name):
+                self.assertBudget(
+                    5, "get", lambda location, name=name: reverse(name, args=[location.task_ids[0]]),
+                    headers=HTMX,
+                )
+
+    def test_task_create_for_item(self):
+        self.assertBudget(
+            5, "get", lambda location: reverse('task-create'),
+            lambda location: {"item": location.item_ids[0]}, HTMX,
+        )
+
+    def test_calendar_feed(self):
+        self.assertBudget(
+            3, "get",
+            lambda location: reverse('task-calendar-feed', args=[location.calendar_token]),
+        )
+
+    def test_switch_location(self):
+        self.assertBudget(3, "get", lambda location: reverse('switch-location', args=[location.pk]))
+
+    def test_item_create(self):
+        self.assertBudget(
+            6, "post", lambda location: reverse('item-create'),
+            lambda location: {"name": "Dishwasher", "location": location.pk, "quantity": 1},
+        )
+
+    def test_item_update(self):
+        self.assertBudget(
+            6, "post", lambda location: reverse('item-update', args=[location.item_ids[1]]),
+            lambda location: {"name": "Renamed", "location": location.pk, "quantity": 1},
+        )
+
+    def test_item_delete(self):
+        self.assertBudget(
+            15, "post", lambda location: reverse('item-delete', args=[location.item_ids[2]])
+        )
+
+    def test_item_archive(self):
+        self.assertBudget(
+            5, "post", lambda location: reverse('item-archive', args=[location.item_ids[3]])
+        )
+
+    def test_item_import(self):
+        self.assertBudget(
+            16, "post", lambda location: reverse('item-import'),
+            lambda location: {"file": SimpleUploadedFile("items.csv", b"name,area\nKettle,Kitchen\n")},
+        )
+
+    def test_task_create(self):
+        self.assertBudget(
+            8, "post", lambda location: reverse('task-create'),
+            lambda location: {"name": "Descale", "item": location.item_ids[4], "frequency": 30,
+                              "snooze_count": 0},
+        )
+
+    def test_task_update(self):
+        self.assertBudget(
+            9, "post", lambda location: reverse('task-update', args=[location.task_ids[5]]),
+            lambda location: {"name": "Renamed", "item": location.item_ids[5], "frequency": 7,
+                              "snooze_count": 0},
+        )
+
+    def test_task_delete(self):
+        self.assertBudget(
+            8, "post", lambda location: reverse('task-delete', args=[location.task_ids[6]])
+        )
+
+    def test_task_complete(self):
+        self.assertBudget(
+            6, "post", lambda location: reverse('task-complete', args=[location.task_ids[7]])
+        )
+
+    def test_task_snooze(self):
+        self.assertBudget(
+            6, "post", lambda location: reverse('task-snooze', args=[location.task_ids[8]])
+        )
+
+    def test_bulk_task_actions(self):
+        # The ticked tasks are a fixed number, the due list re-rendered after
+        # them grows with the location.
+        for name in ("task-bulk-complete", "task-bulk-snooze"):
+            with self.subTest(name):
+                self.assertBudget(
+                    16, "post", lambda location, name=name: reverse(name),
+                    lambda location: {"task": location.task_ids[:5]}, HTMX,
+                )
+
+    def test_location_create(self):
+        self.assertBudget(7, "post", lambda location: reverse('location-create'), {"name": "Shed"})
+
+    def test_location_update(self):
+        self.assertBudget(
+            4, "post", lambda location: reverse('location-update', args=[location.pk]),
+            lambda location: {"name": f"{location.name} (renamed)"},
+        )
+
+    def test_location_delete(self):
+        for location, budget in zip(self.locations, (9, 28)):
+            url = reverse('location-delete', args=[location.pk])
+            self.assertLessEqual(self.count_queries(location, "post", url, {}, {}), budget, "over the query budget")
+        self.assertFalse(Item.objects.filter(location__in=self.locations).exists())
+
+    def test_calendar_reset(self):
+        self.assertBudget(
+            4, "post", lambda location: reverse('location-calendar-reset', args=[location.pk])
+        )
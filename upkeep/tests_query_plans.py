@@ -0,0 +1,144 @@
+import datetime
+import re
+
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from .models import Location, Item, Task
+
+from common.models import Account, Profile
+
+User = get_user_model()
+
+# A plan step that reads a whole upkeep table instead of seeking an index.
+# SQLite's FTS5 virtual tables also report "SCAN", but they are index lookups.
+FULL_SCAN = {
+    "sqlite": re.compile(r"\bSCAN (upkeep_\w+)\b(?! VIRTUAL TABLE)"),
+    "postgresql": re.compile(r"Seq Scan on (upkeep_\w+)"),
+}
+
+AREAS = ["Kitchen", "Garage", "Garden", "Basement", "Attic", None]
+
+
+def explain(sql):
+    prefix = "EXPLAIN QUERY PLAN " if connection.vendor == "sqlite" else "EXPLAIN "
+    with connection.cursor() as cursor:
+        cursor.execute(prefix + sql)
+        return "\n".join(str(row[-1]) for row in cursor.fetchall())
+
+
+class QueryPlanTests(TestCase):
+    """
+    Runs the hot views against a seeded dataset and EXPLAINs every query they
+    issue, failing on any full scan of an upkeep table. A query or index change
+    that loses an access path shows up here rather than in production.
+    """
+
+    locations_per_account = 4
+    items_per_location = 400
+    tasks_per_item = 3
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='planuser', password='password')
+        cls.account = Account.objects.create(name="Test Household", owner=cls.user)
+        Profile.objects.create(user=cls.user, account=cls.account)
+        other = User.objects.create_user(username='neighbour', password='password')
+        other_account = Account.objects.create(name="Neighbours", owner=other)
+        Profile.objects.create(user=other, account=other_account)
+
+        today = timezone.now().date()
+        locations = Location.objects.bulk_create(
+            Location(name=f"Place {i}", account=account, default=i == 0)
+            for account in (cls.account, other_account)
+            for i in range(cls.locations_per_account)
+        )
+        items = Item.objects.bulk_create(
+            Item(
+                name=f"Item {i}",
+                area=AREAS[i % len(AREAS)],
+                brand="Acme",
+                location=location,
+                status=Item.ItemStatus.BROKEN if i % 25 == 0 else Item.ItemStatus.ACTIVE,
+                purchase_value=i,
+                warranty_expiration=today + datetime.timedelta(days=i % 400),
+            )
+            for location in locations
+            for i in range(cls.items_per_location)
+        )
+        frequencies = Task.Frequency.values
+        Task.objects.bulk_create(
+            Task(
+                name=f"Task {i}",
+                description="Clean and inspect",
+                item=item,
+                frequency=frequencies[(item.pk + i) % len(frequencies)],
+                next_due_date=today + datetime.timedelta(days=(item.pk * 7 + i) % 120 - 60),
+            )
+            for item in items
+            for i in range(cls.tasks_per_item)
+        )
+        cls.item = items[0]
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def setUp(self):
+        self.client = Client()
+        self.client.login(username='planuser', password='password')
+        self.plans = []
+
+    def assertIndexedQueries(self, url, params=None, **headers):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, params or {}, **headers)
+        self.assertEqual(response.status_code, 200)
+
+        pattern = FULL_SCAN[connection.vendor]
+        for query in ctx.captured_queries:
+            sql = query["sql"]
+            if not sql.lstrip().upper().startswith("SELECT"):
+                continue
+            plan = explain(sql)
+            self.plans.append(plan)
+            scanned = pattern.findall(plan)
+            self.assertFalse(scanned, f"{url} {params or ''} scans {scanned}:\n{sql}\n{plan}")
+        return response
+
+    def test_home(self):
+        self.assertIndexedQueries(reverse('home'))
+
+    def test_item_list(self):
+        response = self.assertIndexedQueries(reverse('item-list'))
+        self.assertIndexedQueries(
+            reverse('item-list'), {"cursor": response.context["page"].next_cursor}, HTTP_HX_REQUEST="true"
+        )
+        self.assertIndexedQueries(reverse('item-list'), {"q": "item 12"}, HTTP_HX_REQUEST="true")
+
+    def test_item_detail(self):
+        self.assertIndexedQueries(reverse('item-detail', args=[self.item.pk]))
+
+    def test_task_management_list(self):
+        for group_by in ("item", "area", "frequency"):
+            response = self.assertIndexedQueries(reverse('task-management-list'), {"group_by": group_by})
+            self.assertIndexedQueries(
+                reverse('task-management-list'),
+                {"group_by": group_by, "cursor": response.context["page"].next_cursor},
+                HTTP_HX_REQUEST="true",
+            )
+        self.assertIndexedQueries(reverse('task-management-list'), {"q": "clean"}, HTTP_HX_REQUEST="true")
+
+    def test_task_due_list(self):
+        self.assertIndexedQueries(reverse('task-due-list'))
+
+    def test_composite_indexes_are_chosen(self):
+        self.assertIndexedQueries(reverse('home'))
+        self.assertIndexedQueries(reverse('task-due-list'))
+        plans = "\n".join(self.plans)
+        for index in (
+            "upkeep_loc_account_default_idx",
+            "upkeep_item_loc_status_idx",
+            "upkeep_task_item_due_idx",
+        ):
+            self.assertIn(index, plans)
@@ -0,0 +1,101 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from .models import Location, Item, Task
+from .search import ITEM_FTS, search_items, search_tasks
+
+from common.models import Account, Profile
+
+User = get_user_model()
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='searchuser', password='password')
+        self.account = Account.objects.create(name="Test Household", owner=self.user)
+        self.profile = Profile.objects.create(user=self.user, account=self.account)
+        self.client = Client()
+        self.client.login(username='searchuser', password='password')
+
+        self.location = Location.objects.create(name="Home", account=self.account, default=True)
+        self.toaster = Item.objects.create(name="Toaster", brand="Philips", area="Kitchen", location=self.location)
+        self.pump = Item.objects.create(name="Heat Pump", brand="Nibe", area="Basement", location=self.location)
+        self.filter_task = Task.objects.create(
+            name="Replace filter",
+            description="## Tools & Parts\n- Filter\n\n## Steps\n1. Swap it",
+            item=self.pump,
+            frequency=Task.Frequency.QUARTERLY,
+        )
+        self.crumb_task = Task.objects.create(
+            name="Empty crumb tray", item=self.toaster, frequency=Task.Frequency.WEEKLY
+        )
+
+    def _items(self, query):
+        queryset, rank = search_items(Item.objects.all(), query)
+        return [item.name for item in queryset.order_by(rank, "id")]
+
+    def _tasks(self, query):
+        queryset, rank = search_tasks(Task.objects.all(), query)
+        return [task.name for task in queryset.order_by(rank, "id")]
+
+    def test_prefix_match(self):
+        self.assertEqual(self._items("toa"), ["Toaster"])
+        self.assertEqual(self._items("hea pu"), ["Heat Pump"])
+
+    def test_matches_brand_and_area(self):
+        self.assertEqual(self._items("nibe"), ["Heat Pump"])
+        self.assertEqual(self._items("kitchen"), ["Toaster"])
+
+    def test_typo_tolerance(self):
+        self.assertEqual(self._items("toastr"), ["Toaster"])
+        self.assertEqual(self._tasks("fliter"), ["Replace filter"])
+
+    def test_ranks_name_matches_first(self):
+        Item.objects.create(name="Kettle", notes="toaster-adjacent", brand="Toaster Co", location=self.location)
+        self.assertEqual(self._items("toaster"), ["Toaster", "Kettle"])
+
+    def test_tasks_match_item_name_and_follow_renames(self):
+        self.assertEqual(self._tasks("pump"), ["Replace filter"])
+        self.pump.name = "Boiler"
+        self.pump.save()
+        self.assertEqual(self._tasks("pump"), [])
+        self.assertEqual(self._tasks("boiler"), ["Replace filter"])
+
+    def test_tasks_match_terms_across_task_and_item_name(self):
+        self.assertEqual(self._tasks("heat filter"), ["Replace filter"])
+        self.assertEqual(self._tasks("pump repl"), ["Replace filter"])
+
+    def test_deleted_rows_leave_the_index(self):
+        self.toaster.delete()
+        self.assertEqual(self._items("toaster"), [])
+        self.assertEqual(self._tasks("crumb"), [])
+
+    def test_blank_query_does_not_filter(self):
+        queryset, rank = search_items(Item.objects.all(), "  !! ")
+        self.assertIsNone(rank)
+        self.assertEqual(queryset.count(), 2)
+
+    def test_item_list_search(self):
+        response = self.client.get(reverse('item-list'), {"q": "toas"}, HTTP_HX_REQUEST="true")
+        self.assertContains(response, "Toaster")
+        self.assertNotContains(response, "Heat Pump")
+
+    def test_task_list_search_keeps_grouping(self):
+        response = self.client.get(reverse('task-management-list'), {"q": "filter", "group_by": "area"})
+        self.assertEqual(
+            [(label, [task.name for task in tasks]) for label, tasks, _ in response.context["task_groups"]],
+            [("Basement", ["Replace filter"])],
+        )
+
+    def test_rebuild_command_repopulates_index(self):
+        if connection.vendor == "sqlite":
+            with connection.cursor() as cursor:
+                cursor.execute(f"DELETE FROM {ITEM_FTS}")
+            self.assertEqual(self._items("toaster"), [])
+        out = StringIO()
+        call_command("rebuild_search_index", stdout=out)
+        self.assertIn("2 items and 2 tasks", out.getvalue())
+        self.assertEqual(self._items("toaster"), ["Toaster"])
@@ -0,0 +1,137 @@
+import datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from .models import Location, LocationStats, Item, Task
+from .stats import compute_counters, get_location_stats
+
+from common.models import Account, Profile
+
+User = get_user_model()
+
+class LocationStatsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='statsuser', password='password')
+        self.account = Account.objects.create(name="Test Household", owner=self.user)
+        self.profile = Profile.objects.create(user=self.user, account=self.account)
+        self.client = Client()
+        self.client.login(username='statsuser', password='password')
+
+        self.today = timezone.now().date()
+        self.location = Location.objects.create(name="Home", account=self.account, default=True)
+        self.cabin = Location.objects.create(name="Cabin", account=self.account)
+        self.fridge = Item.objects.create(name="Fridge", location=self.location, purchase_value=900)
+        self.task = Task.objects.create(
+            name="Defrost",
+            item=self.fridge,
+            frequency=Task.Frequency.MONTHLY,
+            next_due_date=self.today - datetime.timedelta(days=2),
+            estimated_hours_to_complete=3,
+        )
+
+    def assertInSync(self, *locations):
+        for location in locations or (self.location, self.cabin):
+            stats = LocationStats.objects.get(pk=location.pk)
+            stored = {name: getattr(stats, name) for name in compute_counters(location.pk, self.today)}
+            self.assertEqual(stored, compute_counters(location.pk, self.today), location.name)
+
+    def test_location_creation_creates_empty_row(self):
+        stats = LocationStats.objects.get(pk=self.cabin.pk)
+        self.assertEqual(stats.total_active_items, 0)
+        self.assertEqual(stats.computed_on, self.today)
+
+    def test_counters_follow_creates(self):
+        stats = LocationStats.objects.get(pk=self.location.pk)
+        self.assertEqual(stats.total_active_items, 1)
+        self.assertEqual(stats.total_asset_value, 900)
+        self.assertEqual(stats.overdue_tasks_count, 1)
+        self.assertInSync()
+
+    def test_item_updates_and_archive(self):
+        item = Item.objects.get(pk=self.fridge.pk)
+        item.purchase_value = 1200
+        item.save()
+        self.assertInSync()
+
+        item.status = Item.ItemStatus.BROKEN
+        item.save()
+        self.assertInSync()
+
+        self.client.post(reverse('item-archive', args=[self.fridge.pk]))
+        stats = LocationStats.objects.get(pk=self.location.pk)
+        self.assertEqual(stats.total_active_items, 0)
+        self.assertEqual(stats.broken_items_count, 0)
+        self.assertInSync()
+
+    def test_moving_item_moves_its_tasks(self):
+        item = Item.objects.get(pk=self.fridge.pk)
+        item.location = self.cabin
+        item.save()
+        self.assertEqual(LocationStats.objects.get(pk=self.cabin.pk).overdue_tasks_count, 1)
+        self.assertInSync()
+
+    def test_task_complete_and_snooze(self):
+        self.client.post(reverse('task-complete', args=[self.task.pk]))
+        self.assertEqual(LocationStats.objects.get(pk=self.location.pk).overdue_tasks_count, 0)
+        self.assertInSync()
+
+        task = Task.objects.get(pk=self.task.pk)
+        task.next_due_date = self.today
+        task.save()
+        self.client.post(reverse('task-snooze', args=[self.task.pk]))
+        self.assertInSync()
+
+    def test_frequency_change_updates_load(self):
+        task = Task.objects.get(pk=self.task.pk)
+        task.frequency = Task.Frequency.WEEKLY
+        task.save()
+        # Due today (overdue) and on days 7, 14, 21 and 28.
+        self.assertEqual(LocationStats.objects.get(pk=self.location.pk).maintenance_load, 15)
+        self.assertInSync()
+
+    def test_task_moves_between_items(self):
+        heater = Item.objects.create(name="Heater", location=self.cabin)
+        task = Task.objects.get(pk=self.task.pk)
+        task.item = heater
+        task.save()
+        # The overdue monthly task is due today and again in 30 days.
+        self.assertEqual(LocationStats.objects.get(pk=self.cabin.pk).maintenance_load, 6)
+        self.assertEqual(LocationStats.objects.get(pk=self.cabin.pk).overdue_tasks_count, 1)
+        self.assertInSync()
+
+    def test_deletes(self):
+        Task.objects.create(name="Clean coils", item=self.fridge, frequency=Task.Frequency.YEARLY)
+        Task.objects.get(pk=self.task.pk).delete()
+        self.assertInSync()
+
+        self.client.post(reverse('item-delete', args=[self.fridge.pk]))
+        stats = LocationStats.objects.get(pk=self.location.pk)
+        self.assertEqual(stats.total_active_items, 0)
+        self.assertEqual(stats.tasks_due_this_week, 0)
+        self.assertInSync()
+
+        self.cabin.delete()
+        self.assertFalse(LocationStats.objects.filter(pk=self.cabin.pk).exists())
+
+    def test_read_is_a_single_lookup(self):
+        get_location_stats(self.location)
+        with self.assertNumQueries(1):
+            get_location_stats(self.location)
+
+    def test_stale_row_is_recomputed_on_read(self):
+        LocationStats.objects.filter(pk=self.location.pk).update(
+            computed_on=self.today - datetime.timedelta(days=1), overdue_tasks_count=42
+        )
+        self.assertEqual(get_location_stats(self.location).overdue_tasks_count, 1)
+
+    def test_reconcile_command(self):
+        LocationStats.objects.filter(pk=self.location.pk).update(total_active_items=42)
+        Item.objects.bulk_create([Item(name="Bulk", location=self.cabin)])
+        out = StringIO()
+        call_command("reconcile_location_stats", stdout=out)
+        self.assertIn("2 location(s)", out.getvalue())
+        self.assertInSync()
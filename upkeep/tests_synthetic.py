@@ -0,0 +1,101 @@
+import datetime
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, TransactionTestCase
+from django.contrib.auth import get_user_model
+from .models import Location, Item, Task, LocationStats
+from .synthetic import delete_households, generate_households
+
+from common.models import Account
+
+User = get_user_model()
+
+TODAY = datetime.date(2026, 3, 1)
+
+
+def snapshot(prefix):
+    items = Item.objects.filter(location__account__owner__username__startswith=f"{prefix}-")
+    tasks = Task.objects.filter(item__in=items)
+    return (
+        list(items.order_by("pk").values_list(
+            "name", "area", "brand", "status", "purchase_value", "warranty_expiration"
+        )),
+        list(tasks.order_by("pk").values_list(
+            "name", "frequency", "next_due_date", "snoozed_until", "estimated_hours_to_complete"
+        )),
+    )
+
+
+class SyntheticHouseholdTests(TestCase):
+    def generate(self, prefix="synthetic", **kwargs):
+        options = {"accounts": 2, "members": 3, "locations": 2, "items": 20, "today": TODAY}
+        return generate_households(prefix, **{**options, **kwargs})
+
+    def test_households(self):
+        accounts = self.generate()
+        self.assertEqual(len(accounts), 2)
+        account = accounts[0]
+        self.assertEqual(account.owner.username, "synthetic-0000-0")
+        self.assertEqual(account.members.count(), 3)
+        self.assertFalse(account.owner.has_usable_password())
+
+        locations = Location.objects.filter(account=account)
+        self.assertEqual([loc.default for loc in locations.order_by("pk")], [True, False])
+        for location in locations:
+            self.assertEqual(location.items.count(), 20)
+            frequencies = set(
+                Task.objects.filter(item__location=location).values_list("frequency", flat=True)
+            )
+            self.assertEqual(frequencies, set(Task.Frequency.values))
+            self.assertEqual(LocationStats.objects.get(location=location).total_active_items,
+                             location.items.filter(status=Item.ItemStatus.ACTIVE).count())
+
+    def test_same_seed_same_data(self):
+        self.generate("first")
+        self.generate("second")
+        self.generate("third", seed=2)
+        self.assertEqual(snapshot("first"), snapshot("second"))
+        self.assertNotEqual(snapshot("first"), snapshot("third"))
+
+    def test_delete(self):
+        self.generate("gone")
+        self.generate("kept", accounts=1)
+        self.assertEqual(delete_households("gone"), 2)
+        self.assertFalse(User.objects.filter(username__startswith="gone-").exists())
+        self.assertEqual(Account.objects.count(), 1)
+        self.assertEqual(Item.objects.count(), 40)
+
+    def test_command(self):
+        out = StringIO()
+        call_command("generate_households", accounts=1, items=10, password="pw", stdout=out)
+        self.assertIn("Generated 1 household(s): 20 items", out.getvalue())
+        self.assertTrue(User.objects.get(username="synthetic-0000-0").check_password("pw"))
+        with self.assertRaises(CommandError):
+            call_command("generate_households", accounts=1, stdout=StringIO())
+        call_command("generate_households", delete=True, stdout=out)
+        self.assertFalse(Account.objects.exists())
+
+
+class LoadBenchmarkTests(TransactionTestCase):
+    """
+    A TransactionTestCase: the request threads only see committed data.
+    """
+
+    def test_report(self):
+        out = StringIO()
+        call_command(
+            "benchmark_load", accounts=1, members=1, items=10, duration=0.5, concurrency=1,
+            stdout=out,
+        )
+        report = json.loads(out.getvalue())
+        self.assertEqual(report["data"]["items"], 10)
+        self.assertGreater(report["requests"], 0)
+        self.assertEqual(report["errors"], 0)
+        self.assertEqual(len(report["endpoints"]), 8)
+        for name in ("throughput", "p50", "p95", "p99"):
+            self.assertIsNotNone(report[name])
+        # The throwaway households are gone again.
+        self.assertFalse(User.objects.exists())
@@ -4,6 +4,9 @@ from . import views
 urlpatterns = [
     path("items/", views.item_list, name="item-list"),
     path("items/create/", views.item_create, name="item-create"),
+    path("items/import/", views.item_import, name="item-import"),
+    path("export/<str:dataset>/", views.export_data, name="export"),
+    path("items/<int:pk>/", views.item_detail, name="item-detail"),
     path("items/<int:pk>/delete/", views.item_delete, name="item-delete"),
     path("items/<int:pk>/update/", views.item_update, name="item-update"),
     path("items/<int:pk>/archive/", views.item_archive, name="item-archive"),
@@ -12,6 +15,8 @@ urlpatterns = [
     path("locations/switch/<int:pk>/", views.switch_location, name="switch-location"),
     path("locations/<int:pk>/delete/", views.location_delete, name="location-delete"),
     path("locations/<int:pk>/update/", views.location_update, name="location-update"),
+    path("locations/<int:pk>/calendar/reset/", views.location_calendar_reset, name="location-calendar-reset"),
+    path("calendar/<str:token>.ics", views.task_calendar_feed, name="task-calendar-feed"),
     # Task Management
     path("tasks/due/", views.task_due_list, name="task-due-list"),
     path("maintenance/", views.task_management_list, name="task-management-list"),
@@ -20,4 +25,8 @@ urlpatterns = [
     path("tasks/<int:pk>/delete/", views.task_delete, name="task-delete"),
     path("tasks/<int:pk>/complete/", views.task_complete, name="task-complete"),
     path("tasks/<int:pk>/snooze/", views.task_snooze, name="task-snooze"),
+    path("tasks/bulk/complete/", views.task_bulk_complete, name="task-bulk-complete"),
+    path("tasks/bulk/snooze/", views.task_bulk_snooze, name="task-bulk-snooze"),
+    path("tasks/forecast/", views.task_forecast, name="task-forecast"),
+    path("tasks/forecast/data/", views.task_forecast_data, name="task-forecast-data"),
 ]
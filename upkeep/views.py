@@ -1,17 +1,44 @@
-from collections import defaultdict
-from django.db.models import Q
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import F, Value
 from django.utils import timezone
-from django.db.models.functions import Coalesce, Greatest
+from django.db.models.functions import Coalesce
 from .models import Task, Item, Location
+from .pagination import akeyset_paginate, row_key
+from .search import search_items, search_tasks
+from .stats import refresh_location_stats
 from django.contrib.auth.decorators import login_required
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, render, redirect
 from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.utils.text import slugify
 from django.contrib import messages
 from django_htmx.http import HttpResponseClientRedirect
-from .forms import ItemForm, LocationForm, TaskForm
+from .forms import ImportForm, ItemForm, LocationForm, TaskForm, item_choices, location_choices
+from .changes import conditional_page
+from .exporter import CONTENT_TYPES, DATASETS, aexport_chunks, export_chunks
+from .forecast import DEFAULT_DAYS, MAX_DAYS, forecast
+from .ical import CONTENT_TYPE as ICAL_CONTENT_TYPE, feed_validators, render_feed
+from .importer import ImportFormatError, detect_format, import_file
+from .middleware import SESSION_KEY, aprepare_request, get_user_locations
 from common.forms import ProfileForm
 from common.models import Profile
 import datetime
+import io
+import math
+
+
+def _location_choices(request):
+    """
+    Location choices for every ItemForm rendered in this request, built from
+    the locations the middleware already loaded for the location switcher.
+    """
+    if not hasattr(request, "_location_choices"):
+        request._location_choices = location_choices(get_user_locations(request))
+    return request._location_choices
 
 
 @login_required
@@ -73,6 +100,9 @@ def settings_view(request):
     
     for loc in locations:
         loc.form = LocationForm(instance=loc)
+        loc.calendar_url = request.build_absolute_uri(
+            reverse("task-calendar-feed", args=[loc.calendar_token])
+        )
     form = LocationForm()
 
     return render(
@@ -90,7 +120,7 @@ def settings_view(request):
 
 @login_required
 def location_delete(request, pk):
-    location = get_object_or_404(Location, pk=pk, account=request.user.profile.account)
+    location = get_object_or_404(Location, pk=pk, account=request.account)
 
     if location.default:
         messages.error(request, "The default location cannot be deleted.")
@@ -106,8 +136,9 @@ def location_delete(request, pk):
 
 @login_required
 def switch_location(request, pk):
-    location = get_object_or_404(Location, pk=pk, account=request.user.profile.account)
-    request.session["active_location_id"] = location.id
+    location = get_object_or_404(Location, pk=pk, account=request.account)
+    if request.session.get(SESSION_KEY) != location.id:
+        request.session[SESSION_KEY] = location.id
     messages.success(request, f"Switched to location: {location.name}")
 
     # Redirect to where the user came from, or default to home/item-list
@@ -121,7 +152,7 @@ def location_create(request):
         form = LocationForm(request.POST)
         if form.is_valid():
             location = form.save(commit=False)
-            location.account = request.user.profile.account
+            location.account = request.account
             location.default = False  # just to be explicit
             location.save()
             messages.success(request, f"Location '{location.name}' created.")
@@ -133,7 +164,7 @@ def location_create(request):
 
 @login_required
 def location_update(request, pk):
-    location = get_object_or_404(Location, pk=pk, account=request.user.profile.account)
+    location = get_object_or_404(Location, pk=pk, account=request.account)
 
     if request.method == "POST":
         form = LocationForm(request.POST, instance=location)
@@ -147,9 +178,38 @@ def location_update(request, pk):
     return render(request, "location_form.html", {"form": form})
 
 
+@login_required
+def location_calendar_reset(request, pk):
+    location = get_object_or_404(Location, pk=pk, account=request.account)
+    if request.method == "POST":
+        location.reset_calendar_token()
+        messages.success(
+            request, f"New calendar link for '{location.name}'. The old link no longer works."
+        )
+    return redirect("settings-view")
+
+
+def task_calendar_feed(request, token):
+    """
+    The location's tasks as an iCalendar feed. Calendar apps cannot log in,
+    so the secret token in the URL stands in for the session.
+    """
+    location = get_object_or_404(Location, calendar_token=token)
+    etag, last_modified = feed_validators(location)
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(last_modified.timestamp())
+    )
+    if response is None:
+        response = HttpResponse(render_feed(location), content_type=ICAL_CONTENT_TYPE)
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified.timestamp())
+    response["Cache-Control"] = "private, max-age=900"
+    return response
+
+
 @login_required
 def item_archive(request, pk):
-    item = get_object_or_404(Item, pk=pk, location__account=request.user.profile.account)
+    item = get_object_or_404(Item, pk=pk, location__account=request.account)
     if request.method == "POST":
         item.status = Item.ItemStatus.RETIRED
         item.save()
@@ -159,7 +219,7 @@ def item_archive(request, pk):
 
 @login_required
 def item_update(request, pk):
-    account = request.user.profile.account
+    account = request.account
     item = get_object_or_404(Item, pk=pk, location__account=account)
 
     if request.method == "POST":
@@ -169,16 +229,40 @@ def item_update(request, pk):
             messages.success(request, f"{item.name} was updated successfully.")
             return redirect("item-list")  # or wherever the item list is shown
     else:
-        form = ItemForm(instance=item, account=account)
+        form = ItemForm(
+            instance=item,
+            account=account,
+            location_choices=_location_choices(request),
+        )
 
     return render(
-        request, "components/item_detail_modal.html", {"item": item, "form": form}
+        request, "components/_item_detail_modal.html", {"item": item, "form": form}
+    )
+
+
+@login_required
+def item_detail(request, pk):
+    """
+    Returns the detail/edit modal content for a single item. The item list
+    only renders lightweight cards and fetches this over HTMX on click.
+    """
+    account = request.account
+    item = get_object_or_404(
+        Item.objects.select_related("location"), pk=pk, location__account=account
+    )
+    form = ItemForm(
+        instance=item,
+        account=account,
+        location_choices=_location_choices(request),
+    )
+    return render(
+        request, "components/_item_detail_modal.html", {"item": item, "form": form}
     )
 
 
 @login_required
 def item_delete(request, pk):
-    item = get_object_or_404(Item, pk=pk, location__account=request.user.profile.account)
+    item = get_object_or_404(Item, pk=pk, location__account=request.account)
 
     if request.method == "POST":
         item_name = item.name
@@ -186,10 +270,14 @@ def item_delete(request, pk):
         messages.success(request, f"Item '{item_name}' was deleted successfully.")
         return redirect("item-list")
 
+    return render(
+        request, "components/_item_delete_confirm_modal.html", {"item": item}
+    )
+
 
 @login_required
 def item_create(request):
-    account = request.user.profile.account
+    account = request.account
     if request.method == "POST":
         form = ItemForm(request.POST, request.FILES, account=account)
         if form.is_valid():
@@ -209,148 +297,213 @@ def item_create(request):
             )
     else:
         initial_data = {}
-        active_location_id = request.session.get("active_location_id")
-        if active_location_id:
-            initial_data["location"] = active_location_id
-        form = ItemForm(initial=initial_data, account=account)
+        if request.active_location:
+            initial_data["location"] = request.active_location.pk
+        form = ItemForm(
+            initial=initial_data,
+            account=account,
+            location_choices=_location_choices(request),
+        )
 
     # Optional: this view can render a standalone page or return a partial if needed
     return render(request, "inventory/item_create.html", {"form": form})
 
 
 @login_required
-def item_list(request):
-    query = request.GET.get("q", "")
-    account = request.user.profile.account
+def item_import(request):
+    """
+    Upload page for the bulk importer (see upkeep.importer). The dry run is
+    ticked by default so the report can be checked before importing.
+    """
+    report = None
+    active_location = request.active_location
+    if request.method == "POST":
+        form = ImportForm(request.POST, request.FILES)
+        if not active_location:
+            messages.error(request, "Create a location before importing items.")
+        elif form.is_valid():
+            upload = form.cleaned_data["file"]
+            try:
+                fmt = detect_format(upload.name)
+            except ImportFormatError as e:
+                form.add_error("file", str(e))
+            else:
+                # Read the upload as text, one record at a time.
+                stream = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+                report = import_file(
+                    stream, fmt, request.account, active_location,
+                    dry_run=form.cleaned_data["dry_run"],
+                )
+                if report.committed:
+                    messages.success(request, report.summary())
+                    return redirect("item-list")
+    else:
+        form = ImportForm()
+
+    return render(request, "item_import.html", {"form": form, "report": report})
 
-    items = Item.objects.filter(location__account=account).select_related("location")
 
-    # Filter by active location
-    active_location_id = request.session.get("active_location_id")
-    if active_location_id:
-        items = items.filter(location_id=active_location_id)
+@login_required
+def export_data(request, dataset):
+    """
+    Streams the items or tasks of the active location, or of the whole
+    household with ``?scope=account``, as CSV or JSON Lines (``?format=``).
+    """
+    fmt = request.GET.get("format", "csv")
+    if dataset not in DATASETS or fmt not in CONTENT_TYPES or not request.account:
+        raise Http404
+    if request.GET.get("scope") == "account":
+        scope, filters = request.account.name, {"account": request.account}
+    elif request.active_location:
+        scope, filters = request.active_location.name, {"location": request.active_location}
     else:
-        # Fallback: pick default
-        default_loc = (
-            Location.objects.filter(account=account)
-            .order_by("-default", "name")
-            .first()
-        )
-        if default_loc:
-            items = items.filter(location=default_loc)
-            request.session["active_location_id"] = default_loc.id
+        raise Http404
 
-    if query:
-        items = items.filter(
-            Q(name__icontains=query)
-            | Q(brand__icontains=query)
-            | Q(area__icontains=query)
-        )
+    # Under ASGI a sync iterator would be read into memory before sending.
+    chunks = aexport_chunks if isinstance(request, ASGIRequest) else export_chunks
+    response = StreamingHttpResponse(chunks(dataset, fmt, **filters), content_type=CONTENT_TYPES[fmt])
+    filename = f"{slugify(scope)}-{dataset}-{timezone.now().date():%Y-%m-%d}.{fmt}"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
 
-    items = items.order_by("area", "name")
 
-    for item in items:
-        item.form = ItemForm(instance=item, account=account)
+@login_required
+@conditional_page
+async def item_list(request):
+    # Async, like the other read-heavy list pages: under ASGI the worker keeps
+    # serving other requests while this one waits on the database.
+    await aprepare_request(request)
+    query = request.GET.get("q", "")
+    account = request.account
 
-    # No longer grouping by location.
-    # We can group by Area if desired, or just pass flat list.
-    # The template expects 'grouped_items', so let's adjust the template or adapter here.
-    # Let's pass 'items' directly and update the template to iterate over items.
+    # Items of the active location (validated against the account by
+    # ActiveLocationMiddleware; None only if the account has no locations)
+    active_location = request.active_location
+    items = Item.objects.select_related("location")
+    items = items.filter(location=active_location) if active_location else items.none()
 
-    context = {
-        "items": items,
-        "form": ItemForm(account=account),
-    }
+    # Ordered by (area, name) with the pk as tie-breaker, one page at a time;
+    # search results are ordered by relevance instead.
+    keys = [Coalesce("area", Value("")), "name", "id"]
+    if query:
+        # Typo-tolerant search on SQLite looks up its vocabulary with a sync
+        # cursor.
+        items, rank = await sync_to_async(search_items)(items, query)
+        if rank is not None:
+            keys = [rank, "id"]
+
+    # Cards only: the edit form for an item is fetched from item-detail on
+    # click instead of building an ItemForm per item here.
+    cursor = request.GET.get("cursor")
+    page = await akeyset_paginate(items, keys, cursor=cursor)
+    context = {"items": page.object_list, "page": page, "query": query}
+
+    if request.htmx and cursor:
+        # Infinite scroll: only the next batch of cards
+        return render(request, "components/_item_cards.html", context)
 
     if request.htmx:
         # Only return the list portion when HTMX requests it
         return render(request, "components/_item_list.html", context)
 
+    context["form"] = ItemForm(
+        account=account, location_choices=_location_choices(request)
+    )
     return render(request, "item_list.html", context)
 
 
 @login_required
-def task_management_list(request):
+@conditional_page
+async def task_management_list(request):
     """
     Master list of all maintenance tasks, grouped by:
     - Item (Item -> Tasks) [default]
     - Frequency (Frequency -> Tasks)
     - Area (Item.area -> Tasks)
     """
+    await aprepare_request(request)
     query = request.GET.get("q", "")
     group_by = request.GET.get("group_by", "item")
-    account = request.user.profile.account
+    account = request.account
 
-    # Base query: Get all tasks for the user
-    tasks = Task.objects.filter(item__location__account=account).select_related(
-        "item", "item__location"
-    )
-
-    # Filter by active location
-    active_location_id = request.session.get("active_location_id")
-    if active_location_id:
-        tasks = tasks.filter(item__location_id=active_location_id)
-    else:
-        default_loc = (
-            Location.objects.filter(account=account)
-            .order_by("-default", "name")
-            .first()
-        )
-        if default_loc:
-            tasks = tasks.filter(item__location=default_loc)
-            request.session["active_location_id"] = default_loc.id
+    # Base query: the tasks of the active location
+    active_location = request.active_location
+    tasks = Task.objects.select_related("item", "item__location")
+    tasks = tasks.filter(item__location=active_location) if active_location else tasks.none()
 
+    rank = None
     if query:
-        tasks = tasks.filter(
-            Q(name__icontains=query)
-            | Q(item__name__icontains=query)
-            | Q(description__icontains=query)
-        )
-
-    context = {
-        "grouping_type": group_by,
-        "form": TaskForm(account=account),
-    }
+        tasks, rank = await sync_to_async(search_tasks)(tasks, query)
 
+    valid_key = None
     if group_by == "area":
         # Group by Area
-        # structure: { "AreaName": [Task, Task] }
-        tasks = tasks.order_by("item__area", "item__name", "name")
-        grouped_tasks = defaultdict(list)
-        for task in tasks:
-            label = task.item.area if task.item.area else "General"
-            grouped_tasks[label].append(task)
-        context["grouped_tasks"] = dict(grouped_tasks)
+        keys = [Coalesce("item__area", Value("")), "item__name", "name", "id"]
+
+        def group_label(key):
+            return key[0] or "General"
 
     elif group_by == "frequency":
         # Group by frequency
-        # structure: { "FrequencyLabel": [Task, Task] }
-        tasks = tasks.order_by("frequency", "name")
-        grouped_tasks = defaultdict(list)
-        for task in tasks:
-            label = task.get_frequency_display()
-            grouped_tasks[label].append(task)
-        context["grouped_tasks"] = dict(grouped_tasks)
+        keys = ["frequency", "name", "id"]
+
+        def group_label(key):
+            return Task.Frequency(key[0]).label
+
+        def valid_key(key):
+            # A tampered cursor could carry any integer.
+            return key[0] in Task.Frequency.values
 
     else:  # group_by == "item" (default)
         # Grouping logic: Item -> Tasks (No longer Location -> Item -> Tasks)
-        # structure: { "ItemName": [Task, Task] }
-        tasks = tasks.order_by("item__name", "name")
-        grouped_tasks = defaultdict(list)
+        group_by = "item"
+        keys = ["item__name", "name", "id"]
 
-        for task in tasks:
-            item_name = task.item.name
-            grouped_tasks[item_name].append(task)
+        def group_label(key):
+            return key[0]
+
+    if rank is not None:
+        # Keep groups contiguous, ordered by relevance within each group.
+        keys = [keys[0], rank, "id"]
 
-        context["grouped_tasks"] = dict(grouped_tasks)
+    cursor = request.GET.get("cursor")
+    page = await akeyset_paginate(tasks, keys, cursor=cursor, valid_key=valid_key)
+
+    # structure: [(label, [Task, Task], continued)]
+    # A group that spans a page boundary is "continued" on the next page and
+    # is rendered without repeating its header.
+    task_groups = []
+    previous_label = (
+        group_label(page.previous_key) if page.previous_key is not None else None
+    )
+    for task in page.object_list:
+        label = group_label(row_key(task, len(keys)))
+        if task_groups and task_groups[-1][0] == label:
+            task_groups[-1][1].append(task)
+        else:
+            task_groups.append((label, [task], label == previous_label))
+
+    context = {
+        "grouping_type": group_by,
+        "task_groups": task_groups,
+        "page": page,
+        "query": query,
+    }
+
+    if request.htmx and cursor:
+        # Infinite scroll: only the next batch of groups
+        return render(request, "components/_task_groups.html", context)
 
     if request.htmx:
-        # If it's an HTMX request, we can still return the full template
-        # and let HTMX use hx-select if specified, or just return the full thing
-        # and HTMX will swap the whole #task-list-container content.
-        # However, to avoid returning the whole base.html wrapper, we can check for HTMX.
-        pass
+        # Only return the list portion when HTMX requests it
+        return render(request, "components/_task_list.html", context)
 
+    # The item select is rendered from choices loaded here: the template
+    # can't query from an async view.
+    items = Item.objects.filter(location__account=account) if account else Item.objects.none()
+    context["form"] = TaskForm(
+        account=account, item_choices=item_choices([item async for item in items])
+    )
     return render(request, "maintenance_list.html", context)
 
 
@@ -359,7 +512,7 @@ def task_create(request):
     """
     Creates a new task. Can be triggered from Maintenance page or Item Details.
     """
-    account = request.user.profile.account
+    account = request.account
     if request.method == "POST":
         form = TaskForm(request.POST, account=account)
         if form.is_valid():
@@ -392,9 +545,8 @@ def task_create(request):
         form = TaskForm(initial=initial_data, account=account)
         # Filter the 'item' dropdown to only show Account's items in active location
         items_qs = Item.objects.filter(location__account=account)
-        active_location_id = request.session.get("active_location_id")
-        if active_location_id:
-            items_qs = items_qs.filter(location_id=active_location_id)
+        if request.active_location:
+            items_qs = items_qs.filter(location=request.active_location)
         form.fields["item"].queryset = items_qs
 
     return render(request, "components/_task_create_modal.html", {"form": form})
@@ -402,7 +554,7 @@ def task_create(request):
 
 @login_required
 def task_update(request, pk):
-    account = request.user.profile.account
+    account = request.account
     task = get_object_or_404(Task, pk=pk, item__location__account=account)
 
     if request.method == "POST":
@@ -422,9 +574,8 @@ def task_update(request, pk):
     else:
         form = TaskForm(instance=task, account=account)
         items_qs = Item.objects.filter(location__account=account)
-        active_location_id = request.session.get("active_location_id")
-        if active_location_id:
-            items_qs = items_qs.filter(location_id=active_location_id)
+        if request.active_location:
+            items_qs = items_qs.filter(location=request.active_location)
         form.fields["item"].queryset = items_qs
 
     return render(
@@ -434,7 +585,7 @@ def task_update(request, pk):
 
 @login_required
 def task_delete(request, pk):
-    task = get_object_or_404(Task, pk=pk, item__location__account=request.user.profile.account)
+    task = get_object_or_404(Task, pk=pk, item__location__account=request.account)
 
     if request.method == "POST":
         task_name = task.name
@@ -448,7 +599,7 @@ def task_delete(request, pk):
 
 @login_required
 def task_complete(request, pk):
-    task = get_object_or_404(Task, pk=pk, item__location__account=request.user.profile.account)
+    task = get_object_or_404(Task, pk=pk, item__location__account=request.account)
     if request.method == "POST":
         task.last_performed = timezone.now().date()
         # Force recalculation of next due date
@@ -474,7 +625,7 @@ def task_complete(request, pk):
 
 @login_required
 def task_snooze(request, pk):
-    task = get_object_or_404(Task, pk=pk, item__location__account=request.user.profile.account)
+    task = get_object_or_404(Task, pk=pk, item__location__account=request.account)
     if request.method == "POST":
         # Snooze for exactly 7 days from today
         task.snoozed_until = timezone.now().date() + datetime.timedelta(days=7)
@@ -487,67 +638,183 @@ def task_snooze(request, pk):
     return redirect("task-due-list")
 
 
+def _selected_tasks(request):
+    """
+    The tasks ticked on the due list, loaded with the one query that also
+    checks they belong to the user's account. Unknown or foreign ids are
+    dropped silently.
+    """
+    ids = [value for value in request.POST.getlist("task") if value.isdigit()]
+    if not ids:
+        return []
+    return list(
+        Task.objects.filter(pk__in=ids, item__location__account=request.account)
+        .annotate(location_id=F("item__location_id"))
+        .only("pk", "frequency", "item_id")
+    )
+
+
+def _bulk_task_response(request, notice):
+    """
+    Re-renders the due list once for HTMX requests, otherwise redirects back
+    to it with ``notice`` as a message.
+    """
+    if request.htmx:
+        today = timezone.now().date()
+        context = {"tasks": _due_tasks(request, today), "today": today, "notice": notice}
+        return render(request, "components/_task_due_list.html", context)
+    if notice:
+        messages.success(request, notice)
+    return redirect("task-due-list")
+
+
 @login_required
-def task_due_list(request):
+def task_bulk_complete(request):
     """
-    Shows only tasks that are due today or overdue, considering snoozes.
-    Sorted from least overdue (closest to today) to most overdue.
+    Marks the selected tasks as done: one ownership query, one bulk_update
+    that computes each task's next due date from its frequency, and one
+    stats refresh per affected location, all in one transaction.
     """
+    if request.method != "POST":
+        return redirect("task-due-list")
 
     today = timezone.now().date()
-    account = request.user.profile.account
+    now = timezone.now()
+    with transaction.atomic():
+        tasks = _selected_tasks(request)
+        for task in tasks:
+            task.last_performed = today
+            task.next_due_date = task.calculate_next_due_date()
+            task.snoozed_until = None
+            task.snooze_count = 0
+            task.updated_at = now
+        Task.objects.bulk_update(
+            tasks,
+            ["last_performed", "next_due_date", "snoozed_until", "snooze_count", "updated_at"],
+        )
+        # bulk_update does not send post_save, which keeps the counters in sync.
+        refresh_location_stats({task.location_id for task in tasks}, today)
 
-    # Task is due if:
+    notice = f"{len(tasks)} task(s) marked as completed." if tasks else ""
+    return _bulk_task_response(request, notice)
 
-    # 1. It is snoozed and the snooze has expired: snoozed_until <= today
 
-    # 2. It is NOT snoozed and it is due: snoozed_until IS NULL AND next_due_date <= today
+@login_required
+def task_bulk_snooze(request):
+    """
+    Snoozes the selected tasks for a week with a single UPDATE.
+    """
+    if request.method != "POST":
+        return redirect("task-due-list")
 
-    tasks = (
-        Task.objects.filter(item__location__account=account)
-        .filter(
-            Q(snoozed_until__lte=today)
-            | Q(snoozed_until__isnull=True, next_due_date__lte=today)
-        )
-        .annotate(
-            # Calculate the effective due date for sorting.
-            # We use the later of next_due_date and snoozed_until.
-            effective_due_date=Greatest(
-                Coalesce("next_due_date", "snoozed_until"),
-                Coalesce("snoozed_until", "next_due_date"),
-            )
+    today = timezone.now().date()
+    with transaction.atomic():
+        tasks = _selected_tasks(request)
+        Task.objects.filter(pk__in=[task.pk for task in tasks]).update(
+            snoozed_until=today + datetime.timedelta(days=7),
+            snooze_count=F("snooze_count") + 1,
+            updated_at=timezone.now(),
         )
-        .select_related("item", "item__location")
-        .order_by("-effective_due_date", "name")
-    )
+        refresh_location_stats({task.location_id for task in tasks}, today)
 
-    # Filter by active location
+    notice = f"{len(tasks)} task(s) snoozed for 1 week from today." if tasks else ""
+    return _bulk_task_response(request, notice)
 
-    active_location_id = request.session.get("active_location_id")
-
-    if active_location_id:
-        tasks = tasks.filter(item__location_id=active_location_id)
 
+def _forecast_request(request):
+    """
+    The tasks and horizon for the forecast views: the active location's
+    tasks, or the whole household's with ``?scope=account``, for ``?days=``
+    days (a year by default).
+    """
+    if request.GET.get("scope") == "account" and request.account:
+        tasks = Task.objects.filter(item__location__account=request.account)
+    elif request.active_location:
+        tasks = Task.objects.filter(item__location=request.active_location)
     else:
-        # Standard fallback if needed, or show all?
+        tasks = Task.objects.none()
+    try:
+        days = min(max(int(request.GET.get("days", DEFAULT_DAYS)), 1), MAX_DAYS)
+    except ValueError:
+        days = DEFAULT_DAYS
+    return tasks, days
 
-        # Existing pattern uses default location if none selected.
 
-        default_loc = (
-            Location.objects.filter(account=account)
-            .order_by("-default", "name")
-            .first()
-        )
+def _heatmap(result):
+    """
+    Lays the daily forecast out as a calendar: one row per weekday, one
+    column per week, each day shaded by its hours relative to the busiest.
+    """
+    busiest = max((day.hours for day in result.days), default=0)
+    padding = [None] * result.start.weekday()
+    cells = padding + [
+        {"day": day, "level": math.ceil(4 * day.hours / busiest) if busiest else 0}
+        for day in result.days
+    ]
+    cells += [None] * (-len(cells) % 7)
+    columns = [cells[i:i + 7] for i in range(0, len(cells), 7)]
+    months, previous = [], None
+    for week in result.weeks:
+        month = max(week.start, result.start).strftime("%b")
+        months.append(month if month != previous else "")
+        previous = month
+    return {
+        "rows": [list(row) for row in zip(*columns)],
+        "weeks": list(zip(result.weeks, months)),
+    }
 
-        if default_loc:
-            tasks = tasks.filter(item__location=default_loc)
 
-            request.session["active_location_id"] = default_loc.id
+@login_required
+def task_forecast(request):
+    """
+    Calendar heatmap of the hours of maintenance due per day and week.
+    """
+    tasks, days = _forecast_request(request)
+    result = forecast(tasks, timezone.now().date(), days)
+    context = {
+        "forecast": result,
+        "heatmap": _heatmap(result),
+        "days": days,
+        "scope": request.GET.get("scope", "location"),
+    }
+    return render(request, "task_forecast.html", context)
 
-    context = {"tasks": tasks, "today": today}
 
-    return render(request, "task_due_list.html", context)
+@login_required
+def task_forecast_data(request):
+    """
+    The forecast as JSON: totals per day and per week.
+    """
+    tasks, days = _forecast_request(request)
+    return JsonResponse(forecast(tasks, timezone.now().date(), days).as_dict())
 
+
+def _due_tasks(request, today):
+    # A task is due once the later of next_due_date and snoozed_until has
+    # passed; that date is stored on the task and indexed per item.
+    active_location = request.active_location
+    tasks = (
+        Task.objects.filter(effective_due_date__lte=today)
+        .select_related("item", "item__location")
+        .order_by("-effective_due_date", "name")
+    )
+    return tasks.filter(item__location=active_location) if active_location else tasks.none()
+
+
+@login_required
+@conditional_page
+async def task_due_list(request):
+    """
+    Shows only tasks that are due today or overdue, considering snoozes.
+    Sorted from least overdue (closest to today) to most overdue.
+    """
+    await aprepare_request(request)
+    today = timezone.now().date()
+    tasks = [task async for task in _due_tasks(request, today)]
     context = {"tasks": tasks, "today": today}
 
+    if request.htmx:
+        # Only return the list portion when HTMX requests it
+        return render(request, "components/_task_due_list.html", context)
+
     return render(request, "task_due_list.html", context)